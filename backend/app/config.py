@@ -17,27 +17,108 @@ class Settings(BaseSettings):
     
     # OpenAI
     openai_api_key: str
+    openai_base_url: Optional[str] = None  # OpenAI-compatible endpoint (e.g. scripts/fake_openai_server.py)
     openai_model_vision: str = "gpt-4o"
     openai_model_text: str = "gpt-4o"
     openai_max_tokens: int = 2000
     openai_temperature: float = 0.7
     
+    # OpenAI connection pool (shared async client, one per worker)
+    openai_max_concurrency: int = 200  # Max LLM calls in flight per worker
+    openai_max_connections: int = 200
+    openai_max_keepalive_connections: int = 50
+    openai_keepalive_expiry: float = 60.0  # Seconds an idle connection is kept open
+    openai_max_retries: int = 2
+    openai_connect_timeout: float = 5.0
+    
+    # OpenAI per-feature request timeouts (seconds)
+    openai_timeout_detection: float = 30.0
+    openai_timeout_generation: float = 60.0
+    openai_timeout_translation: float = 45.0
+    
+    # LLM token/cost accounting (Prometheus metrics at /metrics, optional daily rollups)
+    openai_stream_usage: bool = True  # Request token usage on streamed completions (stream_options)
+    llm_usage_rollups: bool = False  # Also write daily totals to llm_usage_daily
+    llm_usage_flush_interval: float = 60.0  # Seconds between rollup writes
+    llm_prices: str = ""  # USD per 1M tokens, e.g. "gpt-4o=2.5:10,my-model=1:2" (adds to built-in prices)
+    
+    # Recipe translation
+    translation_concurrency: int = 8  # Parallel translation calls per request
+    translation_batch_size: int = 5  # Recipes per translation call
+    history_translation_deadline: float = 10.0  # Seconds /history waits before returning items as pending
+    
+    # Recipe generation cache (exact match on normalized ingredient set)
+    generation_cache_enabled: bool = True
+    generation_cache_max_entries: int = 5000
+    generation_cache_ttl_seconds: int = 86400  # 24 hours
+    
+    # Entitlement cache (subscription tier per app account token, one per worker)
+    entitlement_cache_max_entries: int = 10000
+    entitlement_cache_ttl_seconds: int = 300  # Max staleness in other workers after a purchase
+    
+    # Background pre-translation of new recipes (comma-separated, empty = disabled)
+    pretranslate_languages: str = ""
+    pretranslate_workers: int = 2
+    pretranslate_rate_per_minute: int = 60  # Jobs started per minute across workers (0 = unlimited)
+    pretranslate_max_retries: int = 3
+    pretranslate_queue_size: int = 1000  # Jobs beyond this are dropped (translated on demand instead)
+    
     # Database
     # Default to SQLite for development, PostgreSQL for production
     database_url: str = "sqlite:///./fridgegpt.db"
+    database_pool_size: int = 10
+    database_max_overflow: int = 20
+    database_pool_timeout: float = 30.0  # Seconds to wait for a free connection
+    database_pool_recycle: int = 1800  # Seconds before a pooled connection is replaced
+    database_statement_timeout_ms: int = 30000  # PostgreSQL: abort statements running longer (0 = off)
+    database_echo: bool = False  # Log every SQL statement (independent of DEBUG)
+    sqlite_busy_timeout_ms: int = 5000  # Wait for a lock instead of failing with "database is locked"
+    sqlite_mmap_size: int = 268435456  # 256MB memory-mapped I/O
     
     # App Store (iOS)
     apple_shared_secret: Optional[str] = None
     apple_environment: str = "sandbox"  # sandbox or production
+    apple_verification_mode: str = "auto"  # auto (JWS locally, else verifyReceipt), jws or receipt
+    apple_bundle_id: Optional[str] = None  # Reject signed transactions for other apps
+    apple_root_cert_path: Optional[str] = None  # Pin this root instead of Apple Root CA - G3
+    apple_jws_chain_cache_size: int = 64  # Verified certificate chains kept per worker
     
     # Google Play (Android)
     google_service_account_path: Optional[str] = None
     google_api_key: Optional[str] = None
     google_package_name: Optional[str] = None
+    google_rtdn_token: Optional[str] = None  # Shared secret expected as ?token= on Pub/Sub pushes (required)
+    
+    # Subscription expiry sweeper (marks lapsed subscriptions expired in the background)
+    subscription_sweep_interval: float = 60.0  # Seconds between sweeps (0 = disabled)
+    subscription_sweep_batch_size: int = 500  # Rows expired per transaction
+    
+    # Receipt verification clients (pooled, created once per worker)
+    receipt_max_connections: int = 20
+    receipt_max_keepalive_connections: int = 10
+    receipt_timeout: float = 10.0  # Seconds per store request
+    receipt_google_workers: int = 4  # Threads for blocking Google Play API calls
     
     # File Storage
     upload_dir: str = "./uploads"
     max_upload_size: int = 10485760  # 10MB
+    max_upload_files: int = 3  # Images per detection request
+    upload_form_overhead: int = 65536  # Multipart boundaries/fields allowed on top of the files
+    
+    # Image preprocessing (runs before the vision call)
+    upload_chunk_size: int = 65536  # Uploads are validated 64KB at a time
+    image_workers: int = 4  # Threads for decode/resize/re-encode
+    image_memory_budget: int = 268435456  # 256MB of decode buffers per worker
+    image_max_pixels: int = 50000000  # Reject larger images before decoding
+    image_jpeg_quality: int = 85
+    vision_detail: str = "auto"  # auto, low or high
+    
+    # Usage counters (database writes every use; memory/redis buffer and flush in batches)
+    usage_backend: str = "database"  # database, memory or redis
+    usage_flush_interval: float = 1.0  # Seconds between batched usage_logs writes
+    usage_max_pending: int = 3  # Memory backend: unflushed uses per counter per worker (limit tolerance)
+    usage_refresh_seconds: float = 30.0  # Memory backend: seconds a stored count is reused before re-reading it
+    usage_redis_url: Optional[str] = None  # redis://localhost:6379/0
     
     # Rate Limiting
     rate_limit_per_minute: int = 60
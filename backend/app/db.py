@@ -1,19 +1,173 @@
 """Database connection and session management"""
-from sqlalchemy import create_engine
+import time
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
 
-# Create database engine
-engine = create_engine(
-    settings.database_url,
-    pool_pre_ping=True,  # Verify connections before using
-    echo=settings.debug,  # Log SQL queries in debug mode
-)
+
+# Async drivers used by the request path, per sync driver in DATABASE_URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Map DATABASE_URL to its async driver (sqlite -> aiosqlite, postgresql -> asyncpg)"""
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+class PoolMetrics:
+    """Connection checkout wait times for one engine's pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+
+def _timed_pool_class(base: type) -> type:
+    """Pool subclass that records how long each checkout waited (one class per engine)"""
+
+    class TimedPool(base):
+        metrics = PoolMetrics()
+
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            except exc.TimeoutError:
+                self.metrics.timeouts += 1
+                raise
+            finally:
+                self.metrics.observe(time.perf_counter() - start)
+
+    return TimedPool
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """WAL lets readers run alongside a writer; busy_timeout waits instead of 'database is locked'"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.close()
+
+
+def create_database_engine(url: str, is_async: bool = False):
+    """
+    Create an engine with the tuning profile for its database
+    
+    - SQLite: WAL journal, synchronous=NORMAL, busy_timeout and mmap_size pragmas
+    - PostgreSQL: sized pool with recycle and a server-side statement_timeout
+    - Both: pre-ping, checkout wait metrics, SQL echo only if DATABASE_ECHO is set
+    
+    Args:
+        url: Database URL (with the async driver when is_async)
+        is_async: Build an AsyncEngine
+    
+    Returns:
+        Engine or AsyncEngine
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    in_memory = backend == "sqlite" and parsed.database in (None, "", ":memory:")
+    
+    options = {
+        "pool_pre_ping": True,  # Verify connections before using
+        "echo": settings.database_echo,  # Log SQL only when explicitly requested
+    }
+    if not in_memory:
+        options.update(
+            poolclass=_timed_pool_class(AsyncAdaptedQueuePool if is_async else QueuePool),
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_timeout=settings.database_pool_timeout,
+            pool_recycle=settings.database_pool_recycle,
+        )
+    
+    if backend == "postgresql" and settings.database_statement_timeout_ms > 0:
+        timeout = str(int(settings.database_statement_timeout_ms))
+        if is_async:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    
+    new_engine = create_async_engine(url, **options) if is_async else create_engine(url, **options)
+    if backend == "sqlite" and not in_memory:
+        sync_engine = new_engine.sync_engine if is_async else new_engine
+        event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+    return new_engine
+
+
+def pool_metrics(target) -> Dict[str, Any]:
+    """
+    Pool size, utilization and checkout wait stats for an engine
+    
+    Args:
+        target: Engine or AsyncEngine
+    
+    Returns:
+        Dict of pool metrics (only 'pool' for pools without stats, e.g. in-memory SQLite)
+    """
+    pool = target.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__}
+    metrics = getattr(pool, "metrics", None)
+    if metrics is None:
+        return stats
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    stats.update(
+        size=pool.size(),
+        max_overflow=pool._max_overflow,
+        checked_out=checked_out,
+        checked_in=pool.checkedin(),
+        overflow=max(pool.overflow(), 0),
+        utilization=round(checked_out / capacity, 3) if capacity else None,
+        checkouts=metrics.checkouts,
+        checkout_timeouts=metrics.timeouts,
+        checkout_wait_avg_ms=round(metrics.wait_seconds_total / metrics.checkouts * 1000, 3) if metrics.checkouts else 0.0,
+        checkout_wait_max_ms=round(metrics.wait_seconds_max * 1000, 3),
+    )
+    return stats
+
+
+# Create database engine (migrations, scripts, init_db)
+engine = create_database_engine(settings.database_url)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the API (queries don't block the event loop)
+async_engine = create_database_engine(async_database_url(settings.database_url), is_async=True)
+
+# Async session factory (objects stay usable after commit)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Base class for models
 Base = declarative_base()
 
@@ -27,6 +181,12 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Dependency for getting an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """Initialize database tables (for development/testing)"""
     Base.metadata.create_all(bind=engine)
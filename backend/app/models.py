@@ -1,5 +1,5 @@
 """Database models"""
-from sqlalchemy import Column, String, DateTime, Integer, Date, Index, UniqueConstraint
+from sqlalchemy import Column, String, Text, DateTime, Integer, Float, Date, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from app.db import Base
 import uuid
@@ -24,6 +24,23 @@ class Subscription(Base):
         UniqueConstraint('app_account_token', 'platform', name='uq_subscriptions_token_platform'),
         Index('idx_subscriptions_token', 'app_account_token'),
         Index('idx_subscriptions_status', 'status', 'expires_at'),
+        Index('idx_subscriptions_original_transaction', 'original_transaction_id'),
+        Index('idx_subscriptions_purchase_token', 'purchase_token'),
+    )
+
+
+class StoreNotification(Base):
+    """Store notification model - records processed App Store / Play Store notifications (idempotency)"""
+    __tablename__ = "store_notifications"
+    
+    platform = Column(String(10), primary_key=True, nullable=False)  # 'ios' or 'android'
+    notification_id = Column(String(255), primary_key=True, nullable=False)  # Apple notificationUUID / Pub/Sub messageId
+    notification_type = Column(String(100), nullable=False)  # e.g. DID_RENEW, SUBSCRIPTION_RENEWED
+    subscription_id = Column(String(36), nullable=True)  # Subscription it updated (if any)
+    received_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    
+    __table_args__ = (
+        Index('idx_store_notifications_received', 'received_at'),
     )
 
 
@@ -41,6 +58,24 @@ class UsageLog(Base):
     )
 
 
+class LLMUsageDaily(Base):
+    """LLM usage rollup model - daily token, latency and cost totals (optional, LLM_USAGE_ROLLUPS)"""
+    __tablename__ = "llm_usage_daily"
+    
+    date = Column(Date, primary_key=True, nullable=False)
+    feature = Column(String(50), primary_key=True, nullable=False)  # 'detection', 'generation', 'translation'
+    model = Column(String(100), primary_key=True, nullable=False)
+    language = Column(String(10), primary_key=True, nullable=False)
+    tier = Column(String(20), primary_key=True, nullable=False)  # 'free', 'premium', 'shared'
+    requests = Column(Integer, default=0, nullable=False)
+    prompt_tokens = Column(Integer, default=0, nullable=False)
+    completion_tokens = Column(Integer, default=0, nullable=False)
+    truncated = Column(Integer, default=0, nullable=False)  # Calls that stopped at max_tokens
+    errors = Column(Integer, default=0, nullable=False)
+    latency_ms = Column(Integer, default=0, nullable=False)  # Sum (divide by requests for the mean)
+    cost_usd = Column(Float, default=0.0, nullable=False)  # Estimated from LLM_PRICES
+
+
 class RecipeCache(Base):
     """Recipe cache model - stores generated recipes for multi-language support"""
     __tablename__ = "recipe_cache"
@@ -53,6 +88,7 @@ class RecipeCache(Base):
     title = Column(String(500), nullable=False)
     steps = Column(String, nullable=False)  # JSON array of steps
     ingredients = Column(String, nullable=True)  # JSON array of ingredients
+    payload = Column(Text, nullable=True)  # Serialized Recipe response JSON (served as-is)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     __table_args__ = (
@@ -1,26 +1,26 @@
 """Detection router - ingredient detection from images"""
-from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends
+from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Depends, Response
 from typing import List, Optional
 from uuid import UUID
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
-from app.db import get_db
-from app.models import Subscription
+from app.db import get_async_db
 from app.services.usage_service import usage_service
+from app.services.entitlement_service import entitlement_service
 from app.services.openai_service import openai_service
+from app.services.image_service import image_service, ImageProcessingError, UploadRejected
 from app.schemas import IngredientDetectionResponse, ErrorResponse
-from datetime import datetime
-import io
 
 router = APIRouter(prefix="/api/v1", tags=["Detection"])
 
 
 @router.post("/detect-ingredients")
 async def detect_ingredients(
+    response: Response,
     images: List[UploadFile] = File(...),
     language: str = Form("en"),
     appAccountToken: Optional[str] = Form(None),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Detect ingredients from uploaded images.
@@ -28,12 +28,15 @@ async def detect_ingredients(
     - **images**: 1-3 image files (JPEG, PNG, WebP, max 10MB each)
     - **language**: Language code (default: en)
     - **appAccountToken**: Optional UUID for usage tracking
+    
+    Images are downscaled, stripped of EXIF and re-encoded before the vision call.
+    Savings are reported in the X-Image-Bytes-Saved and X-Image-Tokens-Saved headers.
     """
     # Validate number of images
-    if len(images) > 3:
+    if len(images) > settings.max_upload_files:
         raise HTTPException(
             status_code=400,
-            detail="Maximum 3 images allowed per request",
+            detail=f"Maximum {settings.max_upload_files} images allowed per request",
             headers={"X-Error-Code": "TOO_MANY_IMAGES"}
         )
     
@@ -44,18 +47,10 @@ async def detect_ingredients(
             headers={"X-Error-Code": "NO_IMAGES"}
         )
     
-    # Validate and process images
-    image_bytes_list = []
+    # Validate uploads: cheap header checks first, then stream each file in chunks
+    # so oversized or non-image files are rejected without loading them into memory
+    upload_sizes = []
     for image in images:
-        # Check file size
-        contents = await image.read()
-        if len(contents) > settings.max_upload_size:
-            raise HTTPException(
-                status_code=413,
-                detail=f"Image {image.filename} exceeds maximum size of {settings.max_upload_size} bytes",
-                headers={"X-Error-Code": "PAYLOAD_TOO_LARGE"}
-            )
-        
         # Validate image format
         if not image.content_type or not image.content_type.startswith('image/'):
             raise HTTPException(
@@ -73,28 +68,26 @@ async def detect_ingredients(
                 headers={"X-Error-Code": "UNSUPPORTED_IMAGE_FORMAT"}
             )
         
-        image_bytes_list.append(contents)
-        # Reset file pointer for potential reuse
-        await image.seek(0)
+        # Check file size and magic bytes
+        try:
+            upload_sizes.append(await image_service.validate_upload(image))
+        except UploadRejected as e:
+            raise HTTPException(
+                status_code=e.status_code,
+                detail=str(e),
+                headers={"X-Error-Code": e.error_code}
+            )
     
-    # Check usage limits if appAccountToken provided
+    # Check usage limits if appAccountToken provided (before the expensive image work)
+    is_premium = False
+    counted = False
     if appAccountToken:
         try:
             # Check if premium
-            subscription = (
-                db.query(Subscription)
-                .filter(Subscription.app_account_token == appAccountToken)
-                .order_by(Subscription.created_at.desc())
-                .first()
-            )
+            is_premium = await entitlement_service.is_premium(db, appAccountToken)
             
-            is_premium = False
-            if subscription and subscription.status == "active":
-                if subscription.expires_at is None or subscription.expires_at > datetime.now():
-                    is_premium = subscription.product_id in ["premium", "premium_annual"]
-            
-            # Check limit
-            allowed, message = usage_service.check_limit(
+            # Check limit and count this scan (single atomic statement)
+            allowed, message = await usage_service.consume(
                 db=db,
                 app_account_token=appAccountToken,
                 feature="scan",
@@ -107,22 +100,34 @@ async def detect_ingredients(
                     detail=message,
                     headers={"X-Error-Code": "DAILY_LIMIT_REACHED"}
                 )
-            
-            # Increment usage
-            usage_service.increment_usage(
-                db=db,
-                app_account_token=appAccountToken,
-                feature="scan"
-            )
+            counted = True
         except ValueError:
             # Invalid UUID format - skip usage tracking
             pass
     
+    # Downscale, strip EXIF and re-encode in the worker pool (never blocks the event loop)
+    try:
+        prepared_images = await image_service.prepare_uploads(images, upload_sizes)
+    except ImageProcessingError as e:
+        # The scan was never served - don't count it
+        if counted:
+            await usage_service.release(db, appAccountToken, "scan")
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid image: {str(e)}",
+            headers={"X-Error-Code": "INVALID_IMAGE"}
+        )
+    
+    savings = image_service.savings(prepared_images)
+    response.headers["X-Image-Bytes-Saved"] = str(savings["bytes_saved"])
+    response.headers["X-Image-Tokens-Saved"] = str(savings["tokens_saved"])
+    
     # Call OpenAI Vision API
     try:
         result = await openai_service.detect_ingredients(
-            images=image_bytes_list,
-            language=language
+            images=prepared_images,
+            language=language,
+            user_tier="premium" if is_premium else "free"
         )
         return IngredientDetectionResponse(**result)
     except Exception as e:
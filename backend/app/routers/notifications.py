@@ -0,0 +1,89 @@
+"""Notifications router - App Store and Play Store server-to-server notifications"""
+import hmac
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.config import settings
+from app.db import get_async_db
+from app.services.notification_service import notification_service, NotificationError
+
+router = APIRouter(prefix="/api/v1/notifications", tags=["Notifications"])
+
+
+class AppleNotificationRequest(BaseModel):
+    """App Store Server Notification v2 body"""
+    signedPayload: str = Field(..., description="JWS-signed notification payload")
+
+
+class PubSubMessage(BaseModel):
+    """Pub/Sub message carrying a Play Real-Time Developer Notification"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    data: str = Field(..., description="Base64-encoded DeveloperNotification JSON")
+    message_id: str = Field(..., alias="messageId", description="Pub/Sub message ID")
+
+
+class GoogleNotificationRequest(BaseModel):
+    """Pub/Sub push body"""
+    message: PubSubMessage
+    subscription: Optional[str] = Field(None, description="Pub/Sub subscription name")
+
+
+@router.post("/apple")
+async def apple_notification(
+    request: AppleNotificationRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Ingest an App Store Server Notification v2.
+
+    The payload is trusted only if its signature chains to the pinned App
+    Store root. Redelivered notifications are acknowledged without being
+    applied again.
+    """
+    try:
+        event = notification_service.parse_apple(request.signedPayload)
+    except NotificationError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e),
+            headers={"X-Error-Code": "INVALID_NOTIFICATION"}
+        )
+    return {"status": await notification_service.apply(db, event)}
+
+
+@router.post("/google")
+async def google_notification(
+    request: GoogleNotificationRequest,
+    token: Optional[str] = Query(None, description="Shared secret configured on the Pub/Sub push endpoint"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Ingest a Play Real-Time Developer Notification (Pub/Sub push).
+
+    Requires ?token= to match GOOGLE_RTDN_TOKEN; pushes are rejected until it
+    is set. Redelivered messages are acknowledged without being applied again.
+    """
+    if not settings.google_rtdn_token:
+        raise HTTPException(
+            status_code=503,
+            detail="Play notifications are not configured (missing GOOGLE_RTDN_TOKEN)",
+            headers={"X-Error-Code": "NOTIFICATIONS_NOT_CONFIGURED"}
+        )
+    if not hmac.compare_digest(token or "", settings.google_rtdn_token):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid notification token",
+            headers={"X-Error-Code": "INVALID_NOTIFICATION_TOKEN"}
+        )
+    try:
+        event = await notification_service.parse_google(request.message.message_id, request.message.data)
+    except NotificationError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e),
+            headers={"X-Error-Code": "INVALID_NOTIFICATION"}
+        )
+    return {"status": await notification_service.apply(db, event)}
@@ -1,19 +1,40 @@
 """Recipes router - recipe generation and retrieval"""
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import String, delete, exists, literal, or_, select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from typing import List, Optional, Dict, Any, Tuple
 from pydantic import BaseModel
 from datetime import datetime
+from collections import defaultdict
 
-from app.db import get_db
-from app.models import Subscription, RecipeCache, History
+from app.config import settings
+from app.db import get_async_db, AsyncSessionLocal
+from app.models import RecipeCache, History
 from app.services.usage_service import usage_service
+from app.services.entitlement_service import entitlement_service
 from app.services.openai_service import openai_service
+from app.services.generation_cache import generation_cache
+from app.services.pretranslation_worker import pretranslation_queue
+from app.services.translation_service import (
+    translation_service,
+    recipe_payload,
+    recipe_to_cache_values,
+    recipe_to_dict,
+)
 from app.schemas import RecipeGenerationResponse, Recipe, ErrorResponse, HistoryResponse, HistoryEntry
+import base64
+import binascii
 import json
+import uuid
 
 router = APIRouter(prefix="/api/v1", tags=["Recipes"])
 
+HISTORY_PAGE_SIZE = 20  # History entries per page when a cursor is sent without a limit
+HISTORY_MAX_UNPAGED = 200  # Cap on entries returned when neither limit nor cursor is sent
+
 
 class Ingredient(BaseModel):
     """Ingredient model"""
@@ -38,18 +59,15 @@ class GenerateRecipesRequest(BaseModel):
     diet_preferences: Optional[DietPreferencesRequest] = None  # Sent from Flutter
 
 
-@router.post("/generate-recipes")
-async def generate_recipes(
+async def _prepare_generation(
     request: GenerateRecipesRequest,
-    db: Session = Depends(get_db)
-):
+    db: AsyncSession
+) -> Tuple[str, Optional[Dict[str, Any]]]:
     """
-    Generate recipe suggestions based on ingredients.
+    Validate a generation request, resolve the user tier and consume usage
     
-    - **ingredients**: List of ingredient objects with id and name
-    - **language**: Language code for recipe generation (default: en)
-    - **max_recipes**: Maximum number of recipes to generate (default: 3)
-    - **appAccountToken**: Optional UUID for usage tracking
+    Returns:
+        Tuple of (user_tier, diet_preferences)
     """
     # Validate inputs
     if not request.ingredients:
@@ -73,17 +91,7 @@ async def generate_recipes(
     if request.appAccountToken:
         try:
             # Check if premium - backend is source of truth
-            subscription = (
-                db.query(Subscription)
-                .filter(Subscription.app_account_token == str(request.appAccountToken))
-                .order_by(Subscription.created_at.desc())
-                .first()
-            )
-            
-            is_premium = False
-            if subscription and subscription.status == "active":
-                if subscription.expires_at is None or subscription.expires_at > datetime.now():
-                    is_premium = subscription.product_id in ["premium", "premium_annual"]
+            is_premium = await entitlement_service.is_premium(db, str(request.appAccountToken))
             
             # Set tier based on subscription status (server-side only)
             if is_premium:
@@ -99,8 +107,8 @@ async def generate_recipes(
                     }
             # Free users cannot have diet preferences - ignore any sent from client
             
-            # Check limit
-            allowed, message = usage_service.check_limit(
+            # Check limit and count this generation (single atomic statement)
+            allowed, message = await usage_service.consume(
                 db=db,
                 app_account_token=str(request.appAccountToken),
                 feature="recipe_generation",
@@ -113,81 +121,157 @@ async def generate_recipes(
                     detail=message,
                     headers={"X-Error-Code": "DAILY_LIMIT_REACHED"}
                 )
-            
-            # Increment usage
-            usage_service.increment_usage(
-                db=db,
-                app_account_token=str(request.appAccountToken),
-                feature="recipe_generation"
-            )
         except ValueError:
             # Invalid UUID format - skip usage tracking
             pass
     
-    # Call OpenAI GPT-4 for recipe generation
+    return user_tier, diet_preferences
+
+
+async def _store_recipe(
+    db: AsyncSession,
+    recipe: Dict[str, Any],
+    language: str,
+    app_account_token: Optional[str],
+    batch_id: Optional[str]
+) -> None:
+    """Add a generated recipe to RecipeCache and the user's History (caller commits)"""
+    # Check if recipe already exists in this language
+    existing = await db.scalar(
+        select(RecipeCache.id)
+        .where(
+            RecipeCache.recipe_id == recipe["id"],
+            RecipeCache.language == language
+        )
+    )
+    
+    if not existing:
+        # Store recipe in database (with its serialized response for fast reads)
+        db.add(RecipeCache(**recipe_to_cache_values(recipe, language)))
+    
+    # Save all recipes to history (if appAccountToken provided)
+    if app_account_token:
+        # Check if history entry already exists (avoid duplicates)
+        existing_history = await db.scalar(
+            select(History.id)
+            .where(
+                History.app_account_token == app_account_token,
+                History.recipe_id == recipe["id"]
+            )
+        )
+        
+        if not existing_history:
+            history_entry = History(
+                app_account_token=app_account_token,
+                recipe_id=recipe["id"],
+                generation_batch_id=batch_id
+            )
+            db.add(history_entry)
+
+
+def _pretranslate(recipes: List[Dict[str, Any]], language: str, user_tier: str) -> None:
+    """Queue freshly generated recipes for background translation into hot languages"""
+    priority = (
+        pretranslation_queue.PRIORITY_HIGH if user_tier == "premium"
+        else pretranslation_queue.PRIORITY_NORMAL
+    )
+    pretranslation_queue.enqueue_recipes(
+        [recipe["id"] for recipe in recipes],
+        source_language=language,
+        priority=priority
+    )
+
+
+def _encode_cursor(created_at: datetime, entry_id: str) -> str:
+    """Opaque history cursor: position of the last entry on a page"""
+    raw = f"{created_at.isoformat()}|{entry_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _cursor_bound(created_at: datetime, dialect: str):
+    """
+    Cursor created_at, bound in the format the column is stored in
+    
+    SQLite stores CURRENT_TIMESTAMP as 'YYYY-MM-DD HH:MM:SS' text but binds datetimes with
+    '.ffffff', so a cursor would sort after its own row. Binding the stored text keeps the
+    comparison on the raw column, so idx_history_token_created can serve it.
+    """
+    if dialect == "sqlite":
+        return literal(created_at.isoformat(sep=" "), String)
+    return created_at
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a history cursor (raises ValueError if malformed)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError("malformed cursor")
+    created_at, sep, entry_id = raw.partition("|")
+    if not sep or not entry_id:
+        raise ValueError("malformed cursor")
+    return datetime.fromisoformat(created_at), entry_id
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+@router.post("/generate-recipes")
+async def generate_recipes(
+    request: GenerateRecipesRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Generate recipe suggestions based on ingredients.
+    
+    - **ingredients**: List of ingredient objects with id and name
+    - **language**: Language code for recipe generation (default: en)
+    - **max_recipes**: Maximum number of recipes to generate (default: 3)
+    - **appAccountToken**: Optional UUID for usage tracking
+    """
+    user_tier, diet_preferences = await _prepare_generation(request, db)
+    
+    # Call OpenAI GPT-4 for recipe generation (skipped on exact-match cache hit)
     try:
-        result = await openai_service.generate_recipes(
+        cache_key = generation_cache.make_key(
             ingredients=request.ingredients,
             language=request.language,
             max_recipes=request.max_recipes,
             user_tier=user_tier,
             diet_preferences=diet_preferences
         )
+        result = generation_cache.get(cache_key)
+        cache_hit = result is not None
+        
+        if not cache_hit:
+            result = await openai_service.generate_recipes(
+                ingredients=request.ingredients,
+                language=request.language,
+                max_recipes=request.max_recipes,
+                user_tier=user_tier,
+                diet_preferences=diet_preferences
+            )
         
         # Generate batch ID for grouping recipes generated together
-        import uuid as uuid_module
-        batch_id = str(uuid_module.uuid4()) if request.appAccountToken else None
+        batch_id = str(uuid.uuid4()) if request.appAccountToken else None
+        app_account_token = str(request.appAccountToken) if request.appAccountToken else None
         
         # Cache recipes in database for multi-language support
         for recipe in result["recipes"]:
-            # Check if recipe already exists in this language
-            existing = (
-                db.query(RecipeCache)
-                .filter(
-                    RecipeCache.recipe_id == recipe["id"],
-                    RecipeCache.language == request.language
-                )
-                .first()
-            )
-            
-            if not existing:
-                # Store recipe in database
-                recipe_cache = RecipeCache(
-                    recipe_id=recipe["id"],
-                    language=request.language,
-                    emoji=recipe.get("emoji", "🍽️"),
-                    badge=recipe.get("badge", "fastLazy"),
-                    title=recipe.get("title", ""),
-                    steps=json.dumps(recipe.get("steps", [])),
-                    ingredients=json.dumps(recipe.get("ingredients", [])) if recipe.get("ingredients") else None
-                )
-                db.add(recipe_cache)
-            
-            # Save all recipes to history (if appAccountToken provided)
-            if request.appAccountToken:
-                # Check if history entry already exists (avoid duplicates)
-                existing_history = (
-                    db.query(History)
-                    .filter(
-                        History.app_account_token == str(request.appAccountToken),
-                        History.recipe_id == recipe["id"]
-                    )
-                    .first()
-                )
-                
-                if not existing_history:
-                    history_entry = History(
-                        app_account_token=str(request.appAccountToken),
-                        recipe_id=recipe["id"],
-                        generation_batch_id=batch_id
-                    )
-                    db.add(history_entry)
+            await _store_recipe(db, recipe, request.language, app_account_token, batch_id)
         
-        db.commit()
+        await db.commit()
+        
+        # Cached recipes keep their IDs, so hits reuse the RecipeCache rows stored above
+        if not cache_hit:
+            generation_cache.set(cache_key, result)
+            _pretranslate(result["recipes"], request.language, user_tier)
         
         return RecipeGenerationResponse(**result)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate recipes: {str(e)}",
@@ -195,11 +279,90 @@ async def generate_recipes(
         )
 
 
+@router.post("/generate-recipes/stream")
+async def generate_recipes_stream(
+    request: GenerateRecipesRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Streaming variant of /generate-recipes (Server-Sent Events).
+    
+    Same request body as /generate-recipes. Events:
+    - **recipe**: one Recipe object, sent as soon as the model finishes it
+    - **done**: {"generation_id": ..., "count": ...} after the last recipe
+    - **error**: {"detail": ..., "error_code": "GENERATION_FAILED"} if generation fails mid-stream
+    
+    Each recipe is saved to the recipe cache and history before its event is sent.
+    Validation and usage-limit errors are returned as normal HTTP errors before streaming starts.
+    """
+    user_tier, diet_preferences = await _prepare_generation(request, db)
+    
+    cache_key = generation_cache.make_key(
+        ingredients=request.ingredients,
+        language=request.language,
+        max_recipes=request.max_recipes,
+        user_tier=user_tier,
+        diet_preferences=diet_preferences
+    )
+    cached = generation_cache.get(cache_key)
+    
+    async def cached_recipes():
+        for recipe in cached["recipes"]:
+            yield recipe
+    
+    async def event_stream():
+        generation_id = cached["generation_id"] if cached else f"gen_{str(uuid.uuid4())[:12]}"
+        batch_id = str(uuid.uuid4()) if request.appAccountToken else None
+        app_account_token = str(request.appAccountToken) if request.appAccountToken else None
+        recipes = []
+        
+        if cached:
+            source = cached_recipes()
+        else:
+            source = openai_service.stream_recipes(
+                ingredients=request.ingredients,
+                language=request.language,
+                max_recipes=request.max_recipes,
+                user_tier=user_tier,
+                diet_preferences=diet_preferences
+            )
+        
+        # Own session: the stream outlives the request-scoped dependency
+        stream_db = AsyncSessionLocal()
+        try:
+            async for recipe in source:
+                await _store_recipe(stream_db, recipe, request.language, app_account_token, batch_id)
+                await stream_db.commit()
+                recipes.append(recipe)
+                yield _sse_event("recipe", Recipe(**recipe).model_dump(mode="json"))
+            
+            yield _sse_event("done", {"generation_id": generation_id, "count": len(recipes)})
+            
+            if not cached:
+                generation_cache.set(cache_key, {"recipes": recipes, "generation_id": generation_id})
+                _pretranslate(recipes, request.language, user_tier)
+        except Exception as e:
+            await stream_db.rollback()
+            yield _sse_event("error", {
+                "detail": f"Failed to generate recipes: {str(e)}",
+                "error_code": "GENERATION_FAILED"
+            })
+        finally:
+            await source.aclose()
+            await stream_db.close()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/recipes/{recipe_id}")
 async def get_recipe(
     recipe_id: str,
     language: str = Query("en", description="Language code for localized content"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get a specific recipe by ID in the requested language.
@@ -211,82 +374,67 @@ async def get_recipe(
     This enables language switching without re-generating recipes.
     """
     # Try to find recipe in requested language
-    recipe_cache = (
-        db.query(RecipeCache)
-        .filter(
+    cached = (await db.execute(
+        select(RecipeCache.id, RecipeCache.payload)
+        .where(
             RecipeCache.recipe_id == recipe_id,
             RecipeCache.language == language
         )
-        .first()
-    )
+    )).first()
     
-    if recipe_cache:
-        # Recipe exists in requested language
+    if cached:
+        # Recipe exists in requested language - serve the stored JSON as-is
+        payload = cached.payload
+        if payload is None:
+            # Cached before payloads were stored - serialize once and keep it
+            recipe_cache = await db.get(RecipeCache, cached.id)
+            payload = recipe_payload(recipe_to_dict(recipe_cache), recipe_cache.created_at)
+            recipe_cache.payload = payload
+            try:
+                await db.commit()
+            except SQLAlchemyError:
+                await db.rollback()
+        return Response(content=payload, media_type="application/json")
+    
+    # Recipe missing in this language - translate from any cached language
+    try:
+        translated, _ = await translation_service.translate_missing(
+            db=db,
+            recipe_ids=[recipe_id],
+            language=language
+        )
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to translate recipe: {str(e)}",
+            headers={"X-Error-Code": "TRANSLATION_FAILED"}
+        )
+    
+    if recipe_id in translated:
+        recipe = translated[recipe_id]
         return Recipe(
-            id=recipe_cache.recipe_id,
-            emoji=recipe_cache.emoji,
-            badge=recipe_cache.badge,
-            title=recipe_cache.title,
-            steps=json.loads(recipe_cache.steps),
-            ingredients=json.loads(recipe_cache.ingredients) if recipe_cache.ingredients else None,
-            created_at=recipe_cache.created_at
+            id=recipe["id"],
+            emoji=recipe["emoji"],
+            badge=recipe["badge"],
+            title=recipe.get("title", ""),
+            steps=recipe.get("steps", []),
+            ingredients=recipe.get("ingredients") or None,
+            created_at=recipe["created_at"]
         )
     
-    # Try to find recipe in any language (for translation)
-    any_language_recipe = (
-        db.query(RecipeCache)
-        .filter(RecipeCache.recipe_id == recipe_id)
-        .first()
+    # Recipe exists but translation failed
+    source_exists = await db.scalar(
+        select(RecipeCache.id)
+        .where(RecipeCache.recipe_id == recipe_id)
+        .limit(1)
     )
-    
-    if any_language_recipe:
-        # Recipe exists but in different language - translate it
-        try:
-            original_recipe = {
-                "id": any_language_recipe.recipe_id,
-                "emoji": any_language_recipe.emoji,
-                "badge": any_language_recipe.badge,
-                "title": any_language_recipe.title,
-                "steps": json.loads(any_language_recipe.steps),
-                "ingredients": json.loads(any_language_recipe.ingredients) if any_language_recipe.ingredients else []
-            }
-            
-            # Translate recipe to requested language
-            translated = await openai_service.translate_recipe(
-                recipe=original_recipe,
-                target_language=language
-            )
-            
-            # Cache the translated recipe
-            translated_cache = RecipeCache(
-                recipe_id=translated["id"],
-                language=language,
-                emoji=translated.get("emoji", original_recipe["emoji"]),
-                badge=translated.get("badge", original_recipe["badge"]),
-                title=translated.get("title", ""),
-                steps=json.dumps(translated.get("steps", [])),
-                ingredients=json.dumps(translated.get("ingredients", [])) if translated.get("ingredients") else None
-            )
-            db.add(translated_cache)
-            db.commit()
-            
-            return Recipe(
-                id=translated["id"],
-                emoji=translated.get("emoji", original_recipe["emoji"]),
-                badge=translated.get("badge", original_recipe["badge"]),
-                title=translated.get("title", ""),
-                steps=translated.get("steps", []),
-                ingredients=translated.get("ingredients"),
-                created_at=any_language_recipe.created_at
-            )
-            
-        except Exception as e:
-            db.rollback()
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to translate recipe: {str(e)}",
-                headers={"X-Error-Code": "TRANSLATION_FAILED"}
-            )
+    if source_exists:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to translate recipe: {recipe_id}",
+            headers={"X-Error-Code": "TRANSLATION_FAILED"}
+        )
     
     # Recipe not found in database
     raise HTTPException(
@@ -300,138 +448,167 @@ async def get_recipe(
 async def get_history(
     appAccountToken: str = Query(..., description="Unique app account token (UUID generated locally)"),
     language: str = Query("en", description="Language code for localized content"),
-    db: Session = Depends(get_db)
+    max_wait: Optional[float] = Query(None, ge=0, description="Seconds to wait for missing translations before returning them as pending"),
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Maximum number of history entries (groups) per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get user's recipe history with full recipe data in requested language.
     
-    Returns all recipes the user has generated, ordered by creation date (newest first).
+    Returns the recipes the user has generated, ordered by creation date (newest first),
+    one page at a time. Recipes generated together are always returned together on one page.
     Only requires language parameter - recipe IDs are determined from history table.
     
     - **appAccountToken**: Unique app account token (UUID generated locally)
     - **language**: Language code for localized content (default: en)
+    - **limit**: Entries per page (max: 100). Without limit or cursor up to
+      HISTORY_MAX_UNPAGED entries are returned; with a cursor but no limit, pages hold
+      HISTORY_PAGE_SIZE entries
+    - **cursor**: Pass next_cursor from the previous response to get the next page;
+      next_cursor is null on the last page
+    - **max_wait**: Translation deadline in seconds (default: HISTORY_TRANSLATION_DEADLINE).
+      Recipes not translated in time are returned in their original language with
+      translation_pending=true and finish translating in the background.
     """
+    after = None
+    page_size = limit or (HISTORY_PAGE_SIZE if cursor else HISTORY_MAX_UNPAGED)
+    if cursor:
+        try:
+            after = _decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid cursor: {cursor}",
+                headers={"X-Error-Code": "INVALID_CURSOR"}
+            )
+    
     try:
-        # Get all history entries for this user, ordered by creation date (newest first)
-        history_entries = (
-            db.query(History)
-            .filter(History.app_account_token == appAccountToken)
-            .order_by(History.created_at.desc())
-            .all()
+        # One page of groups, newest first. A batch is represented by its earliest
+        # row (its displayed created_at), so it is never split across pages.
+        earlier_in_batch = aliased(History)
+        query = (
+            select(History)
+            .where(
+                History.app_account_token == appAccountToken,
+                or_(
+                    History.generation_batch_id.is_(None),
+                    ~exists().where(
+                        earlier_in_batch.generation_batch_id == History.generation_batch_id,
+                        tuple_(earlier_in_batch.created_at, earlier_in_batch.id) < tuple_(History.created_at, History.id)
+                    )
+                )
+            )
         )
+        if after:
+            after_key = _cursor_bound(after[0], db.bind.dialect.name)
+            query = query.where(tuple_(History.created_at, History.id) < tuple_(after_key, after[1]))
+        query = query.order_by(History.created_at.desc(), History.id.desc()).limit(page_size + 1)
+        anchors = list((await db.scalars(query)).all())
         
-        if not history_entries:
+        next_cursor = None
+        if len(anchors) > page_size:
+            anchors = anchors[:page_size]
+            next_cursor = _encode_cursor(anchors[-1].created_at, anchors[-1].id)
+        
+        if not anchors:
             return HistoryResponse(history=[])
         
+        # Complete the batches on this page with the rest of their rows
+        batch_ids = [entry.generation_batch_id for entry in anchors if entry.generation_batch_id]
+        batch_members = defaultdict(list)
+        if batch_ids:
+            members = (await db.scalars(
+                select(History)
+                .where(
+                    History.app_account_token == appAccountToken,
+                    History.generation_batch_id.in_(batch_ids)
+                )
+                .order_by(History.created_at.desc(), History.id.desc())
+            )).all()
+            for entry in members:
+                batch_members[entry.generation_batch_id].append(entry)
+        
+        history_entries = [
+            entry
+            for anchor in anchors
+            for entry in (batch_members[anchor.generation_batch_id] if anchor.generation_batch_id else [anchor])
+        ]
+        
         # Get all recipe IDs
         recipe_ids = [entry.recipe_id for entry in history_entries]
         
         # Bulk fetch recipes from cache in requested language
-        cached_recipes = (
-            db.query(RecipeCache)
-            .filter(
+        cached_recipes = (await db.scalars(
+            select(RecipeCache)
+            .where(
                 RecipeCache.recipe_id.in_(recipe_ids),
                 RecipeCache.language == language
             )
-            .all()
-        )
+        )).all()
         
         # Create a map of recipe_id -> recipe for quick lookup
-        recipe_map = {recipe.recipe_id: recipe for recipe in cached_recipes}
+        recipe_map = {recipe.recipe_id: recipe_to_dict(recipe) for recipe in cached_recipes}
         
-        # Helper function to get or translate recipe
-        async def get_or_translate_recipe(recipe_id: str, entry_created_at: datetime) -> Optional[Recipe]:
-            """Get recipe in requested language, translate if needed"""
-            # Check if recipe exists in requested language
+        # Translate everything missing in one go (concurrently, bounded by deadline)
+        missing_ids = list(dict.fromkeys(rid for rid in recipe_ids if rid not in recipe_map))
+        translated, pending = await translation_service.translate_missing(
+            db=db,
+            recipe_ids=missing_ids,
+            language=language,
+            deadline=max_wait if max_wait is not None else settings.history_translation_deadline
+        )
+        recipe_map.update(translated)
+        
+        def build_recipe(recipe_id: str, entry_created_at: datetime) -> Optional[Recipe]:
+            """Get recipe in requested language (or untranslated source if still pending)"""
             recipe = recipe_map.get(recipe_id)
-            if recipe:
-                return Recipe(
-                    id=recipe.recipe_id,
-                    emoji=recipe.emoji,
-                    badge=recipe.badge,
-                    title=recipe.title,
-                    steps=json.loads(recipe.steps),
-                    ingredients=json.loads(recipe.ingredients) if recipe.ingredients else None,
-                    created_at=entry_created_at
-                )
-            
-            # Recipe not found in requested language - find in any language and translate
-            any_language_recipe = (
-                db.query(RecipeCache)
-                .filter(RecipeCache.recipe_id == recipe_id)
-                .first()
+            translation_pending = None
+            if recipe is None:
+                recipe = pending.get(recipe_id)
+                translation_pending = True
+            if recipe is None:
+                # Not found or translation failed - skip this recipe
+                return None
+            return Recipe(
+                id=recipe["id"],
+                emoji=recipe["emoji"],
+                badge=recipe["badge"],
+                title=recipe.get("title", ""),
+                steps=recipe.get("steps", []),
+                ingredients=recipe.get("ingredients") or None,
+                created_at=entry_created_at,
+                translation_pending=translation_pending
             )
-            
-            if any_language_recipe:
-                try:
-                    original_recipe = {
-                        "id": any_language_recipe.recipe_id,
-                        "emoji": any_language_recipe.emoji,
-                        "badge": any_language_recipe.badge,
-                        "title": any_language_recipe.title,
-                        "steps": json.loads(any_language_recipe.steps),
-                        "ingredients": json.loads(any_language_recipe.ingredients) if any_language_recipe.ingredients else []
-                    }
-                    
-                    # Translate recipe to requested language
-                    translated = await openai_service.translate_recipe(
-                        recipe=original_recipe,
-                        target_language=language
-                    )
-                    
-                    # Cache the translated recipe
-                    translated_cache = RecipeCache(
-                        recipe_id=translated["id"],
-                        language=language,
-                        emoji=translated.get("emoji", original_recipe["emoji"]),
-                        badge=translated.get("badge", original_recipe["badge"]),
-                        title=translated.get("title", ""),
-                        steps=json.dumps(translated.get("steps", [])),
-                        ingredients=json.dumps(translated.get("ingredients", [])) if translated.get("ingredients") else None
-                    )
-                    db.add(translated_cache)
-                    db.commit()
-                    
-                    # Update recipe_map for future lookups in this request
-                    recipe_map[recipe_id] = translated_cache
-                    
-                    return Recipe(
-                        id=translated["id"],
-                        emoji=translated.get("emoji", original_recipe["emoji"]),
-                        badge=translated.get("badge", original_recipe["badge"]),
-                        title=translated.get("title", ""),
-                        steps=translated.get("steps", []),
-                        ingredients=translated.get("ingredients"),
-                        created_at=entry_created_at
-                    )
-                except Exception as e:
-                    # Translation failed - return None (skip this recipe)
-                    return None
-            
-            return None
-        
-        # Group entries by batch_id (None means single recipe)
-        from collections import defaultdict
-        batch_groups = defaultdict(list)
-        single_entries = []
-        
-        for entry in history_entries:
-            if entry.generation_batch_id:
-                batch_groups[entry.generation_batch_id].append(entry)
-            else:
-                single_entries.append(entry)
         
-        # Build history response with grouped recipes
+        # Build history response with grouped recipes, in page order
         history_list = []
         
-        # Process batch groups (multiple recipes generated together)
-        for batch_id, entries in batch_groups.items():
-            # Get all recipes in this batch
+        for anchor in anchors:
+            if not anchor.generation_batch_id:
+                # Single entry (no batch_id or old entries)
+                recipe = build_recipe(anchor.recipe_id, anchor.created_at)
+                if recipe:
+                    history_list.append(HistoryEntry(
+                        recipe_id=recipe.id,
+                        emoji=recipe.emoji,
+                        badge=recipe.badge,
+                        title=recipe.title,
+                        steps=recipe.steps,
+                        ingredients=recipe.ingredients,
+                        created_at=anchor.created_at,
+                        recipes=None,
+                        translation_pending=recipe.translation_pending
+                    ))
+                continue
+            
+            # Batch group (multiple recipes generated together)
+            entries = batch_members[anchor.generation_batch_id]
             batch_recipes = []
             batch_created_at = None
             
             for entry in entries:
-                recipe = await get_or_translate_recipe(entry.recipe_id, entry.created_at)
+                recipe = build_recipe(entry.recipe_id, entry.created_at)
                 if recipe:
                     batch_recipes.append(recipe)
                     if batch_created_at is None or entry.created_at < batch_created_at:
@@ -453,31 +630,14 @@ async def get_history(
                     steps=primary.steps,
                     ingredients=primary.ingredients,
                     created_at=batch_created_at,
-                    recipes=batch_recipes if len(batch_recipes) > 1 else None
+                    recipes=batch_recipes if len(batch_recipes) > 1 else None,
+                    translation_pending=True if any(r.translation_pending for r in batch_recipes) else None
                 ))
         
-        # Process single entries (no batch_id or old entries)
-        for entry in single_entries:
-            recipe = await get_or_translate_recipe(entry.recipe_id, entry.created_at)
-            if recipe:
-                history_list.append(HistoryEntry(
-                    recipe_id=recipe.id,
-                    emoji=recipe.emoji,
-                    badge=recipe.badge,
-                    title=recipe.title,
-                    steps=recipe.steps,
-                    ingredients=recipe.ingredients,
-                    created_at=entry.created_at,
-                    recipes=None
-                ))
-        
-        # Sort by created_at descending (newest first)
-        history_list.sort(key=lambda x: x.created_at, reverse=True)
-        
-        return HistoryResponse(history=history_list)
+        return HistoryResponse(history=history_list, next_cursor=next_cursor)
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get history: {str(e)}",
@@ -488,7 +648,7 @@ async def get_history(
 @router.delete("/history")
 async def clear_history(
     appAccountToken: str = Query(..., description="Unique app account token (UUID generated locally)"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Clear all history for a user.
@@ -496,17 +656,17 @@ async def clear_history(
     - **appAccountToken**: Unique app account token (UUID generated locally)
     """
     try:
-        deleted_count = (
-            db.query(History)
-            .filter(History.app_account_token == appAccountToken)
-            .delete()
+        result = await db.execute(
+            delete(History)
+            .where(History.app_account_token == appAccountToken)
         )
-        db.commit()
+        deleted_count = result.rowcount
+        await db.commit()
         
         return {"message": "History cleared successfully", "deleted_count": deleted_count}
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to clear history: {str(e)}",
@@ -518,7 +678,7 @@ async def clear_history(
 async def delete_history_entry(
     recipe_id: str,
     appAccountToken: str = Query(..., description="Unique app account token (UUID generated locally)"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete a recipe from user's history.
@@ -527,13 +687,12 @@ async def delete_history_entry(
     - **appAccountToken**: Unique app account token (UUID generated locally)
     """
     try:
-        history_entry = (
-            db.query(History)
-            .filter(
+        history_entry = await db.scalar(
+            select(History)
+            .where(
                 History.app_account_token == appAccountToken,
                 History.recipe_id == recipe_id
             )
-            .first()
         )
         
         if not history_entry:
@@ -543,15 +702,15 @@ async def delete_history_entry(
                 headers={"X-Error-Code": "HISTORY_ENTRY_NOT_FOUND"}
             )
         
-        db.delete(history_entry)
-        db.commit()
+        await db.delete(history_entry)
+        await db.commit()
         
         return {"message": "History entry deleted successfully"}
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Failed to delete history entry: {str(e)}",
@@ -1,15 +1,17 @@
 """Subscription router - receipt verification and status"""
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from pydantic import BaseModel, Field
 from uuid import UUID
 from datetime import datetime
 
-from app.db import get_db
+from app.db import get_async_db
 from app.models import Subscription
 from app.services.receipt_service import receipt_service
 from app.services.usage_service import usage_service
+from app.services.entitlement_service import entitlement_service
 from app.schemas import SubscriptionStatus, ErrorResponse
 
 router = APIRouter(prefix="/api/v1/subscription", tags=["Subscription"])
@@ -26,7 +28,7 @@ class VerifyReceiptRequest(BaseModel):
 @router.post("/verify-receipt")
 async def verify_receipt(
     request: VerifyReceiptRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Verify App Store/Play Store receipt and cache subscription status.
@@ -82,13 +84,12 @@ async def verify_receipt(
                 pass
         
         # Store or update subscription in database
-        subscription = (
-            db.query(Subscription)
-            .filter(
+        subscription = await db.scalar(
+            select(Subscription)
+            .where(
                 Subscription.app_account_token == request.app_account_token,
                 Subscription.platform == request.platform
             )
-            .first()
         )
         
         if subscription:
@@ -111,8 +112,9 @@ async def verify_receipt(
             )
             db.add(subscription)
         
-        db.commit()
-        db.refresh(subscription)
+        await db.commit()
+        await db.refresh(subscription)
+        entitlement_service.invalidate(request.app_account_token)
         
         # Determine plan from product_id
         plan = "free"
@@ -139,21 +141,18 @@ async def verify_receipt(
 @router.get("/status")
 async def get_subscription_status(
     appAccountToken: str = Query(..., description="Unique app account token"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Get subscription status for a given appAccountToken.
     
-    Returns 'free' plan if no subscription found.
+    Returns 'free' plan if no subscription found. Read-only: a lapsed
+    subscription is reported as expired here and marked expired in the
+    database by the background sweeper.
     """
-    subscription = (
-        db.query(Subscription)
-        .filter(Subscription.app_account_token == appAccountToken)
-        .order_by(Subscription.created_at.desc())
-        .first()
-    )
+    entitlement = await entitlement_service.get(db, appAccountToken)
     
-    if not subscription:
+    if not entitlement.subscription_id:
         # No subscription found - return free plan
         return SubscriptionStatus(
             plan="free",
@@ -162,22 +161,12 @@ async def get_subscription_status(
             started_at=None
         )
     
-    # Check if subscription is expired
-    current_status = subscription.status
-    if subscription.expires_at and subscription.expires_at < datetime.now():
-        current_status = "expired"
-        # Update database
-        subscription.status = "expired"
-        db.commit()
-    
-    # Determine plan from product_id
-    plan = "free"
-    if subscription.product_id in ["premium", "premium_annual"]:
-        plan = subscription.product_id
+    # Effective status (the sweeper persists it)
+    current_status = "expired" if entitlement.is_expired else entitlement.status
     
     return SubscriptionStatus(
-        plan=plan,
+        plan=entitlement.plan,
         status=current_status,
-        expires_at=subscription.expires_at,
-        started_at=subscription.created_at
+        expires_at=entitlement.expires_at,
+        started_at=entitlement.started_at
     )
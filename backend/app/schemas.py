@@ -40,6 +40,7 @@ class Recipe(BaseModel):
     steps: List[str]
     ingredients: Optional[List[str]] = None
     created_at: Optional[datetime] = None
+    translation_pending: Optional[bool] = None  # True if still in original language (translation running)
 
 
 class RecipeGenerationResponse(BaseModel):
@@ -75,8 +76,10 @@ class HistoryEntry(BaseModel):
     ingredients: Optional[List[str]] = None  # Ingredients from primary recipe (for backward compatibility)
     created_at: datetime
     recipes: Optional[List[Recipe]] = None  # All recipes in this batch (if grouped)
+    translation_pending: Optional[bool] = None  # True if any recipe is not translated yet
 
 
 class HistoryResponse(BaseModel):
     """Response model for history"""
     history: List[HistoryEntry]
+    next_cursor: Optional[str] = None  # Pass as ?cursor= to get the next page (None on the last page)
@@ -0,0 +1,208 @@
+"""Local verification of App Store (StoreKit 2) signed transactions (JWS)"""
+import base64
+import json
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+
+from app.metrics import CACHE_ENTRIES, CACHE_EVICTIONS, CACHE_LOOKUPS
+
+
+# SHA-256 fingerprint of Apple Root CA - G3 (https://www.apple.com/certificateauthority/)
+APPLE_ROOT_CA_G3_FINGERPRINT = "63343abfb89a6a03ebb57e9b3f5fa7be7c4f5c756f3017b3a8c488c3653e9179"
+
+# Marker extensions Apple puts on the signing certificates
+APPLE_LEAF_OID = x509.ObjectIdentifier("1.2.840.113635.100.6.11.1")
+APPLE_INTERMEDIATE_OID = x509.ObjectIdentifier("1.2.840.113635.100.6.2.1")
+
+
+# A compact JWS segment is unpadded base64url
+_SEGMENT_RE = re.compile(r"[A-Za-z0-9_-]+")
+
+
+class JWSVerificationError(ValueError):
+    """Signed transaction is malformed, untrusted or has a bad signature"""
+
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def load_root_fingerprints(path: Optional[str]) -> Tuple[str, ...]:
+    """
+    SHA-256 fingerprints of the trusted roots
+
+    Args:
+        path: Optional PEM or DER certificate file to pin instead of Apple Root CA - G3
+
+    Returns:
+        Lowercase hex fingerprints
+    """
+    if not path:
+        return (APPLE_ROOT_CA_G3_FINGERPRINT,)
+    with open(path, "rb") as f:
+        data = f.read()
+    if b"-----BEGIN CERTIFICATE-----" in data:
+        certs = x509.load_pem_x509_certificates(data)
+    else:
+        certs = [x509.load_der_x509_certificate(data)]
+    return tuple(cert.fingerprint(hashes.SHA256()).hex() for cert in certs)
+
+
+class AppleJWSVerifier:
+    """
+    Verifies StoreKit 2 signed transactions without calling Apple
+
+    The x5c chain in the JWS header must be leaf -> Apple intermediate -> a
+    pinned root, each certificate signed by the next and currently valid.
+    Verified chains are cached by their header segment (Apple signs with a
+    handful of certificates), so after the first token only the ES256
+    signature check and claim decoding run.
+    """
+
+    def __init__(
+        self,
+        root_fingerprints: Iterable[str],
+        max_chains: int = 64,
+        require_apple_oids: bool = True
+    ):
+        self.root_fingerprints = {fp.lower().replace(":", "") for fp in root_fingerprints}
+        self.max_chains = max_chains
+        # Fixture chains signed by a test root don't carry Apple's marker extensions
+        self.require_apple_oids = require_apple_oids
+        # header segment -> (leaf public key, chain not_valid_after)
+        self._chains: "OrderedDict[str, Tuple[ec.EllipticCurvePublicKey, datetime]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Exported at /metrics as cache="apple_jws_chain"
+        self._hits = CACHE_LOOKUPS.labels("apple_jws_chain", "hit")
+        self._misses = CACHE_LOOKUPS.labels("apple_jws_chain", "miss")
+        self._evictions = CACHE_EVICTIONS.labels("apple_jws_chain")
+        self._size = CACHE_ENTRIES.labels("apple_jws_chain")
+
+    def verify(self, signed_payload: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Verify a signed transaction and return its claims
+
+        Args:
+            signed_payload: Compact JWS (header.payload.signature)
+            now: Time the chain must be valid at (defaults to the current time)
+
+        Returns:
+            Decoded JWS payload (transaction claims)
+
+        Raises:
+            JWSVerificationError: If the token can't be trusted
+        """
+        now = now or datetime.now(timezone.utc)
+        try:
+            header_segment, payload_segment, signature_segment = signed_payload.split(".")
+        except ValueError:
+            raise JWSVerificationError("Not a compact JWS")
+        for segment in (header_segment, payload_segment, signature_segment):
+            if not _SEGMENT_RE.fullmatch(segment):
+                raise JWSVerificationError("JWS segment is not base64url")
+
+        public_key = self._leaf_key(header_segment, now)
+
+        try:
+            signature = _b64url_decode(signature_segment)
+        except ValueError:
+            raise JWSVerificationError("Invalid signature encoding")
+        if len(signature) != 64:
+            raise JWSVerificationError("Invalid ES256 signature length")
+        der_signature = encode_dss_signature(
+            int.from_bytes(signature[:32], "big"),
+            int.from_bytes(signature[32:], "big")
+        )
+        try:
+            public_key.verify(
+                der_signature,
+                f"{header_segment}.{payload_segment}".encode("ascii"),
+                ec.ECDSA(hashes.SHA256())
+            )
+        except InvalidSignature:
+            raise JWSVerificationError("Signature does not match")
+
+        try:
+            payload = json.loads(_b64url_decode(payload_segment))
+        except ValueError:
+            raise JWSVerificationError("Payload is not JSON")
+        if not isinstance(payload, dict):
+            raise JWSVerificationError("Payload is not a JSON object")
+        return payload
+
+    def _leaf_key(self, header_segment: str, now: datetime) -> ec.EllipticCurvePublicKey:
+        with self._lock:
+            cached = self._chains.get(header_segment)
+            if cached is not None:
+                self._chains.move_to_end(header_segment)
+        if cached is not None and now <= cached[1]:
+            self._hits.inc()
+            return cached[0]
+
+        self._misses.inc()
+        public_key, not_after = self._verify_chain(header_segment, now)
+        if self.max_chains > 0:
+            with self._lock:
+                self._chains[header_segment] = (public_key, not_after)
+                self._chains.move_to_end(header_segment)
+                while len(self._chains) > self.max_chains:
+                    self._chains.popitem(last=False)
+                    self._evictions.inc()
+                self._size.set(len(self._chains))
+        return public_key
+
+    def _verify_chain(self, header_segment: str, now: datetime) -> Tuple[ec.EllipticCurvePublicKey, datetime]:
+        try:
+            header = json.loads(_b64url_decode(header_segment))
+        except ValueError:
+            raise JWSVerificationError("Header is not JSON")
+        if not isinstance(header, dict):
+            raise JWSVerificationError("Header is not a JSON object")
+        if header.get("alg") != "ES256":
+            raise JWSVerificationError(f"Unsupported algorithm: {header.get('alg')}")
+        x5c = header.get("x5c")
+        if not isinstance(x5c, list) or len(x5c) != 3:
+            raise JWSVerificationError("Expected a 3-certificate x5c chain")
+
+        try:
+            leaf, intermediate, root = [
+                x509.load_der_x509_certificate(base64.b64decode(cert)) for cert in x5c
+            ]
+        except (ValueError, TypeError):
+            raise JWSVerificationError("Invalid certificate in x5c chain")
+
+        if root.fingerprint(hashes.SHA256()).hex() not in self.root_fingerprints:
+            raise JWSVerificationError("Root certificate is not trusted")
+
+        for cert in (leaf, intermediate, root):
+            if not cert.not_valid_before_utc <= now <= cert.not_valid_after_utc:
+                raise JWSVerificationError("Certificate is expired or not yet valid")
+
+        if self.require_apple_oids:
+            for cert, oid in ((leaf, APPLE_LEAF_OID), (intermediate, APPLE_INTERMEDIATE_OID)):
+                try:
+                    cert.extensions.get_extension_for_oid(oid)
+                except x509.ExtensionNotFound:
+                    raise JWSVerificationError("Certificate is not an App Store signing certificate")
+
+        try:
+            leaf.verify_directly_issued_by(intermediate)
+            intermediate.verify_directly_issued_by(root)
+        except (ValueError, TypeError, InvalidSignature):
+            raise JWSVerificationError("Certificate chain does not verify")
+
+        public_key = leaf.public_key()
+        if not isinstance(public_key, ec.EllipticCurvePublicKey):
+            raise JWSVerificationError("Leaf certificate key is not EC")
+        not_after = min(cert.not_valid_after_utc for cert in (leaf, intermediate, root))
+        return public_key, not_after
+
@@ -0,0 +1,145 @@
+"""Entitlement resolver - cached subscription tier lookups"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.metrics import CACHE_ENTRIES, CACHE_EVICTIONS, CACHE_LOOKUPS
+from app.models import Subscription
+
+
+PREMIUM_PRODUCTS = ("premium", "premium_annual")
+
+
+def _now_like(value: datetime) -> datetime:
+    """Current time with the same tz-awareness as a stored datetime"""
+    if value.tzinfo is not None:
+        return datetime.now(timezone.utc)
+    return datetime.now()
+
+
+@dataclass(frozen=True)
+class Entitlement:
+    """Snapshot of a user's latest subscription (empty if they never subscribed)"""
+    subscription_id: Optional[str] = None
+    product_id: Optional[str] = None
+    status: Optional[str] = None
+    expires_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+
+    @property
+    def is_expired(self) -> bool:
+        return self.expires_at is not None and self.expires_at < _now_like(self.expires_at)
+
+    @property
+    def is_premium(self) -> bool:
+        """Active, unexpired premium subscription"""
+        return (
+            self.status == "active"
+            and not self.is_expired
+            and self.product_id in PREMIUM_PRODUCTS
+        )
+
+    @property
+    def plan(self) -> str:
+        return self.product_id if self.product_id in PREMIUM_PRODUCTS else "free"
+
+
+class EntitlementService:
+    """
+    Resolves a user's subscription tier with an in-memory LRU/TTL cache (one per worker)
+
+    Entries expire after entitlement_cache_ttl_seconds, or earlier at the
+    subscription's own expires_at so premium access never outlives it.
+    verify_receipt invalidates the entry in the worker that handled it; other
+    workers pick up the change within the TTL.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # token -> (monotonic deadline, Entitlement)
+        self._entries: OrderedDict = OrderedDict()
+        # Exported at /metrics as cache="entitlement"
+        self._hits = CACHE_LOOKUPS.labels("entitlement", "hit")
+        self._misses = CACHE_LOOKUPS.labels("entitlement", "miss")
+        self._evictions = CACHE_EVICTIONS.labels("entitlement")
+        self._size = CACHE_ENTRIES.labels("entitlement")
+
+    async def get(self, db: AsyncSession, app_account_token: str) -> Entitlement:
+        """
+        Get the entitlement snapshot for an app account token
+
+        Args:
+            db: Database session (only used on cache miss)
+            app_account_token: App account token (UUID)
+
+        Returns:
+            Entitlement for the latest subscription
+        """
+        token = str(app_account_token)
+        entry = self._entries.get(token)
+        if entry is not None and entry[0] >= time.monotonic():
+            self._entries.move_to_end(token)
+            self._hits.inc()
+            return entry[1]
+
+        self._misses.inc()
+        entitlement = await self._load(db, token)
+        self._store(token, entitlement)
+        return entitlement
+
+    async def is_premium(self, db: AsyncSession, app_account_token: str) -> bool:
+        """Whether the user currently has an active premium subscription"""
+        return (await self.get(db, app_account_token)).is_premium
+
+    def invalidate(self, app_account_token: str) -> None:
+        """Drop the cached entry (call after the subscription changes)"""
+        self._entries.pop(str(app_account_token), None)
+        self._size.set(len(self._entries))
+
+    @staticmethod
+    async def _load(db: AsyncSession, token: str) -> Entitlement:
+        subscription = await db.scalar(
+            select(Subscription)
+            .where(Subscription.app_account_token == token)
+            .order_by(Subscription.created_at.desc())
+            .limit(1)
+        )
+        if not subscription:
+            return Entitlement()
+        return Entitlement(
+            subscription_id=subscription.id,
+            product_id=subscription.product_id,
+            status=subscription.status,
+            expires_at=subscription.expires_at,
+            started_at=subscription.created_at,
+        )
+
+    def _store(self, token: str, entitlement: Entitlement) -> None:
+        if self.max_entries <= 0:
+            return
+        ttl = float(self.ttl_seconds)
+        if entitlement.expires_at is not None:
+            # Expire together with the subscription
+            remaining = (entitlement.expires_at - _now_like(entitlement.expires_at)).total_seconds()
+            if remaining > 0:
+                ttl = min(ttl, remaining)
+            # Already lapsed: the effective status is computed from expires_at, cache for the full TTL
+        self._entries[token] = (time.monotonic() + ttl, entitlement)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions.inc()
+        self._size.set(len(self._entries))
+
+
+entitlement_service = EntitlementService(
+    max_entries=settings.entitlement_cache_max_entries,
+    ttl_seconds=settings.entitlement_cache_ttl_seconds,
+)
@@ -0,0 +1,114 @@
+"""Exact-match cache for recipe generation results"""
+import copy
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.metrics import CACHE_ENTRIES, CACHE_EVICTIONS, CACHE_LOOKUPS
+
+
+class GenerationCache:
+    """
+    In-memory LRU cache for recipe generation results (one per worker)
+
+    Keyed on the normalized ingredient set plus everything else that changes
+    the prompt (language, max_recipes, user tier, diet preferences).
+    Entries expire after a TTL; the least recently used entry is evicted
+    when the cache is full.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, enabled: bool = True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self._entries: "OrderedDict[Tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        # Exported at /metrics as cache="generation"
+        self._hits = CACHE_LOOKUPS.labels("generation", "hit")
+        self._misses = CACHE_LOOKUPS.labels("generation", "miss")
+        self._evictions = CACHE_EVICTIONS.labels("generation")
+        self._size = CACHE_ENTRIES.labels("generation")
+
+    @staticmethod
+    def make_key(
+        ingredients: List[Any],
+        language: str,
+        max_recipes: int,
+        user_tier: str,
+        diet_preferences: Optional[Dict[str, Any]] = None
+    ) -> Tuple:
+        """
+        Build cache key from generation inputs
+
+        Ingredient names are stripped, case-folded, de-duplicated and sorted,
+        so "Milk, eggs" and "eggs, milk " hit the same entry.
+        """
+        names = set()
+        for ing in ingredients:
+            if isinstance(ing, dict):
+                name = ing.get("name", "")
+            else:
+                name = getattr(ing, "name", "")
+            name = name.strip().casefold()
+            if name:
+                names.add(name)
+
+        constraints = ()
+        if diet_preferences:
+            constraints = tuple(
+                (field, tuple(sorted(v.strip().casefold() for v in diet_preferences.get(field) or [])))
+                for field in ("avoid_ingredients", "diet_style", "cooking_preferences", "religious")
+            )
+
+        return (
+            tuple(sorted(names)),
+            language.lower(),
+            max_recipes,
+            user_tier,
+            constraints,
+        )
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """
+        Get cached generation result
+
+        Returns:
+            Dict with recipes and a fresh generation_id, or None on miss
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+                self._size.set(len(self._entries))
+            self._misses.inc()
+            return None
+
+        self._entries.move_to_end(key)
+        self._hits.inc()
+        return {
+            "recipes": copy.deepcopy(entry[1]),
+            "generation_id": f"gen_{str(uuid.uuid4())[:12]}"
+        }
+
+    def set(self, key: Tuple, result: Dict[str, Any]) -> None:
+        """Store generation result (empty results are not cached)"""
+        if not self.enabled or not result.get("recipes"):
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(result["recipes"]))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions.inc()
+        self._size.set(len(self._entries))
+
+
+generation_cache = GenerationCache(
+    max_entries=settings.generation_cache_max_entries,
+    ttl_seconds=settings.generation_cache_ttl_seconds,
+    enabled=settings.generation_cache_enabled,
+)
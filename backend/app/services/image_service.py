@@ -0,0 +1,329 @@
+"""Image preprocessing service - shrinks uploads before the vision call"""
+import asyncio
+import io
+import math
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, BinaryIO
+
+from fastapi import UploadFile
+
+from PIL import Image, ImageOps
+
+from app.config import settings
+
+
+# OpenAI vision pricing model (high detail): the image is fitted into 2048x2048,
+# then scaled so the shortest side is at most 768px, then billed per 512px tile
+VISION_MAX_SIDE = 2048
+VISION_SHORT_SIDE = 768
+VISION_TILE = 512
+VISION_BASE_TOKENS = 85
+VISION_TILE_TOKENS = 170
+
+EXIF_ORIENTATION = 0x0112
+
+# Shrink an extra bit (at most 15%) if that saves a whole row/column of tiles
+TILE_SNAP_TOLERANCE = 0.15
+
+
+@dataclass
+class PreparedImage:
+    """Image ready to be sent to the vision API"""
+    data: bytes
+    content_type: str
+    detail: str  # 'low' or 'high'
+    width: int
+    height: int
+    original_bytes: int
+    original_tokens: int
+    tokens: int
+
+
+class ImageProcessingError(Exception):
+    """Raised when an uploaded image cannot be decoded"""
+
+
+class UploadRejected(Exception):
+    """Raised when an upload fails validation (too large, wrong type)"""
+
+    def __init__(self, detail: str, status_code: int, error_code: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.error_code = error_code
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Detect image MIME type from magic bytes (None if not JPEG/PNG/WebP)"""
+    if head[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if head[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def _tiles(width: int, height: int) -> int:
+    return math.ceil(width / VISION_TILE) * math.ceil(height / VISION_TILE)
+
+
+def _fit_for_vision(width: int, height: int) -> Tuple[int, int]:
+    """Size the vision API would downscale the image to in high detail"""
+    scale = min(1.0, VISION_MAX_SIDE / max(width, height))
+    short_side = min(width, height) * scale
+    if short_side > VISION_SHORT_SIDE:
+        scale *= VISION_SHORT_SIDE / short_side
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def _fit_within(size: Tuple[int, int], max_side: int) -> Tuple[int, int]:
+    scale = min(1.0, max_side / max(size))
+    return max(1, int(size[0] * scale)), max(1, int(size[1] * scale))
+
+
+def _snap_to_tiles(width: int, height: int) -> Tuple[int, int]:
+    """Shrink slightly when a dimension just spills over a tile boundary"""
+    best = (width, height)
+    best_tiles = _tiles(width, height)
+    for dim in (width, height):
+        tiles = math.ceil(dim / VISION_TILE)
+        if tiles <= 1:
+            continue
+        scale = (tiles - 1) * VISION_TILE / dim
+        if scale < 1 - TILE_SNAP_TOLERANCE:
+            continue
+        candidate = (max(1, int(width * scale)), max(1, int(height * scale)))
+        if _tiles(*candidate) < best_tiles:
+            best, best_tiles = candidate, _tiles(*candidate)
+    return best
+
+
+def estimate_tokens(width: int, height: int, detail: str = "high") -> int:
+    """Estimate vision input tokens for an image of the given size"""
+    if detail == "low":
+        return VISION_BASE_TOKENS
+    fitted = _fit_for_vision(width, height)
+    return VISION_BASE_TOKENS + VISION_TILE_TOKENS * _tiles(*fitted)
+
+
+def _plan(img: Image.Image) -> Tuple[Tuple[int, int], Tuple[int, int], str]:
+    """Work out original (displayed) size, target size and detail level from the header"""
+    width, height = img.size
+    if width * height > settings.image_max_pixels:
+        raise ImageProcessingError(f"Image too large: {width}x{height} pixels")
+    if img.getexif().get(EXIF_ORIENTATION) in (5, 6, 7, 8):
+        # Rotated 90 degrees - displayed size is transposed
+        width, height = height, width
+    target = _snap_to_tiles(*_fit_for_vision(width, height))
+
+    # Decide detail level: images that fit in one tile lose nothing at low detail
+    detail = settings.vision_detail
+    if detail == "auto":
+        detail = "low" if max(target) <= VISION_TILE else "high"
+    if detail == "low":
+        target = _fit_within(target, VISION_TILE)
+    return (width, height), target, detail
+
+
+def estimate_decode_bytes(source: BinaryIO) -> int:
+    """
+    Estimate peak memory needed to preprocess an image (reads the header only)
+
+    JPEGs are decoded at a reduced scale (draft mode), so the estimate uses the
+    draft size rather than the full resolution.
+    """
+    try:
+        img = Image.open(source)
+        _, target, _ = _plan(img)
+        img.draft("RGB", (max(target), max(target)))
+        bands = len(img.getbands())
+        return img.size[0] * img.size[1] * max(bands, 3) * 2 + target[0] * target[1] * 3
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageProcessingError(f"Could not decode image: {str(e)}")
+    finally:
+        source.seek(0)
+
+
+def preprocess_image(source: BinaryIO, size: int) -> PreparedImage:
+    """
+    Downscale, strip EXIF and re-encode a single image (CPU-bound, runs in worker pool)
+
+    Args:
+        source: Seekable file object with the uploaded image (read lazily by Pillow)
+        size: Upload size in bytes
+
+    Returns:
+        PreparedImage with compact JPEG bytes and token estimates
+    """
+    try:
+        img = Image.open(source)
+        original_size, target, detail = _plan(img)
+
+        # JPEG can decode straight at a reduced scale - much faster for phone photos
+        img.draft("RGB", (max(target), max(target)))
+        img = ImageOps.exif_transpose(img)
+        if img.mode in ("RGBA", "LA", "P"):
+            img = img.convert("RGBA")
+            background = Image.new("RGB", img.size, (255, 255, 255))
+            background.paste(img, mask=img.getchannel("A"))
+            img = background
+        elif img.mode != "RGB":
+            img = img.convert("RGB")
+
+        if img.size != target:
+            img = img.resize(target, Image.LANCZOS)
+
+        # Re-encode without EXIF/ICC metadata
+        out = io.BytesIO()
+        img.save(out, format="JPEG", quality=settings.image_jpeg_quality, optimize=True)
+        encoded = out.getvalue()
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageProcessingError(f"Could not decode image: {str(e)}")
+
+    return PreparedImage(
+        data=encoded,
+        content_type="image/jpeg",
+        detail=detail,
+        width=img.size[0],
+        height=img.size[1],
+        original_bytes=size,
+        original_tokens=estimate_tokens(*original_size),
+        tokens=estimate_tokens(*img.size, detail=detail),
+    )
+
+
+class MemoryBudget:
+    """
+    Async byte-weighted semaphore bounding decode memory per worker
+
+    Reservations larger than the whole budget are clamped so a single
+    oversized image still runs (alone).
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Created on first use so it binds to the running event loop
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    @asynccontextmanager
+    async def reserve(self, nbytes: int):
+        nbytes = min(nbytes, self.limit)
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.used + nbytes <= self.limit)
+            self.used += nbytes
+        try:
+            yield
+        finally:
+            async with condition:
+                self.used -= nbytes
+                condition.notify_all()
+
+
+class ImageService:
+    """Runs image preprocessing in a worker pool so it never blocks the event loop"""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.image_workers,
+            thread_name_prefix="image-preprocess"
+        )
+        self.memory_budget = MemoryBudget(settings.image_memory_budget)
+
+    async def validate_upload(self, upload: UploadFile) -> int:
+        """
+        Read an upload back in chunks, checking magic bytes and the per-file size
+
+        By the time a route runs the form has already been received and spooled,
+        so this doesn't bound ingress: the request total is capped while it is
+        received by UploadLimitMiddleware. This check enforces MAX_UPLOAD_SIZE per
+        file and rejects non-images before decoding, holding one chunk in memory at
+        a time; the file is rewound afterwards so preprocessing can read it again.
+
+        Args:
+            upload: Uploaded file
+
+        Returns:
+            Upload size in bytes
+
+        Raises:
+            UploadRejected: If the file is over MAX_UPLOAD_SIZE, empty or not a supported image
+        """
+        size = 0
+        while True:
+            chunk = await upload.read(settings.upload_chunk_size)
+            if not chunk:
+                break
+            if size == 0 and sniff_content_type(chunk) is None:
+                raise UploadRejected(
+                    f"Invalid file type: {upload.filename}. Only JPEG, PNG and WebP images are allowed.",
+                    status_code=400,
+                    error_code="INVALID_FILE_TYPE"
+                )
+            size += len(chunk)
+            if size > settings.max_upload_size:
+                raise UploadRejected(
+                    f"Image {upload.filename} exceeds maximum size of {settings.max_upload_size} bytes",
+                    status_code=413,
+                    error_code="PAYLOAD_TOO_LARGE"
+                )
+        if size == 0:
+            raise UploadRejected(
+                f"Empty file: {upload.filename}",
+                status_code=400,
+                error_code="INVALID_FILE_TYPE"
+            )
+        await upload.seek(0)
+        return size
+
+    async def _prepare(self, upload: UploadFile, size: int) -> PreparedImage:
+        loop = asyncio.get_running_loop()
+        cost = await loop.run_in_executor(self._executor, estimate_decode_bytes, upload.file)
+        async with self.memory_budget.reserve(cost):
+            return await loop.run_in_executor(self._executor, preprocess_image, upload.file, size)
+
+    async def prepare_uploads(self, uploads: List[UploadFile], sizes: List[int]) -> List[PreparedImage]:
+        """
+        Preprocess validated uploads concurrently within the memory budget
+
+        Args:
+            uploads: Uploaded files (already checked by validate_upload)
+            sizes: Upload sizes returned by validate_upload
+
+        Returns:
+            List of PreparedImage in the same order
+        """
+        return list(await asyncio.gather(*[
+            self._prepare(upload, size) for upload, size in zip(uploads, sizes)
+        ]))
+
+    @staticmethod
+    def savings(prepared: List[PreparedImage]) -> Dict[str, Any]:
+        """Summarize bytes and estimated vision tokens saved for a request"""
+        original_bytes = sum(p.original_bytes for p in prepared)
+        sent_bytes = sum(len(p.data) for p in prepared)
+        original_tokens = sum(p.original_tokens for p in prepared)
+        sent_tokens = sum(p.tokens for p in prepared)
+        return {
+            "original_bytes": original_bytes,
+            "bytes": sent_bytes,
+            "bytes_saved": original_bytes - sent_bytes,
+            "original_tokens": original_tokens,
+            "tokens": sent_tokens,
+            "tokens_saved": original_tokens - sent_tokens,
+        }
+
+    def shutdown(self) -> None:
+        """Stop worker threads (called on application shutdown)"""
+        self._executor.shutdown(wait=False)
+
+
+image_service = ImageService()
@@ -0,0 +1,177 @@
+"""Async gateway for all OpenAI API calls"""
+import asyncio
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.config import settings
+from app.services.llm_usage import llm_usage, usage_tokens
+
+
+class LLMGateway:
+    """
+    Shared, pooled async OpenAI client.
+
+    One instance per worker. All LLM calls go through `chat()` so they share
+    keep-alive connections, respect a per-worker concurrency cap and use the
+    timeout configured for their feature ('detection', 'generation', 'translation').
+    Every call's tokens, latency and finish reason are recorded by llm_usage.
+    """
+
+    def __init__(self):
+        self._client: Optional[AsyncOpenAI] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.max_concurrency = settings.openai_max_concurrency
+        self.timeouts: Dict[str, float] = {
+            "detection": settings.openai_timeout_detection,
+            "generation": settings.openai_timeout_generation,
+            "translation": settings.openai_timeout_translation,
+        }
+        self.in_flight = 0
+
+    @property
+    def client(self) -> AsyncOpenAI:
+        """Lazily create the shared client (keep-alive connection pool)"""
+        if self._client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.openai_max_connections,
+                    max_keepalive_connections=settings.openai_max_keepalive_connections,
+                    keepalive_expiry=settings.openai_keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(
+                    settings.openai_timeout_generation,
+                    connect=settings.openai_connect_timeout,
+                ),
+            )
+            self._client = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                base_url=settings.openai_base_url,
+                max_retries=settings.openai_max_retries,
+                http_client=http_client,
+            )
+        return self._client
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created on first use so it binds to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def timeout_for(self, feature: str) -> float:
+        """Get request timeout (seconds) for a feature"""
+        return self.timeouts.get(feature, settings.openai_timeout_generation)
+
+    async def chat(
+        self,
+        feature: str,
+        language: Optional[str] = None,
+        tier: Optional[str] = None,
+        **kwargs: Any
+    ) -> Any:
+        """
+        Create a chat completion without blocking the event loop
+
+        Args:
+            feature: Feature name used to pick the timeout
+            language: Request language (metrics label)
+            tier: 'free', 'premium' or 'shared' (metrics label)
+            **kwargs: Arguments for `chat.completions.create`
+
+        Returns:
+            OpenAI ChatCompletion response
+        """
+        async with self._get_semaphore():
+            self.in_flight += 1
+            start = time.perf_counter()
+            try:
+                response = await self.client.chat.completions.create(
+                    timeout=self.timeout_for(feature),
+                    **kwargs
+                )
+            except Exception:
+                llm_usage.record(
+                    feature, kwargs.get("model"), language, tier,
+                    None, None, "error", time.perf_counter() - start
+                )
+                raise
+            finally:
+                self.in_flight -= 1
+        llm_usage.record_response(
+            feature, kwargs.get("model"), language, tier, response, time.perf_counter() - start
+        )
+        return response
+
+    async def stream_chat(
+        self,
+        feature: str,
+        language: Optional[str] = None,
+        tier: Optional[str] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive
+
+        The concurrency slot is held until the stream is exhausted or closed.
+        Token usage arrives in a final chunk (stream_options.include_usage);
+        a stream closed before its last chunk (the client disconnected) is
+        recorded with finish reason 'cancelled', so callers that only need
+        part of the output should still read it to the end.
+
+        Args:
+            feature: Feature name used to pick the timeout
+            language: Request language (metrics label)
+            tier: 'free', 'premium' or 'shared' (metrics label)
+            **kwargs: Arguments for `chat.completions.create`
+
+        Yields:
+            Text deltas
+        """
+        if settings.openai_stream_usage:
+            kwargs.setdefault("extra_body", {})["stream_options"] = {"include_usage": True}
+        async with self._get_semaphore():
+            self.in_flight += 1
+            stream = None
+            start = time.perf_counter()
+            model = kwargs.get("model")
+            usage = None
+            finish_reason = "cancelled"
+            try:
+                stream = await self.client.chat.completions.create(
+                    timeout=self.timeout_for(feature),
+                    stream=True,
+                    **kwargs
+                )
+                async for chunk in stream:
+                    model = getattr(chunk, "model", None) or model
+                    usage = getattr(chunk, "usage", None) or usage
+                    if chunk.choices:
+                        if chunk.choices[0].finish_reason:
+                            finish_reason = chunk.choices[0].finish_reason
+                        if chunk.choices[0].delta.content:
+                            yield chunk.choices[0].delta.content
+            except Exception:
+                finish_reason = "error"
+                raise
+            finally:
+                self.in_flight -= 1
+                if stream is not None:
+                    # Release the connection if the caller stopped early
+                    await stream.response.aclose()
+                llm_usage.record(
+                    feature, model, language, tier,
+                    *usage_tokens(usage),
+                    finish_reason,
+                    time.perf_counter() - start
+                )
+
+    async def aclose(self) -> None:
+        """Close pooled connections (called on application shutdown)"""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+llm_gateway = LLMGateway()
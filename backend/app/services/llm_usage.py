@@ -0,0 +1,293 @@
+"""Token, latency and cost accounting for LLM calls"""
+import asyncio
+import threading
+from datetime import date
+from typing import Any, Dict, Optional, Tuple
+
+from prometheus_client import Counter, Histogram
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.config import settings
+from app.db import AsyncSessionLocal
+from app.models import LLMUsageDaily
+from app.services.prompt_registry import SUPPORTED_LANGUAGES
+
+
+# USD per 1M tokens (input, output); override or extend with LLM_PRICES
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+}
+
+LABELS = ("feature", "model", "language", "tier")
+
+LLM_REQUESTS = Counter(
+    "llm_requests_total",
+    "LLM calls by outcome (finish_reason 'length' = output hit max_tokens)",
+    LABELS + ("finish_reason",),
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens billed by direction",
+    LABELS + ("kind",),
+)
+LLM_COST = Counter(
+    "llm_cost_usd_total",
+    "Estimated spend in USD (see LLM_PRICES)",
+    LABELS,
+)
+LLM_LATENCY = Histogram(
+    "llm_request_duration_seconds",
+    "LLM call latency (excludes waiting for a concurrency slot)",
+    ("feature", "model"),
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+)
+LLM_COMPLETION_TOKENS = Histogram(
+    "llm_completion_tokens",
+    "Completion tokens per call (compare with the max_tokens cap)",
+    ("feature", "model"),
+    buckets=(25, 50, 100, 150, 250, 350, 500, 750, 1000, 1500, 2000, 4000),
+)
+LLM_PROMPT_TOKENS = Histogram(
+    "llm_prompt_tokens",
+    "Prompt tokens per call",
+    ("feature", "model"),
+    buckets=(100, 250, 500, 1000, 2000, 4000, 8000, 16000),
+)
+
+# (date, feature, model, language, tier)
+RollupKey = Tuple[date, str, str, str, str]
+
+
+def parse_prices(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse LLM_PRICES ("model=input:output,..." in USD per 1M tokens)"""
+    prices: Dict[str, Tuple[float, float]] = {}
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        try:
+            model, rates = entry.split("=", 1)
+            prompt_rate, completion_rate = rates.split(":", 1)
+            prices[model.strip()] = (float(prompt_rate), float(completion_rate))
+        except ValueError:
+            raise ValueError(f"Invalid LLM_PRICES entry: {entry!r} (expected model=input:output)")
+    return prices
+
+
+def usage_tokens(usage: Any) -> Tuple[Optional[int], Optional[int]]:
+    """(prompt_tokens, completion_tokens) from a usage object or dict (stream chunks in openai<1.26)"""
+    if isinstance(usage, dict):
+        return usage.get("prompt_tokens"), usage.get("completion_tokens")
+    return getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None)
+
+
+class LLMUsageTracker:
+    """
+    Records every LLM call as Prometheus metrics and, optionally, daily rollups
+
+    Labels are feature ('detection', 'generation', 'translation'), model,
+    language and tier. Translations are shared between users, so they are
+    recorded with tier 'shared'. With LLM_USAGE_ROLLUPS enabled, per-worker
+    totals are added to llm_usage_daily in one batched upsert every
+    LLM_USAGE_FLUSH_INTERVAL seconds.
+    """
+
+    def __init__(self, rollups: bool, flush_interval: float, prices: Dict[str, Tuple[float, float]]):
+        self.rollups = rollups
+        self.flush_interval = flush_interval
+        self.prices = {**DEFAULT_PRICES, **prices}
+        # key -> [requests, prompt_tokens, completion_tokens, truncated, errors, latency_ms, cost_usd]
+        self._pending: Dict[RollupKey, list] = {}
+        self._lock = threading.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _price(self, model: str) -> Optional[Tuple[float, float]]:
+        if model in self.prices:
+            return self.prices[model]
+        # Dated snapshots (gpt-4o-2024-08-06) bill like their base model
+        base = max((name for name in self.prices if model.startswith(name + "-")), key=len, default=None)
+        return self.prices[base] if base else None
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Estimated USD cost of one call (0 for models without a price)"""
+        price = self._price(model)
+        if price is None:
+            return 0.0
+        return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+    def record(
+        self,
+        feature: str,
+        model: Optional[str],
+        language: Optional[str],
+        tier: Optional[str],
+        prompt_tokens: Optional[int],
+        completion_tokens: Optional[int],
+        finish_reason: Optional[str],
+        latency: float
+    ) -> None:
+        """
+        Record one LLM call
+
+        Args:
+            feature: Feature name ('detection', 'generation', 'translation')
+            model: Model the call was made with
+            language: Language code of the request (None = unknown)
+            tier: 'free', 'premium' or 'shared' (None = unknown)
+            prompt_tokens: Billed prompt tokens (None if the API didn't report usage)
+            completion_tokens: Billed completion tokens
+            finish_reason: 'stop', 'length', ... or 'error' if the call failed
+            latency: Seconds the call took
+        """
+        model = model or "unknown"
+        # Client-supplied language codes are bounded to keep label cardinality low
+        if language and language not in SUPPORTED_LANGUAGES:
+            language = "other"
+        labels = (feature, model, language or "unknown", tier or "unknown")
+        prompt_tokens = prompt_tokens or 0
+        completion_tokens = completion_tokens or 0
+        cost = self.cost(model, prompt_tokens, completion_tokens)
+
+        LLM_REQUESTS.labels(*labels, finish_reason or "unknown").inc()
+        LLM_LATENCY.labels(feature, model).observe(latency)
+        if finish_reason != "error":
+            LLM_TOKENS.labels(*labels, "prompt").inc(prompt_tokens)
+            LLM_TOKENS.labels(*labels, "completion").inc(completion_tokens)
+            LLM_PROMPT_TOKENS.labels(feature, model).observe(prompt_tokens)
+            LLM_COMPLETION_TOKENS.labels(feature, model).observe(completion_tokens)
+            LLM_COST.labels(*labels).inc(cost)
+
+        if not self.rollups:
+            return
+        key = (date.today(), *labels)
+        with self._lock:
+            totals = self._pending.setdefault(key, [0, 0, 0, 0, 0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += prompt_tokens
+            totals[2] += completion_tokens
+            totals[3] += finish_reason == "length"
+            totals[4] += finish_reason == "error"
+            totals[5] += int(latency * 1000)
+            totals[6] += cost
+
+    def record_response(
+        self,
+        feature: str,
+        model: Optional[str],
+        language: Optional[str],
+        tier: Optional[str],
+        response: Any,
+        latency: float
+    ) -> None:
+        """Record a ChatCompletion response"""
+        prompt_tokens, completion_tokens = usage_tokens(getattr(response, "usage", None))
+        choices = getattr(response, "choices", None) or []
+        self.record(
+            feature,
+            getattr(response, "model", None) or model,
+            language,
+            tier,
+            prompt_tokens,
+            completion_tokens,
+            choices[0].finish_reason if choices else None,
+            latency
+        )
+
+    def _drain(self) -> Dict[RollupKey, list]:
+        with self._lock:
+            drained, self._pending = self._pending, {}
+        return drained
+
+    def _restore(self, rows: Dict[RollupKey, list]) -> None:
+        with self._lock:
+            for key, values in rows.items():
+                totals = self._pending.setdefault(key, [0, 0, 0, 0, 0, 0, 0.0])
+                for i, value in enumerate(values):
+                    totals[i] += value
+
+    async def flush(self) -> int:
+        """
+        Add buffered totals to llm_usage_daily
+
+        Returns:
+            Number of rollup rows written
+        """
+        rows = self._drain()
+        if not rows:
+            return 0
+        columns = ("requests", "prompt_tokens", "completion_tokens", "truncated", "errors", "latency_ms", "cost_usd")
+        values = [
+            {
+                "date": key[0], "feature": key[1], "model": key[2], "language": key[3], "tier": key[4],
+                **dict(zip(columns, totals)),
+            }
+            for key, totals in rows.items()
+        ]
+        async with AsyncSessionLocal() as db:
+            try:
+                dialect = db.bind.dialect.name
+                insert = postgresql_insert if dialect == "postgresql" else sqlite_insert if dialect == "sqlite" else None
+                if insert is None:
+                    for row in values:
+                        existing = await db.get(
+                            LLMUsageDaily,
+                            (row["date"], row["feature"], row["model"], row["language"], row["tier"])
+                        )
+                        if existing is None:
+                            db.add(LLMUsageDaily(**row))
+                        else:
+                            for column in columns:
+                                setattr(existing, column, getattr(existing, column) + row[column])
+                else:
+                    stmt = insert(LLMUsageDaily).values(values)
+                    stmt = stmt.on_conflict_do_update(
+                        index_elements=["date", "feature", "model", "language", "tier"],
+                        set_={
+                            column: getattr(LLMUsageDaily, column) + getattr(stmt.excluded, column)
+                            for column in columns
+                        }
+                    )
+                    await db.execute(stmt)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                self._restore(rows)
+                raise
+        return len(values)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                # Totals were restored - retry on the next tick
+                pass
+
+    def start(self) -> None:
+        """Start the rollup flush (called on application startup)"""
+        if self.rollups and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the rollup flush and write what is left (called on application shutdown)"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        if self.rollups:
+            try:
+                await self.flush()
+            except Exception:
+                pass
+
+
+llm_usage = LLMUsageTracker(
+    rollups=settings.llm_usage_rollups,
+    flush_interval=settings.llm_usage_flush_interval,
+    prices=parse_prices(settings.llm_prices),
+)
@@ -0,0 +1,306 @@
+"""Store notification ingestion - App Store Server Notifications v2 and Play Real-Time Developer Notifications"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import StoreNotification, Subscription
+from app.services.apple_jws import JWSVerificationError
+from app.services.entitlement_service import entitlement_service
+from app.services.receipt_service import receipt_service
+
+
+class NotificationError(ValueError):
+    """Notification is malformed, untrusted or for another app"""
+
+
+@dataclass
+class StoreEvent:
+    """Subscription change carried by one store notification"""
+    platform: str  # 'ios' or 'android'
+    notification_id: str
+    notification_type: str
+    app_account_token: Optional[str] = None
+    original_transaction_id: Optional[str] = None
+    purchase_token: Optional[str] = None
+    product_id: Optional[str] = None
+    status: Optional[str] = None  # None = leave the stored status alone
+    expires_at: Optional[datetime] = None
+    terminal: bool = False  # Ends access regardless of expiry (refund, revoke, expire)
+
+
+def _from_millis(value: Any) -> Optional[datetime]:
+    # Same representation as receipt_service (naive local time)
+    if value is None:
+        return None
+    try:
+        return datetime.fromtimestamp(int(value) / 1000)
+    except (ValueError, TypeError):
+        return None
+
+
+def _naive(value: datetime) -> datetime:
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+class NotificationService:
+    """
+    Applies store notifications to `subscriptions`
+
+    Each notification is recorded in store_notifications in the same
+    transaction as the subscription update, so redelivered notifications
+    are applied once. Updates invalidate the cached entitlement in this
+    worker; other workers pick it up within the entitlement cache TTL.
+    """
+
+    # App Store notificationType values that end access
+    APPLE_TERMINAL_TYPES = {"EXPIRED", "GRACE_PERIOD_EXPIRED", "REFUND", "REVOKE"}
+
+    # Play subscriptionNotification.notificationType codes
+    GOOGLE_TYPES = {
+        1: "SUBSCRIPTION_RECOVERED",
+        2: "SUBSCRIPTION_RENEWED",
+        3: "SUBSCRIPTION_CANCELED",
+        4: "SUBSCRIPTION_PURCHASED",
+        5: "SUBSCRIPTION_ON_HOLD",
+        6: "SUBSCRIPTION_IN_GRACE_PERIOD",
+        7: "SUBSCRIPTION_RESTARTED",
+        8: "SUBSCRIPTION_PRICE_CHANGE_CONFIRMED",
+        9: "SUBSCRIPTION_DEFERRED",
+        10: "SUBSCRIPTION_PAUSED",
+        11: "SUBSCRIPTION_PAUSE_SCHEDULE_CHANGED",
+        12: "SUBSCRIPTION_REVOKED",
+        13: "SUBSCRIPTION_EXPIRED",
+        20: "SUBSCRIPTION_PENDING_PURCHASE_CANCELED",
+    }
+    GOOGLE_TERMINAL_TYPES = {5, 10, 12, 13}
+
+    def parse_apple(self, signed_payload: str) -> StoreEvent:
+        """
+        Verify and decode an App Store Server Notification v2
+
+        Args:
+            signed_payload: `signedPayload` from the notification body
+
+        Returns:
+            StoreEvent (without subscription fields for notifications that carry no transaction)
+
+        Raises:
+            NotificationError: If the payload or its transaction can't be trusted
+        """
+        try:
+            notification = receipt_service.jws_verifier.verify(signed_payload)
+        except JWSVerificationError as e:
+            raise NotificationError(f"Invalid signedPayload: {str(e)}")
+
+        notification_type = notification.get("notificationType")
+        notification_id = notification.get("notificationUUID")
+        if not notification_type or not notification_id:
+            raise NotificationError("Missing notificationType or notificationUUID")
+
+        data = notification.get("data") or {}
+        if not isinstance(data, dict):
+            raise NotificationError("Notification data is not a JSON object")
+        if settings.apple_bundle_id and data.get("bundleId") not in (None, settings.apple_bundle_id):
+            raise NotificationError("Notification belongs to a different app")
+
+        event = StoreEvent(
+            platform="ios",
+            notification_id=notification_id,
+            notification_type=notification_type
+        )
+        signed_transaction = data.get("signedTransactionInfo")
+        if signed_transaction is not None and not isinstance(signed_transaction, str):
+            raise NotificationError("signedTransactionInfo is not a string")
+        if not signed_transaction:
+            # e.g. TEST, CONSUMPTION_REQUEST
+            return event
+
+        try:
+            transaction = receipt_service.jws_verifier.verify(signed_transaction)
+        except JWSVerificationError as e:
+            raise NotificationError(f"Invalid signedTransactionInfo: {str(e)}")
+
+        event.app_account_token = transaction.get("appAccountToken")
+        event.original_transaction_id = transaction.get("originalTransactionId")
+        event.product_id = transaction.get("productId")
+        event.expires_at = _from_millis(transaction.get("expiresDate"))
+        event.terminal = (
+            notification_type in self.APPLE_TERMINAL_TYPES
+            or bool(transaction.get("revocationDate"))
+        )
+        if event.terminal:
+            event.status = "expired"
+        elif notification.get("subtype") == "GRACE_PERIOD":
+            # Billing retry with access kept until the grace period ends
+            event.status = "active"
+        elif event.expires_at is not None:
+            event.status = "active" if event.expires_at > datetime.now() else "expired"
+        return event
+
+    async def parse_google(self, message_id: str, data: str) -> StoreEvent:
+        """
+        Decode a Play Real-Time Developer Notification (Pub/Sub push message)
+
+        The notification only names the purchase. Terminal types (expired,
+        revoked, ...) expire the subscription; any other state is taken only
+        from a Play Developer API lookup, so without Play verification
+        configured the notification is recorded but changes nothing.
+
+        Args:
+            message_id: Pub/Sub messageId (idempotency key)
+            data: Base64-encoded DeveloperNotification JSON
+
+        Returns:
+            StoreEvent
+
+        Raises:
+            NotificationError: If the message can't be decoded or is for another app
+        """
+        try:
+            notification = json.loads(base64.b64decode(data))
+        except ValueError:
+            raise NotificationError("Message data is not base64-encoded JSON")
+        if not isinstance(notification, dict):
+            raise NotificationError("Message data is not a JSON object")
+
+        if settings.google_package_name and notification.get("packageName") not in (None, settings.google_package_name):
+            raise NotificationError("Notification belongs to a different app")
+
+        subscription = notification.get("subscriptionNotification")
+        if subscription is not None and not isinstance(subscription, dict):
+            raise NotificationError("subscriptionNotification is not a JSON object")
+        if not subscription:
+            # testNotification, oneTimeProductNotification, ...
+            kind = next((key for key in notification if key.endswith("Notification")), "unknown")
+            return StoreEvent(platform="android", notification_id=message_id, notification_type=kind)
+
+        code = subscription.get("notificationType")
+        event = StoreEvent(
+            platform="android",
+            notification_id=message_id,
+            notification_type=self.GOOGLE_TYPES.get(code, f"SUBSCRIPTION_{code}"),
+            purchase_token=subscription.get("purchaseToken"),
+            product_id=subscription.get("subscriptionId"),
+            terminal=code in self.GOOGLE_TERMINAL_TYPES
+        )
+        if not event.purchase_token:
+            raise NotificationError("Missing purchaseToken")
+
+        if event.terminal:
+            event.status = "expired"
+        elif settings.google_package_name and settings.google_service_account_path:
+            result = await receipt_service.verify_google_receipt(
+                purchase_token=event.purchase_token,
+                product_id=event.product_id,
+                app_account_token=""
+            )
+            if result.get("status"):  # Lookup errors carry no status
+                event.status = result["status"]
+                event.expires_at = (
+                    datetime.fromisoformat(result["expires_at"]) if result.get("expires_at") else None
+                )
+        return event
+
+    async def apply(self, db: AsyncSession, event: StoreEvent) -> str:
+        """
+        Record a notification and update the matching subscription
+
+        Args:
+            db: Database session
+            event: Parsed notification
+
+        Returns:
+            'processed', 'duplicate' or 'unmatched' (no subscription to update yet)
+        """
+        record = StoreNotification(
+            platform=event.platform,
+            notification_id=event.notification_id,
+            notification_type=event.notification_type
+        )
+        db.add(record)
+        try:
+            await db.flush()
+        except IntegrityError:
+            await db.rollback()
+            return "duplicate"
+
+        subscription = await self._find_subscription(db, event)
+        if subscription is None and event.app_account_token and event.product_id and event.status:
+            # Purchase the client hasn't verified yet (StoreKit 2 sets appAccountToken)
+            subscription = Subscription(
+                platform=event.platform,
+                app_account_token=event.app_account_token,
+                original_transaction_id=event.original_transaction_id,
+                purchase_token=event.purchase_token,
+                product_id=event.product_id,
+                status=event.status,
+                expires_at=event.expires_at
+            )
+            db.add(subscription)
+            await db.flush()
+        elif subscription is not None and not self._is_stale(subscription, event):
+            if event.product_id:
+                subscription.product_id = event.product_id
+            if event.status:
+                subscription.status = event.status
+            if event.expires_at is not None:
+                subscription.expires_at = event.expires_at
+
+        record.subscription_id = subscription.id if subscription is not None else None
+        await db.commit()
+
+        if subscription is None:
+            return "unmatched"
+        entitlement_service.invalidate(subscription.app_account_token)
+        return "processed"
+
+    @staticmethod
+    async def _find_subscription(db: AsyncSession, event: StoreEvent) -> Optional[Subscription]:
+        if event.original_transaction_id:
+            subscription = await db.scalar(
+                select(Subscription)
+                .where(
+                    Subscription.platform == event.platform,
+                    Subscription.original_transaction_id == event.original_transaction_id
+                )
+                .limit(1)
+            )
+            if subscription is not None:
+                return subscription
+        if event.purchase_token:
+            subscription = await db.scalar(
+                select(Subscription)
+                .where(
+                    Subscription.platform == event.platform,
+                    Subscription.purchase_token == event.purchase_token
+                )
+                .limit(1)
+            )
+            if subscription is not None:
+                return subscription
+        if event.app_account_token:
+            return await db.scalar(
+                select(Subscription)
+                .where(
+                    Subscription.platform == event.platform,
+                    Subscription.app_account_token == event.app_account_token
+                )
+            )
+        return None
+
+    @staticmethod
+    def _is_stale(subscription: Subscription, event: StoreEvent) -> bool:
+        """An older renewal delivered late must not roll the expiry back"""
+        if event.terminal or event.expires_at is None or subscription.expires_at is None:
+            return False
+        return _naive(event.expires_at) < _naive(subscription.expires_at)
+
+
+notification_service = NotificationService()
@@ -1,16 +1,26 @@
 """OpenAI service for ingredient detection and recipe generation"""
-from openai import OpenAI
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
+import asyncio
 import base64
+import json
+import re
 import uuid
 from app.config import settings
+from app.services.llm_gateway import llm_gateway
+from app.services.image_service import PreparedImage
+from app.services.prompt_registry import prompt_registry
+from app.services.recipe_stream import RecipeStreamParser
+
+
+# Output token budget per recipe for batch translation (~300 tokens per recipe + JSON overhead)
+TRANSLATION_TOKENS_PER_RECIPE = 450
 
 
 class OpenAIService:
     """Service for OpenAI API interactions"""
     
     def __init__(self):
-        self.client = OpenAI(api_key=settings.openai_api_key)
+        self.gateway = llm_gateway  # Shared async client - never blocks the event loop
         self.vision_model = settings.openai_model_vision
         self.text_model = settings.openai_model_text
         self.max_tokens = settings.openai_max_tokens
@@ -18,100 +28,48 @@ class OpenAIService:
     
     async def detect_ingredients(
         self,
-        images: List[bytes],
-        language: str = "en"
+        images: List[PreparedImage],
+        language: str = "en",
+        user_tier: str = "free"
     ) -> Dict[str, Any]:
         """
         Detect ingredients from images using OpenAI Vision API
         
         Args:
-            images: List of image bytes
+            images: List of preprocessed images (see image_service)
             language: Language code for ingredient names
+            user_tier: 'free' or 'premium' (usage metrics label)
             
         Returns:
             Dict with ingredients, detection_id, and confidence
         """
         # Prepare image content for API
         image_contents = []
-        for img_bytes in images:
+        for image in images:
             # Encode image as base64
-            base64_image = base64.b64encode(img_bytes).decode('utf-8')
+            base64_image = base64.b64encode(image.data).decode('utf-8')
             image_contents.append({
                 "type": "image_url",
                 "image_url": {
-                    "url": f"data:image/jpeg;base64,{base64_image}"
+                    "url": f"data:{image.content_type};base64,{base64_image}",
+                    "detail": image.detail
                 }
             })
         
         # Create ultra-short prompt for cost optimization
         # COST REDUCTION: Return ONLY comma-separated list, no JSON, no descriptions, max 10 items
         # IMPORTANT: Only food ingredients, ignore hands, backgrounds, surfaces, containers
-        # Language order matches Flutter AppLanguage enum: english, arabic, bengali, chinese, danish, dutch, finnish, french, german, greek, hebrew, hindi, indonesian, italian, japanese, korean, norwegian, polish, portuguese, romanian, russian, spanish, swedish, thai, turkish, ukrainian, vietnamese
-        language_prompts = {
-            # English (first)
-            "en": "Return ONLY food ingredients separated by commas. Ignore hands, backgrounds, surfaces, containers. No explanations. Max 10 items.",
-            # Arabic
-            "ar": "أعد فقط مكونات الطعام مفصولة بفواصل. تجاهل الأيدي والخلفيات والأسطح والحاويات. لا تفسيرات. حد أقصى 10 عناصر.",
-            # Bengali
-            "bn": "শুধুমাত্র খাদ্য উপাদান কমা দ্বারা পৃথক করে ফেরত দিন। হাত, পটভূমি, পৃষ্ঠতল, পাত্র উপেক্ষা করুন। কোন ব্যাখ্যা নেই। সর্বোচ্চ 10টি আইটেম।",
-            # Chinese
-            "zh": "只返回用逗号分隔的食物成分。忽略手、背景、表面、容器。无解释。最多10项。",
-            # Danish
-            "da": "Returner kun madingredienser adskilt af kommaer. Ignorer hænder, baggrunde, overflader, beholdere. Ingen forklaringer. Max 10 emner.",
-            # Dutch
-            "nl": "Geef alleen voedselingrediënten gescheiden door komma's. Negeer handen, achtergronden, oppervlakken, containers. Geen uitleg. Max 10 items.",
-            # Finnish
-            "fi": "Palauta vain ruoka-aineet pilkuilla erotettuina. Ohita kädet, taustat, pinnat, astiat. Ei selityksiä. Max 10 kohdetta.",
-            # French
-            "fr": "Retournez uniquement des ingrédients alimentaires séparés par des virgules. Ignorez les mains, arrière-plans, surfaces, contenants. Pas d'explications. Max 10 éléments.",
-            # German
-            "de": "Geben Sie nur Lebensmittelzutaten durch Kommas getrennt zurück. Ignorieren Sie Hände, Hintergründe, Oberflächen, Behälter. Keine Erklärungen. Max 10 Artikel.",
-            # Greek
-            "el": "Επιστρέψτε μόνο συστατικά φαγητού διαχωρισμένα με κόμματα. Αγνοήστε χέρια, φόντα, επιφάνειες, δοχεία. Χωρίς εξηγήσεις. Μέγιστο 10 στοιχεία.",
-            # Hebrew
-            "he": "החזר רק מרכיבי מזון מופרדים בפסיקים. התעלם מידיים, רקעים, משטחים, מיכלים. ללא הסברים. מקסימום 10 פריטים.",
-            # Hindi
-            "hi": "केवल खाद्य सामग्री अल्पविराम से अलग करके लौटाएं। हाथ, पृष्ठभूमि, सतह, कंटेनर को नजरअंदाज करें। कोई स्पष्टीकरण नहीं। अधिकतम 10 आइटम।",
-            # Indonesian
-            "id": "Kembalikan hanya bahan makanan yang dipisahkan koma. Abaikan tangan, latar belakang, permukaan, wadah. Tanpa penjelasan. Maks 10 item.",
-            # Italian
-            "it": "Restituisci solo ingredienti alimentari separati da virgole. Ignora mani, sfondi, superfici, contenitori. Nessuna spiegazione. Max 10 elementi.",
-            # Japanese
-            "ja": "食品材料のみをカンマ区切りで返す。手、背景、床、光、表面、容器は無視。説明なし。最大10項目。",
-            # Korean
-            "ko": "음식 재료만 쉼표로 구분하여 반환. 손, 배경, 바닥, 표면, 용기는 무시. 설명 없음. 최대 10개 항목.",
-            # Norwegian
-            "no": "Returner kun matingredienser adskilt med kommaer. Ignorer hender, bakgrunner, overflater, beholdere. Ingen forklaringer. Maks 10 elementer.",
-            # Polish
-            "pl": "Zwróć tylko składniki żywności oddzielone przecinkami. Ignoruj dłonie, tła, powierzchnie, pojemniki. Bez wyjaśnień. Max 10 pozycji.",
-            # Portuguese
-            "pt": "Retorne apenas ingredientes alimentares separados por vírgulas. Ignore mãos, fundos, superfícies, recipientes. Sem explicações. Máx 10 itens.",
-            # Romanian
-            "ro": "Returnează doar ingrediente alimentare separate prin virgulă. Ignoră mâinile, fundalurile, suprafețele, containerele. Fără explicații. Max 10 elemente.",
-            # Russian
-            "ru": "Верните только пищевые ингредиенты через запятую. Игнорируйте руки, фоны, поверхности, контейнеры. Без объяснений. Макс 10 элементов.",
-            # Spanish
-            "es": "Devuelve solo ingredientes alimentarios separados por comas. Ignora manos, fondos, superficies, contenedores. Sin explicaciones. Máx 10 elementos.",
-            # Swedish
-            "sv": "Returnera endast livsmedelsingredienser separerade med kommatecken. Ignorera händer, bakgrunder, ytor, behållare. Inga förklaringar. Max 10 objekt.",
-            # Thai
-            "th": "คืนเฉพาะส่วนผสมอาหารที่คั่นด้วยจุลภาค ไม่สนใจมือ พื้นหลัง พื้นผิว ภาชนะ ไม่มีคำอธิบาย สูงสุด 10 รายการ",
-            # Turkish
-            "tr": "Sadece virgülle ayrılmış gıda malzemeleri döndür. Elleri, arka planları, yüzeyleri, kapları yoksay. Açıklama yok. Maks 10 öğe.",
-            # Ukrainian
-            "uk": "Поверніть лише харчові інгредієнти через кому. Ігноруйте руки, фони, поверхні, контейнери. Без пояснень. Макс 10 елементів.",
-            # Vietnamese
-            "vi": "Chỉ trả về nguyên liệu thực phẩm cách nhau bằng dấu phẩy. Bỏ qua tay, nền, bề mặt, hộp đựng. Không giải thích. Tối đa 10 mục.",
-        }
-        
-        prompt = language_prompts.get(language, language_prompts["en"])
+        prompt = prompt_registry.detection_prompt(language)
         
         try:
             # COST REDUCTION: Strict token limit for ingredient detection (100-200 tokens is enough)
             # This dramatically reduces cost since vision API charges per token
             detection_max_tokens = 150  # Enough for ~10 ingredients
             
-            response = self.client.chat.completions.create(
+            response = await self.gateway.chat(
+                "detection",
+                language=language,
+                tier=user_tier,
                 model=self.vision_model,
                 messages=[
                     {
@@ -147,29 +105,8 @@ class OpenAIService:
             # Limit to max 10 items as per prompt
             ingredient_names = ingredient_names[:10]
             
-            # List of non-food items and error messages to filter out
-            non_food_keywords = {
-                'en': ['hand', 'hands', 'background', 'floor', 'surface', 'light', 'container', 'table', 'counter'],
-                'ja': ['手', '背景', '床', '光', '表面', '容器', 'テーブル', 'カウンター'],
-                'ar': ['يد', 'خلفية', 'أرضية', 'ضوء', 'سطح', 'حاوية'],
-                'zh': ['手', '背景', '地板', '光', '表面', '容器'],
-                'ko': ['손', '배경', '바닥', '빛', '표면', '용기'],
-                # Add more languages as needed
-            }
-            
-            # Error messages to filter out (apologies, can't identify, etc.)
-            error_messages = {
-                'en': ['sorry', "i'm sorry", "i can't", "can't identify", "cannot identify", "unable to identify", "no ingredients", "no food"],
-                'ja': ['申し訳', 'ごめん', '特定できません', '特定することはできません', '材料を特定', '食品材料を特定', '材料が見つかりません'],
-                'ar': ['آسف', 'عذراً', 'لا يمكن', 'لا أستطيع', 'لم أتمكن'],
-                'zh': ['抱歉', '对不起', '无法识别', '无法确定', '不能识别'],
-                'ko': ['죄송', '미안', '식별할 수 없', '재료를 찾을 수 없'],
-                # Add more languages as needed
-            }
-            
-            # Get language-specific keywords or use English as fallback
-            keywords_to_filter = non_food_keywords.get(language, non_food_keywords['en'])
-            error_keywords = error_messages.get(language, error_messages['en'])
+            # Non-food items and error messages to filter out (one compiled pattern per language)
+            not_an_ingredient = prompt_registry.detection_filter(language)
             
             # Create ingredient objects
             ingredients = []
@@ -185,16 +122,9 @@ class OpenAIService:
                 if not clean_name:
                     continue
                 
-                # Filter out error messages (case-insensitive check)
-                clean_lower = clean_name.lower()
-                is_error_message = any(error in clean_lower for error in error_keywords)
-                if is_error_message:
-                    continue  # Skip error messages
-                
-                # Filter out non-food items (case-insensitive check)
-                is_non_food = any(keyword.lower() in clean_lower for keyword in keywords_to_filter)
-                if is_non_food:
-                    continue  # Skip this ingredient
+                # Filter out error messages and non-food items (case-insensitive, single pass)
+                if not_an_ingredient.search(clean_name.lower()):
+                    continue  # Skip this name
                 
                 ingredients.append({
                     "id": f"ing_{str(uuid.uuid4())[:8]}",
@@ -216,26 +146,18 @@ class OpenAIService:
         except Exception as e:
             raise Exception(f"OpenAI API error: {str(e)}")
     
-    async def generate_recipes(
+    def _build_recipe_request(
         self,
         ingredients: List[Any],
-        language: str = "en",
-        max_recipes: int = 3,
-        user_tier: str = "free",
-        diet_preferences: Optional[Dict[str, Any]] = None
+        language: str,
+        max_recipes: int,
+        user_tier: str,
+        diet_preferences: Optional[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """
-        Generate recipes from ingredients using OpenAI GPT-4
+        Build chat completion arguments for recipe generation
         
-        Args:
-            ingredients: List of ingredient objects (Pydantic models or dicts) with 'id' and 'name'
-            language: Language code for recipe generation
-            max_recipes: Maximum number of recipes to generate
-            user_tier: 'free' or 'premium' - determines prompt strategy
-            diet_preferences: Optional dict with avoid_ingredients, diet_style, cooking_preferences, religious
-            
-        Returns:
-            Dict with recipes and generation_id
+        Shared by generate_recipes and stream_recipes so both modes use identical prompts.
         """
         # Build ingredient list
         # Handle both dict and Pydantic model formats
@@ -287,261 +209,70 @@ class OpenAIService:
             temperature = self.temperature  # Use configured temperature (medium)
         
         # COST REDUCTION: Shorter, focused prompts - max 5 steps per recipe, keep it short
-        # Language order matches Flutter AppLanguage enum: english, arabic, bengali, chinese, danish, dutch, finnish, french, german, greek, hebrew, hindi, indonesian, italian, japanese, korean, norwegian, polish, portuguese, romanian, russian, spanish, swedish, thai, turkish, ukrainian, vietnamese
-        # Base prompt template - constraints_text is added to all languages
-        base_prompts = {
-            # English (first)
-            "en": f"""Ingredients: {ingredient_list}{constraints_text}
-
-Create {max_recipes} simple recipes. Each recipe max 5 steps. Keep it short. No introductions.
-
-JSON format:
-[
-  {{"emoji": "🍝", "badge": "fastLazy", "title": "Title", "steps": ["Step 1", "Step 2"], "ingredients": ["ing1", "ing2"]}},
-  ...
-]
-
-Return ONLY valid JSON array. Do not include "id" field - it will be generated automatically.""",
-            # Arabic
-            "ar": f"""المكونات: {ingredient_list}{constraints_text}
-
-أنشئ {max_recipes} وصفات بسيطة. كل وصفة بحد أقصى 5 خطوات. اجعلها قصيرة. بدون مقدمات.
-
-تنسيق JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "العنوان", "steps": ["خطوة 1"], "ingredients": ["مكون1"]}}]
-
-أعد مصفوفة JSON صالحة فقط.""",
-            # Bengali
-            "bn": f"""উপাদান: {ingredient_list}
-
-{max_recipes}টি সহজ রেসিপি তৈরি করুন। প্রতিটি রেসিপি সর্বোচ্চ 5 ধাপ। সংক্ষিপ্ত রাখুন। কোন ভূমিকা নেই।
-
-JSON ফরম্যাট: [{{"emoji": "🍝", "badge": "fastLazy", "title": "শিরোনাম", "steps": ["ধাপ 1"], "ingredients": ["উপাদান1"]}}]
-
-শুধুমাত্র বৈধ JSON অ্যারে ফেরত দিন।""",
-            # Chinese
-            "zh": f"""食材: {ingredient_list}
-
-创建{max_recipes}个简单食谱。每个食谱最多5步。保持简短。无介绍。
-
-JSON格式: [{{"emoji": "🍝", "badge": "fastLazy", "title": "标题", "steps": ["步骤1"], "ingredients": ["食材1"]}}]
-
-仅返回有效JSON数组。""",
-            # Danish
-            "da": f"""Ingredienser: {ingredient_list}
-
-Lav {max_recipes} simple opskrifter. Hver opskrift max 5 trin. Hold det kort. Ingen introduktioner.
-
-JSON format: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Titel", "steps": ["Trin 1"], "ingredients": ["ing1"]}}]
-
-Returner KUN gyldig JSON array.""",
-            # Dutch
-            "nl": f"""Ingrediënten: {ingredient_list}
-
-Maak {max_recipes} eenvoudige recepten. Elk recept max 5 stappen. Houd het kort. Geen inleidingen.
-
-JSON formaat: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Titel", "steps": ["Stap 1"], "ingredients": ["ing1"]}}]
-
-Geef ALLEEN geldig JSON array terug.""",
-            # Finnish
-            "fi": f"""Aineet: {ingredient_list}
-
-Luo {max_recipes} yksinkertaista reseptiä. Jokainen resepti max 5 vaihetta. Pidä lyhyenä. Ei johdantoja.
-
-JSON muoto: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Otsikko", "steps": ["Vaihe 1"], "ingredients": ["aine1"]}}]
-
-Palauta VAIN kelvollinen JSON taulukko.""",
-            # French
-            "fr": f"""Ingrédients: {ingredient_list}
-
-Créez {max_recipes} recettes simples. Chaque recette max 5 étapes. Gardez court. Pas d'introductions.
-
-Format JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Titre", "steps": ["Étape 1"], "ingredients": ["ing1"]}}]
-
-Retournez UNIQUEMENT un tableau JSON valide.""",
-            # German
-            "de": f"""Zutaten: {ingredient_list}
-
-Erstellen Sie {max_recipes} einfache Rezepte. Jedes Rezept max 5 Schritte. Kurz halten. Keine Einleitungen.
-
-JSON Format: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Titel", "steps": ["Schritt 1"], "ingredients": ["Zutat1"]}}]
-
-Geben Sie NUR gültiges JSON Array zurück.""",
-            # Greek
-            "el": f"""Συστατικά: {ingredient_list}
-
-Δημιουργήστε {max_recipes} απλές συνταγές. Κάθε συνταγή max 5 βήματα. Κρατήστε το σύντομο. Χωρίς εισαγωγές.
-
-JSON μορφή: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Τίτλος", "steps": ["Βήμα 1"], "ingredients": ["συσ1"]}}]
-
-Επιστρέψτε ΜΟΝΟ έγκυρο JSON array.""",
-            # Hebrew
-            "he": f"""מרכיבים: {ingredient_list}
-
-צור {max_recipes} מתכונים פשוטים. כל מתכון מקסימום 5 שלבים. שמור קצר. ללא הקדמות.
-
-פורמט JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "כותרת", "steps": ["שלב 1"], "ingredients": ["מרכיב1"]}}]
-
-החזר רק מערך JSON תקין.""",
-            # Hindi
-            "hi": f"""सामग्री: {ingredient_list}
-
-{max_recipes} सरल व्यंजन बनाएं। प्रत्येक व्यंजन अधिकतम 5 चरण। संक्षिप्त रखें। कोई परिचय नहीं।
-
-JSON प्रारूप: [{{"emoji": "🍝", "badge": "fastLazy", "title": "शीर्षक", "steps": ["चरण 1"], "ingredients": ["सामग्री1"]}}]
-
-केवल वैध JSON सरणी लौटाएं।""",
-            # Indonesian
-            "id": f"""Bahan: {ingredient_list}
-
-Buat {max_recipes} resep sederhana. Setiap resep max 5 langkah. Buat singkat. Tanpa pengantar.
-
-Format JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Judul", "steps": ["Langkah 1"], "ingredients": ["bahan1"]}}]
-
-Kembalikan HANYA array JSON yang valid.""",
-            # Italian
-            "it": f"""Ingredienti: {ingredient_list}
-
-Crea {max_recipes} ricette semplici. Ogni ricetta max 5 passi. Mantieni breve. Nessuna introduzione.
-
-Formato JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Titolo", "steps": ["Passo 1"], "ingredients": ["ing1"]}}]
-
-Restituisci SOLO array JSON valido.""",
-            # Japanese
-            "ja": f"""材料: {ingredient_list}
-
-{max_recipes}つの簡単なレシピを作成。各レシピ最大5ステップ。簡潔に。紹介なし。
-
-JSON形式: [{{"emoji": "🍝", "badge": "fastLazy", "title": "タイトル", "steps": ["ステップ1"], "ingredients": ["材料1"]}}]
-
-有効なJSON配列のみ返す。""",
-            # Korean
-            "ko": f"""재료: {ingredient_list}
-
-{max_recipes}개의 간단한 레시피 생성. 각 레시피 최대 5단계. 간결하게. 소개 없음.
-
-JSON 형식: [{{"emoji": "🍝", "badge": "fastLazy", "title": "제목", "steps": ["단계1"], "ingredients": ["재료1"]}}]
-
-유효한 JSON 배열만 반환.""",
-            # Norwegian
-            "no": f"""Ingredienser: {ingredient_list}
-
-Lag {max_recipes} enkle oppskrifter. Hver oppskrift max 5 steg. Hold kort. Ingen introduksjoner.
-
-JSON format: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Tittel", "steps": ["Steg 1"], "ingredients": ["ing1"]}}]
-
-Returner KUN gyldig JSON array.""",
-            # Polish
-            "pl": f"""Składniki: {ingredient_list}
-
-Utwórz {max_recipes} proste przepisy. Każdy przepis max 5 kroków. Krótko. Bez wstępów.
-
-Format JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Tytuł", "steps": ["Krok 1"], "ingredients": ["składnik1"]}}]
-
-Zwróć TYLKO prawidłową tablicę JSON.""",
-            # Portuguese
-            "pt": f"""Ingredientes: {ingredient_list}
-
-Crie {max_recipes} receitas simples. Cada receita máx 5 passos. Mantenha curto. Sem introduções.
-
-Formato JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Título", "steps": ["Passo 1"], "ingredients": ["ing1"]}}]
-
-Retorne APENAS array JSON válido.""",
-            # Romanian
-            "ro": f"""Ingrediente: {ingredient_list}
-
-Creează {max_recipes} rețete simple. Fiecare rețetă max 5 pași. Păstrează scurt. Fără introduceri.
-
-Format JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Titlu", "steps": ["Pas 1"], "ingredients": ["ing1"]}}]
-
-Returnează DOAR array JSON valid.""",
-            # Russian
-            "ru": f"""Ингредиенты: {ingredient_list}
-
-Создайте {max_recipes} простых рецептов. Каждый рецепт макс 5 шагов. Кратко. Без вступлений.
-
-Формат JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Название", "steps": ["Шаг 1"], "ingredients": ["инг1"]}}]
-
-Возвращайте ТОЛЬКО действительный JSON массив.""",
-            # Spanish
-            "es": f"""Ingredientes: {ingredient_list}
-
-Crea {max_recipes} recetas simples. Cada receta máx 5 pasos. Mantén corto. Sin introducciones.
-
-Formato JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Título", "steps": ["Paso 1"], "ingredients": ["ing1"]}}]
-
-Devuelve SOLO array JSON válido.""",
-            # Swedish
-            "sv": f"""Ingredienser: {ingredient_list}
-
-Skapa {max_recipes} enkla recept. Varje recept max 5 steg. Håll kort. Inga inledningar.
-
-JSON format: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Titel", "steps": ["Steg 1"], "ingredients": ["ing1"]}}]
-
-Returnera ENDAST giltigt JSON array.""",
-            # Thai
-            "th": f"""ส่วนผสม: {ingredient_list}
-
-สร้างสูตรอาหารง่ายๆ {max_recipes} รายการ แต่ละสูตรสูงสุด 5 ขั้นตอน สั้นๆ ไม่มีคำนำ
-
-รูปแบบ JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "ชื่อ", "steps": ["ขั้นตอน1"], "ingredients": ["ส่วนผสม1"]}}]
-
-คืนค่าเฉพาะอาร์เรย์ JSON ที่ถูกต้อง""",
-            # Turkish
-            "tr": f"""Malzemeler: {ingredient_list}
-
-{max_recipes} basit tarif oluştur. Her tarif max 5 adım. Kısa tut. Giriş yok.
-
-JSON formatı: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Başlık", "steps": ["Adım 1"], "ingredients": ["malzeme1"]}}]
-
-SADECE geçerli JSON dizisi döndür.""",
-            # Ukrainian
-            "uk": f"""Інгредієнти: {ingredient_list}
-
-Створіть {max_recipes} простих рецептів. Кожен рецепт макс 5 кроків. Коротко. Без вступів.
-
-Формат JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Назва", "steps": ["Крок 1"], "ingredients": ["інг1"]}}]
-
-Повертайте ЛИШЕ дійсний JSON масив.""",
-            # Vietnamese
-            "vi": f"""Nguyên liệu: {ingredient_list}
-
-Tạo {max_recipes} công thức đơn giản. Mỗi công thức tối đa 5 bước. Ngắn gọn. Không giới thiệu.
-
-Định dạng JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Tiêu đề", "steps": ["Bước 1"], "ingredients": ["nguyên liệu1"]}}]
-
-Chỉ trả về mảng JSON hợp lệ.""",
+        prompt = prompt_registry.recipe_prompt(
+            language,
+            ingredient_list=ingredient_list,
+            max_recipes=max_recipes,
+            constraints_text=constraints_text
+        )
+        
+        # COST REDUCTION: Controlled token limit for recipe generation
+        # ~300 tokens per recipe (title, 5 steps, ingredients) = 900 tokens for 3 recipes
+        # Add buffer for JSON structure = ~1000 tokens total
+        recipe_max_tokens = min(1000, max_recipes * 350)  # Scale with number of recipes
+        
+        return {
+            "model": self.text_model,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": system_message + " Always return valid JSON arrays."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            "max_tokens": recipe_max_tokens,  # Controlled limit for cost reduction
+            "temperature": temperature,
+            "response_format": {"type": "json_object"} if max_recipes == 1 else None,
         }
+    
+    async def generate_recipes(
+        self,
+        ingredients: List[Any],
+        language: str = "en",
+        max_recipes: int = 3,
+        user_tier: str = "free",
+        diet_preferences: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate recipes from ingredients using OpenAI GPT-4
         
-        prompt = base_prompts.get(language, base_prompts["en"])
+        Args:
+            ingredients: List of ingredient objects (Pydantic models or dicts) with 'id' and 'name'
+            language: Language code for recipe generation
+            max_recipes: Maximum number of recipes to generate
+            user_tier: 'free' or 'premium' - determines prompt strategy
+            diet_preferences: Optional dict with avoid_ingredients, diet_style, cooking_preferences, religious
+            
+        Returns:
+            Dict with recipes and generation_id
+        """
+        request = self._build_recipe_request(
+            ingredients=ingredients,
+            language=language,
+            max_recipes=max_recipes,
+            user_tier=user_tier,
+            diet_preferences=diet_preferences
+        )
         
         try:
-            # COST REDUCTION: Controlled token limit for recipe generation
-            # ~300 tokens per recipe (title, 5 steps, ingredients) = 900 tokens for 3 recipes
-            # Add buffer for JSON structure = ~1000 tokens total
-            recipe_max_tokens = min(1000, max_recipes * 350)  # Scale with number of recipes
-            
-            response = self.client.chat.completions.create(
-                model=self.text_model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": system_message + " Always return valid JSON arrays."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                max_tokens=recipe_max_tokens,  # Controlled limit for cost reduction
-                temperature=temperature,
-                response_format={"type": "json_object"} if max_recipes == 1 else None
-            )
+            response = await self.gateway.chat("generation", language=language, tier=user_tier, **request)
             
             content = response.choices[0].message.content.strip()
             
             # Parse JSON response
-            import json
-            import re
             try:
                 # Remove markdown code blocks if present
                 if content.startswith("```"):
@@ -574,19 +305,7 @@ Chỉ trả về mảng JSON hợp lệ.""",
                 
                 # Validate and fix recipe structure
                 for recipe in recipes:
-                    # ALWAYS generate a unique ID server-side to prevent collisions
-                    # OpenAI may return generic IDs like "rec_001" which get reused
-                    recipe["id"] = f"rec_{str(uuid.uuid4())[:8]}"
-                    
-                    # Ensure required fields exist
-                    if "emoji" not in recipe:
-                        recipe["emoji"] = "🍽️"
-                    if "badge" not in recipe:
-                        recipe["badge"] = "fastLazy"
-                    if "steps" not in recipe:
-                        recipe["steps"] = []
-                    if "ingredients" not in recipe:
-                        recipe["ingredients"] = []
+                    self._normalize_recipe(recipe)
                 
                 # Generate generation ID
                 generation_id = f"gen_{str(uuid.uuid4())[:12]}"
@@ -626,6 +345,69 @@ Chỉ trả về mảng JSON hợp lệ.""",
         except Exception as e:
             raise Exception(f"OpenAI API error: {str(e)}")
     
+    async def stream_recipes(
+        self,
+        ingredients: List[Any],
+        language: str = "en",
+        max_recipes: int = 3,
+        user_tier: str = "free",
+        diet_preferences: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Generate recipes and yield each one as soon as its JSON object is complete
+        
+        Args:
+            Same as generate_recipes
+            
+        Yields:
+            Normalized recipe dicts (with server-side id)
+        """
+        request = self._build_recipe_request(
+            ingredients=ingredients,
+            language=language,
+            max_recipes=max_recipes,
+            user_tier=user_tier,
+            diet_preferences=diet_preferences
+        )
+        parser = RecipeStreamParser()
+        count = 0
+        
+        stream = self.gateway.stream_chat("generation", language=language, tier=user_tier, **request)
+        try:
+            async for delta in stream:
+                if count >= max_recipes:
+                    # Read to the end without yielding so the finish reason and token usage are recorded
+                    continue
+                for recipe in parser.feed(delta):
+                    yield self._normalize_recipe(recipe)
+                    count += 1
+                    if count >= max_recipes:
+                        break
+        except Exception as e:
+            raise Exception(f"OpenAI API error: {str(e)}")
+        finally:
+            await stream.aclose()
+        
+        if count == 0:
+            raise Exception(f"Failed to parse recipe JSON from OpenAI stream. Content: {parser.text[:200]}")
+    
+    def _normalize_recipe(self, recipe: Dict[str, Any]) -> Dict[str, Any]:
+        """Assign server-side ID and fill in missing fields"""
+        # ALWAYS generate a unique ID server-side to prevent collisions
+        # OpenAI may return generic IDs like "rec_001" which get reused
+        recipe["id"] = f"rec_{str(uuid.uuid4())[:8]}"
+        
+        # Ensure required fields exist
+        if "emoji" not in recipe:
+            recipe["emoji"] = "🍽️"
+        if "badge" not in recipe:
+            recipe["badge"] = "fastLazy"
+        if "steps" not in recipe:
+            recipe["steps"] = []
+        if "ingredients" not in recipe:
+            recipe["ingredients"] = []
+        return recipe
+    
     async def translate_recipe(
         self,
         recipe: Dict[str, Any],
@@ -658,7 +440,10 @@ Ingredients: {', '.join(recipe.get('ingredients', []))}"""
         prompt = translation_prompts.get(target_language, f"Translate this recipe to {target_language}. Maintain the same structure, format, and emoji. Return as JSON with the same structure as the original recipe.")
         
         try:
-            response = self.client.chat.completions.create(
+            response = await self.gateway.chat(
+                "translation",
+                language=target_language,
+                tier="shared",  # Translations are cached for every user
                 model=self.text_model,
                 messages=[
                     {
@@ -677,8 +462,6 @@ Ingredients: {', '.join(recipe.get('ingredients', []))}"""
             content = response.choices[0].message.content.strip()
             
             # Parse JSON response
-            import json
-            import re
             
             # Remove markdown if present
             if content.startswith("```"):
@@ -698,5 +481,117 @@ Ingredients: {', '.join(recipe.get('ingredients', []))}"""
         except Exception as e:
             raise Exception(f"Translation failed: {str(e)}")
 
+    
+    async def translate_recipes(
+        self,
+        recipes: List[Dict[str, Any]],
+        target_language: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Translate several recipes in one request
+        
+        Recipes are packed into one JSON payload and the output is split back
+        by recipe id. Any recipe missing from the output or failing validation
+        is retried with translate_recipe on its own.
+        
+        Args:
+            recipes: Recipe dicts with id, emoji, badge, title, steps, ingredients
+            target_language: Target language code
+            
+        Returns:
+            Dict of recipe_id -> translated recipe (failed recipes are omitted)
+        """
+        if not recipes:
+            return {}
+        
+        by_id = {recipe["id"]: recipe for recipe in recipes}
+        payload = [
+            {
+                "id": recipe["id"],
+                "title": recipe.get("title", ""),
+                "steps": recipe.get("steps", []),
+                "ingredients": recipe.get("ingredients", []),
+            }
+            for recipe in recipes
+        ]
+        
+        translated: Dict[str, Dict[str, Any]] = {}
+        try:
+            response = await self.gateway.chat(
+                "translation",
+                language=target_language,
+                tier="shared",  # Translations are cached for every user
+                model=self.text_model,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a recipe translator. Translate recipes accurately while maintaining the same structure. Never change ids. Always return valid JSON."
+                    },
+                    {
+                        "role": "user",
+                        "content": f"Translate the title, steps and ingredients of each recipe to the language with code '{target_language}'. Keep the same number of steps.\n\n{json.dumps(payload, ensure_ascii=False)}\n\nReturn JSON: {{\"recipes\": [{{\"id\": \"...\", \"title\": \"...\", \"steps\": [...], \"ingredients\": [...]}}]}}"
+                    }
+                ],
+                # Output is about as long as the input
+                max_tokens=min(self.max_tokens * 2, TRANSLATION_TOKENS_PER_RECIPE * len(recipes)),
+                temperature=0.5,  # Lower temperature for more accurate translation
+                response_format={"type": "json_object"},
+            )
+            data = json.loads(response.choices[0].message.content)
+            items = data.get("recipes", []) if isinstance(data, dict) else []
+        except Exception:
+            # Whole batch failed - fall back to per-recipe calls below
+            items = []
+        
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            original = by_id.get(item.get("id"))
+            if original is None or original["id"] in translated:
+                continue
+            if not self._is_valid_translation(item, original):
+                continue
+            translated[original["id"]] = {
+                "id": original["id"],
+                "emoji": original.get("emoji"),
+                "badge": original.get("badge"),  # Badge names stay the same
+                "title": item["title"],
+                "steps": item["steps"],
+                "ingredients": item.get("ingredients") or [],
+            }
+        
+        # Fallback: translate anything that failed validation on its own, concurrently
+        # (the gateway semaphore caps how many calls are in flight)
+        missing = [recipe for recipe_id, recipe in by_id.items() if recipe_id not in translated]
+        results = await asyncio.gather(
+            *(self.translate_recipe(recipe, target_language) for recipe in missing),
+            return_exceptions=True
+        )
+        for recipe, result in zip(missing, results):
+            # Same checks as batch items; recipes still failing are left untranslated
+            if isinstance(result, BaseException) or not self._is_valid_translation(result, recipe):
+                continue
+            result["ingredients"] = result.get("ingredients") or []
+            translated[recipe["id"]] = result
+        
+        return translated
+    
+    @staticmethod
+    def _is_valid_translation(item: Dict[str, Any], original: Dict[str, Any]) -> bool:
+        """Check a batch translation item has the right shape"""
+        if not isinstance(item.get("title"), str) or not item["title"].strip():
+            return False
+        steps = item.get("steps")
+        if not isinstance(steps, list) or not all(isinstance(step, str) for step in steps):
+            return False
+        if len(steps) != len(original.get("steps") or []):
+            return False
+        ingredients = item.get("ingredients", [])
+        if ingredients is not None and (
+            not isinstance(ingredients, list) or not all(isinstance(i, str) for i in ingredients)
+        ):
+            return False
+        return True
+
 
 openai_service = OpenAIService()
@@ -0,0 +1,185 @@
+"""Background pre-translation of freshly generated recipes"""
+import asyncio
+import itertools
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.db import AsyncSessionLocal
+from app.models import RecipeCache
+from app.services.translation_service import translation_service
+
+
+@dataclass
+class PretranslationJob:
+    """Translate a set of recipes into one language"""
+    recipe_ids: List[str]
+    language: str
+    attempt: int = 0
+
+
+class PretranslationQueue:
+    """
+    In-process priority queue that pre-translates new recipes into hot languages
+
+    After a generation commits, its recipes are queued once per language in
+    PRETRANSLATE_LANGUAGES, so the first reader in those languages gets a
+    RecipeCache hit instead of waiting for the LLM. Workers share a rate limit
+    (jobs per minute) and retry failed jobs with exponential backoff.
+    """
+
+    PRIORITY_HIGH = 0  # Premium users
+    PRIORITY_NORMAL = 10
+
+    def __init__(self):
+        self.languages = [
+            lang.strip() for lang in settings.pretranslate_languages.split(",") if lang.strip()
+        ]
+        self.worker_count = settings.pretranslate_workers
+        self.max_retries = settings.pretranslate_max_retries
+        self.interval = 60.0 / settings.pretranslate_rate_per_minute if settings.pretranslate_rate_per_minute > 0 else 0.0
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._retries: set = set()
+        self._sequence = itertools.count()  # FIFO order within a priority
+        self._next_slot = 0.0
+        self._rate_lock: Optional[asyncio.Lock] = None
+        self.stats = {"enqueued": 0, "completed": 0, "retried": 0, "failed": 0, "dropped": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.languages) and self.worker_count > 0
+
+    def start(self) -> None:
+        """Start worker tasks (called on application startup)"""
+        if not self.enabled or self._workers:
+            return
+        self._queue = asyncio.PriorityQueue(maxsize=settings.pretranslate_queue_size)
+        self._rate_lock = asyncio.Lock()
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.worker_count)
+        ]
+
+    async def stop(self) -> None:
+        """Cancel workers (called on application shutdown); queued jobs are dropped"""
+        for task in self._workers + list(self._retries):
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._retries, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def enqueue_recipes(
+        self,
+        recipe_ids: List[str],
+        source_language: str,
+        priority: int = PRIORITY_NORMAL
+    ) -> int:
+        """
+        Queue recipes for translation into every hot language except the source
+
+        Args:
+            recipe_ids: Newly generated recipe IDs
+            source_language: Language the recipes were generated in
+            priority: Lower runs first
+
+        Returns:
+            Number of jobs queued
+        """
+        if self._queue is None or not recipe_ids:
+            return 0
+        queued = 0
+        for language in self.languages:
+            if language == source_language:
+                continue
+            if self._put(PretranslationJob(recipe_ids=list(recipe_ids), language=language), priority):
+                queued += 1
+        return queued
+
+    def _put(self, job: PretranslationJob, priority: int) -> bool:
+        try:
+            self._queue.put_nowait((priority, next(self._sequence), job))
+        except asyncio.QueueFull:
+            # Pre-translation is best effort - readers still translate on demand
+            self.stats["dropped"] += 1
+            return False
+        self.stats["enqueued"] += 1
+        return True
+
+    async def _wait_for_rate_limit(self) -> None:
+        """Space jobs out to at most pretranslate_rate_per_minute across workers"""
+        if not self.interval:
+            return
+        async with self._rate_lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def _worker(self) -> None:
+        while True:
+            priority, _, job = await self._queue.get()
+            try:
+                await self._wait_for_rate_limit()
+                await self._run(job)
+                self.stats["completed"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._retry(job, priority)
+            finally:
+                self._queue.task_done()
+
+    def _retry(self, job: PretranslationJob, priority: int) -> None:
+        if job.attempt >= self.max_retries:
+            self.stats["failed"] += 1
+            return
+        job.attempt += 1
+        self.stats["retried"] += 1
+
+        async def requeue():
+            await asyncio.sleep(2 ** job.attempt)  # Exponential backoff: 2s, 4s, 8s...
+            if self._queue is not None:
+                # Retries yield to fresh work of the same priority
+                self._put(job, priority + 1)
+
+        task = asyncio.create_task(requeue())
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _run(self, job: PretranslationJob) -> None:
+        """Translate recipes not yet cached in the job's language"""
+        async with AsyncSessionLocal() as db:
+            cached = set((await db.scalars(
+                select(RecipeCache.recipe_id).where(
+                    RecipeCache.recipe_id.in_(job.recipe_ids),
+                    RecipeCache.language == job.language
+                )
+            )).all())
+            missing = [recipe_id for recipe_id in job.recipe_ids if recipe_id not in cached]
+            if not missing:
+                return
+
+            translated, _ = await translation_service.translate_missing(
+                db=db,
+                recipe_ids=missing,
+                language=job.language
+            )
+            remaining = [recipe_id for recipe_id in missing if recipe_id not in translated]
+            if remaining:
+                job.recipe_ids = remaining
+                raise Exception(f"Failed to translate {len(remaining)} recipe(s) to {job.language}")
+
+    def status(self) -> Dict[str, Any]:
+        """Queue depth and job counters"""
+        return {
+            "languages": self.languages,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            **self.stats,
+        }
+
+
+pretranslation_queue = PretranslationQueue()
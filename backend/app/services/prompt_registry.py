@@ -0,0 +1,512 @@
+"""Prompt registry - per-language prompt templates, loaded and validated once at import"""
+import re
+from string import Formatter
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Pattern
+
+
+# Language order matches Flutter AppLanguage enum: english, arabic, bengali, chinese, danish, dutch, finnish, french, german, greek, hebrew, hindi, indonesian, italian, japanese, korean, norwegian, polish, portuguese, romanian, russian, spanish, swedish, thai, turkish, ukrainian, vietnamese
+SUPPORTED_LANGUAGES = (
+    "en", "ar", "bn", "zh", "da", "nl", "fi", "fr", "de", "el", "he", "hi", "id", "it",
+    "ja", "ko", "no", "pl", "pt", "ro", "ru", "es", "sv", "th", "tr", "uk", "vi",
+)
+
+DEFAULT_LANGUAGE = "en"
+
+# Ingredient detection (vision) prompts
+# COST REDUCTION: Return ONLY comma-separated list, no JSON, no descriptions, max 10 items
+# IMPORTANT: Only food ingredients, ignore hands, backgrounds, surfaces, containers
+DETECTION_PROMPTS = {
+    # English (first)
+    "en": "Return ONLY food ingredients separated by commas. Ignore hands, backgrounds, surfaces, containers. No explanations. Max 10 items.",
+    # Arabic
+    "ar": "أعد فقط مكونات الطعام مفصولة بفواصل. تجاهل الأيدي والخلفيات والأسطح والحاويات. لا تفسيرات. حد أقصى 10 عناصر.",
+    # Bengali
+    "bn": "শুধুমাত্র খাদ্য উপাদান কমা দ্বারা পৃথক করে ফেরত দিন। হাত, পটভূমি, পৃষ্ঠতল, পাত্র উপেক্ষা করুন। কোন ব্যাখ্যা নেই। সর্বোচ্চ 10টি আইটেম।",
+    # Chinese
+    "zh": "只返回用逗号分隔的食物成分。忽略手、背景、表面、容器。无解释。最多10项。",
+    # Danish
+    "da": "Returner kun madingredienser adskilt af kommaer. Ignorer hænder, baggrunde, overflader, beholdere. Ingen forklaringer. Max 10 emner.",
+    # Dutch
+    "nl": "Geef alleen voedselingrediënten gescheiden door komma's. Negeer handen, achtergronden, oppervlakken, containers. Geen uitleg. Max 10 items.",
+    # Finnish
+    "fi": "Palauta vain ruoka-aineet pilkuilla erotettuina. Ohita kädet, taustat, pinnat, astiat. Ei selityksiä. Max 10 kohdetta.",
+    # French
+    "fr": "Retournez uniquement des ingrédients alimentaires séparés par des virgules. Ignorez les mains, arrière-plans, surfaces, contenants. Pas d'explications. Max 10 éléments.",
+    # German
+    "de": "Geben Sie nur Lebensmittelzutaten durch Kommas getrennt zurück. Ignorieren Sie Hände, Hintergründe, Oberflächen, Behälter. Keine Erklärungen. Max 10 Artikel.",
+    # Greek
+    "el": "Επιστρέψτε μόνο συστατικά φαγητού διαχωρισμένα με κόμματα. Αγνοήστε χέρια, φόντα, επιφάνειες, δοχεία. Χωρίς εξηγήσεις. Μέγιστο 10 στοιχεία.",
+    # Hebrew
+    "he": "החזר רק מרכיבי מזון מופרדים בפסיקים. התעלם מידיים, רקעים, משטחים, מיכלים. ללא הסברים. מקסימום 10 פריטים.",
+    # Hindi
+    "hi": "केवल खाद्य सामग्री अल्पविराम से अलग करके लौटाएं। हाथ, पृष्ठभूमि, सतह, कंटेनर को नजरअंदाज करें। कोई स्पष्टीकरण नहीं। अधिकतम 10 आइटम।",
+    # Indonesian
+    "id": "Kembalikan hanya bahan makanan yang dipisahkan koma. Abaikan tangan, latar belakang, permukaan, wadah. Tanpa penjelasan. Maks 10 item.",
+    # Italian
+    "it": "Restituisci solo ingredienti alimentari separati da virgole. Ignora mani, sfondi, superfici, contenitori. Nessuna spiegazione. Max 10 elementi.",
+    # Japanese
+    "ja": "食品材料のみをカンマ区切りで返す。手、背景、床、光、表面、容器は無視。説明なし。最大10項目。",
+    # Korean
+    "ko": "음식 재료만 쉼표로 구분하여 반환. 손, 배경, 바닥, 표면, 용기는 무시. 설명 없음. 최대 10개 항목.",
+    # Norwegian
+    "no": "Returner kun matingredienser adskilt med kommaer. Ignorer hender, bakgrunner, overflater, beholdere. Ingen forklaringer. Maks 10 elementer.",
+    # Polish
+    "pl": "Zwróć tylko składniki żywności oddzielone przecinkami. Ignoruj dłonie, tła, powierzchnie, pojemniki. Bez wyjaśnień. Max 10 pozycji.",
+    # Portuguese
+    "pt": "Retorne apenas ingredientes alimentares separados por vírgulas. Ignore mãos, fundos, superfícies, recipientes. Sem explicações. Máx 10 itens.",
+    # Romanian
+    "ro": "Returnează doar ingrediente alimentare separate prin virgulă. Ignoră mâinile, fundalurile, suprafețele, containerele. Fără explicații. Max 10 elemente.",
+    # Russian
+    "ru": "Верните только пищевые ингредиенты через запятую. Игнорируйте руки, фоны, поверхности, контейнеры. Без объяснений. Макс 10 элементов.",
+    # Spanish
+    "es": "Devuelve solo ingredientes alimentarios separados por comas. Ignora manos, fondos, superficies, contenedores. Sin explicaciones. Máx 10 elementos.",
+    # Swedish
+    "sv": "Returnera endast livsmedelsingredienser separerade med kommatecken. Ignorera händer, bakgrunder, ytor, behållare. Inga förklaringar. Max 10 objekt.",
+    # Thai
+    "th": "คืนเฉพาะส่วนผสมอาหารที่คั่นด้วยจุลภาค ไม่สนใจมือ พื้นหลัง พื้นผิว ภาชนะ ไม่มีคำอธิบาย สูงสุด 10 รายการ",
+    # Turkish
+    "tr": "Sadece virgülle ayrılmış gıda malzemeleri döndür. Elleri, arka planları, yüzeyleri, kapları yoksay. Açıklama yok. Maks 10 öğe.",
+    # Ukrainian
+    "uk": "Поверніть лише харчові інгредієнти через кому. Ігноруйте руки, фони, поверхні, контейнери. Без пояснень. Макс 10 елементів.",
+    # Vietnamese
+    "vi": "Chỉ trả về nguyên liệu thực phẩm cách nhau bằng dấu phẩy. Bỏ qua tay, nền, bề mặt, hộp đựng. Không giải thích. Tối đa 10 mục.",
+}
+
+# Recipe generation prompts - str.format templates (literal JSON braces are doubled)
+# COST REDUCTION: Shorter, focused prompts - max 5 steps per recipe, keep it short
+# Placeholders: ingredient_list, constraints_text (premium diet constraints, may be empty), max_recipes
+RECIPE_PROMPTS = {
+    # English (first)
+    "en": """Ingredients: {ingredient_list}{constraints_text}
+
+Create {max_recipes} simple recipes. Each recipe max 5 steps. Keep it short. No introductions.
+
+JSON format:
+[
+  {{"emoji": "🍝", "badge": "fastLazy", "title": "Title", "steps": ["Step 1", "Step 2"], "ingredients": ["ing1", "ing2"]}},
+  ...
+]
+
+Return ONLY valid JSON array. Do not include "id" field - it will be generated automatically.""",
+    # Arabic
+    "ar": """المكونات: {ingredient_list}{constraints_text}
+
+أنشئ {max_recipes} وصفات بسيطة. كل وصفة بحد أقصى 5 خطوات. اجعلها قصيرة. بدون مقدمات.
+
+تنسيق JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "العنوان", "steps": ["خطوة 1"], "ingredients": ["مكون1"]}}]
+
+أعد مصفوفة JSON صالحة فقط.""",
+    # Bengali
+    "bn": """উপাদান: {ingredient_list}{constraints_text}
+
+{max_recipes}টি সহজ রেসিপি তৈরি করুন। প্রতিটি রেসিপি সর্বোচ্চ 5 ধাপ। সংক্ষিপ্ত রাখুন। কোন ভূমিকা নেই।
+
+JSON ফরম্যাট: [{{"emoji": "🍝", "badge": "fastLazy", "title": "শিরোনাম", "steps": ["ধাপ 1"], "ingredients": ["উপাদান1"]}}]
+
+শুধুমাত্র বৈধ JSON অ্যারে ফেরত দিন।""",
+    # Chinese
+    "zh": """食材: {ingredient_list}{constraints_text}
+
+创建{max_recipes}个简单食谱。每个食谱最多5步。保持简短。无介绍。
+
+JSON格式: [{{"emoji": "🍝", "badge": "fastLazy", "title": "标题", "steps": ["步骤1"], "ingredients": ["食材1"]}}]
+
+仅返回有效JSON数组。""",
+    # Danish
+    "da": """Ingredienser: {ingredient_list}{constraints_text}
+
+Lav {max_recipes} simple opskrifter. Hver opskrift max 5 trin. Hold det kort. Ingen introduktioner.
+
+JSON format: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Titel", "steps": ["Trin 1"], "ingredients": ["ing1"]}}]
+
+Returner KUN gyldig JSON array.""",
+    # Dutch
+    "nl": """Ingrediënten: {ingredient_list}{constraints_text}
+
+Maak {max_recipes} eenvoudige recepten. Elk recept max 5 stappen. Houd het kort. Geen inleidingen.
+
+JSON formaat: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Titel", "steps": ["Stap 1"], "ingredients": ["ing1"]}}]
+
+Geef ALLEEN geldig JSON array terug.""",
+    # Finnish
+    "fi": """Aineet: {ingredient_list}{constraints_text}
+
+Luo {max_recipes} yksinkertaista reseptiä. Jokainen resepti max 5 vaihetta. Pidä lyhyenä. Ei johdantoja.
+
+JSON muoto: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Otsikko", "steps": ["Vaihe 1"], "ingredients": ["aine1"]}}]
+
+Palauta VAIN kelvollinen JSON taulukko.""",
+    # French
+    "fr": """Ingrédients: {ingredient_list}{constraints_text}
+
+Créez {max_recipes} recettes simples. Chaque recette max 5 étapes. Gardez court. Pas d'introductions.
+
+Format JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Titre", "steps": ["Étape 1"], "ingredients": ["ing1"]}}]
+
+Retournez UNIQUEMENT un tableau JSON valide.""",
+    # German
+    "de": """Zutaten: {ingredient_list}{constraints_text}
+
+Erstellen Sie {max_recipes} einfache Rezepte. Jedes Rezept max 5 Schritte. Kurz halten. Keine Einleitungen.
+
+JSON Format: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Titel", "steps": ["Schritt 1"], "ingredients": ["Zutat1"]}}]
+
+Geben Sie NUR gültiges JSON Array zurück.""",
+    # Greek
+    "el": """Συστατικά: {ingredient_list}{constraints_text}
+
+Δημιουργήστε {max_recipes} απλές συνταγές. Κάθε συνταγή max 5 βήματα. Κρατήστε το σύντομο. Χωρίς εισαγωγές.
+
+JSON μορφή: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Τίτλος", "steps": ["Βήμα 1"], "ingredients": ["συσ1"]}}]
+
+Επιστρέψτε ΜΟΝΟ έγκυρο JSON array.""",
+    # Hebrew
+    "he": """מרכיבים: {ingredient_list}{constraints_text}
+
+צור {max_recipes} מתכונים פשוטים. כל מתכון מקסימום 5 שלבים. שמור קצר. ללא הקדמות.
+
+פורמט JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "כותרת", "steps": ["שלב 1"], "ingredients": ["מרכיב1"]}}]
+
+החזר רק מערך JSON תקין.""",
+    # Hindi
+    "hi": """सामग्री: {ingredient_list}{constraints_text}
+
+{max_recipes} सरल व्यंजन बनाएं। प्रत्येक व्यंजन अधिकतम 5 चरण। संक्षिप्त रखें। कोई परिचय नहीं।
+
+JSON प्रारूप: [{{"emoji": "🍝", "badge": "fastLazy", "title": "शीर्षक", "steps": ["चरण 1"], "ingredients": ["सामग्री1"]}}]
+
+केवल वैध JSON सरणी लौटाएं।""",
+    # Indonesian
+    "id": """Bahan: {ingredient_list}{constraints_text}
+
+Buat {max_recipes} resep sederhana. Setiap resep max 5 langkah. Buat singkat. Tanpa pengantar.
+
+Format JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Judul", "steps": ["Langkah 1"], "ingredients": ["bahan1"]}}]
+
+Kembalikan HANYA array JSON yang valid.""",
+    # Italian
+    "it": """Ingredienti: {ingredient_list}{constraints_text}
+
+Crea {max_recipes} ricette semplici. Ogni ricetta max 5 passi. Mantieni breve. Nessuna introduzione.
+
+Formato JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Titolo", "steps": ["Passo 1"], "ingredients": ["ing1"]}}]
+
+Restituisci SOLO array JSON valido.""",
+    # Japanese
+    "ja": """材料: {ingredient_list}{constraints_text}
+
+{max_recipes}つの簡単なレシピを作成。各レシピ最大5ステップ。簡潔に。紹介なし。
+
+JSON形式: [{{"emoji": "🍝", "badge": "fastLazy", "title": "タイトル", "steps": ["ステップ1"], "ingredients": ["材料1"]}}]
+
+有効なJSON配列のみ返す。""",
+    # Korean
+    "ko": """재료: {ingredient_list}{constraints_text}
+
+{max_recipes}개의 간단한 레시피 생성. 각 레시피 최대 5단계. 간결하게. 소개 없음.
+
+JSON 형식: [{{"emoji": "🍝", "badge": "fastLazy", "title": "제목", "steps": ["단계1"], "ingredients": ["재료1"]}}]
+
+유효한 JSON 배열만 반환.""",
+    # Norwegian
+    "no": """Ingredienser: {ingredient_list}{constraints_text}
+
+Lag {max_recipes} enkle oppskrifter. Hver oppskrift max 5 steg. Hold kort. Ingen introduksjoner.
+
+JSON format: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Tittel", "steps": ["Steg 1"], "ingredients": ["ing1"]}}]
+
+Returner KUN gyldig JSON array.""",
+    # Polish
+    "pl": """Składniki: {ingredient_list}{constraints_text}
+
+Utwórz {max_recipes} proste przepisy. Każdy przepis max 5 kroków. Krótko. Bez wstępów.
+
+Format JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Tytuł", "steps": ["Krok 1"], "ingredients": ["składnik1"]}}]
+
+Zwróć TYLKO prawidłową tablicę JSON.""",
+    # Portuguese
+    "pt": """Ingredientes: {ingredient_list}{constraints_text}
+
+Crie {max_recipes} receitas simples. Cada receita máx 5 passos. Mantenha curto. Sem introduções.
+
+Formato JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Título", "steps": ["Passo 1"], "ingredients": ["ing1"]}}]
+
+Retorne APENAS array JSON válido.""",
+    # Romanian
+    "ro": """Ingrediente: {ingredient_list}{constraints_text}
+
+Creează {max_recipes} rețete simple. Fiecare rețetă max 5 pași. Păstrează scurt. Fără introduceri.
+
+Format JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Titlu", "steps": ["Pas 1"], "ingredients": ["ing1"]}}]
+
+Returnează DOAR array JSON valid.""",
+    # Russian
+    "ru": """Ингредиенты: {ingredient_list}{constraints_text}
+
+Создайте {max_recipes} простых рецептов. Каждый рецепт макс 5 шагов. Кратко. Без вступлений.
+
+Формат JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Название", "steps": ["Шаг 1"], "ingredients": ["инг1"]}}]
+
+Возвращайте ТОЛЬКО действительный JSON массив.""",
+    # Spanish
+    "es": """Ingredientes: {ingredient_list}{constraints_text}
+
+Crea {max_recipes} recetas simples. Cada receta máx 5 pasos. Mantén corto. Sin introducciones.
+
+Formato JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Título", "steps": ["Paso 1"], "ingredients": ["ing1"]}}]
+
+Devuelve SOLO array JSON válido.""",
+    # Swedish
+    "sv": """Ingredienser: {ingredient_list}{constraints_text}
+
+Skapa {max_recipes} enkla recept. Varje recept max 5 steg. Håll kort. Inga inledningar.
+
+JSON format: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Titel", "steps": ["Steg 1"], "ingredients": ["ing1"]}}]
+
+Returnera ENDAST giltigt JSON array.""",
+    # Thai
+    "th": """ส่วนผสม: {ingredient_list}{constraints_text}
+
+สร้างสูตรอาหารง่ายๆ {max_recipes} รายการ แต่ละสูตรสูงสุด 5 ขั้นตอน สั้นๆ ไม่มีคำนำ
+
+รูปแบบ JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "ชื่อ", "steps": ["ขั้นตอน1"], "ingredients": ["ส่วนผสม1"]}}]
+
+คืนค่าเฉพาะอาร์เรย์ JSON ที่ถูกต้อง""",
+    # Turkish
+    "tr": """Malzemeler: {ingredient_list}{constraints_text}
+
+{max_recipes} basit tarif oluştur. Her tarif max 5 adım. Kısa tut. Giriş yok.
+
+JSON formatı: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Başlık", "steps": ["Adım 1"], "ingredients": ["malzeme1"]}}]
+
+SADECE geçerli JSON dizisi döndür.""",
+    # Ukrainian
+    "uk": """Інгредієнти: {ingredient_list}{constraints_text}
+
+Створіть {max_recipes} простих рецептів. Кожен рецепт макс 5 кроків. Коротко. Без вступів.
+
+Формат JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Назва", "steps": ["Крок 1"], "ingredients": ["інг1"]}}]
+
+Повертайте ЛИШЕ дійсний JSON масив.""",
+    # Vietnamese
+    "vi": """Nguyên liệu: {ingredient_list}{constraints_text}
+
+Tạo {max_recipes} công thức đơn giản. Mỗi công thức tối đa 5 bước. Ngắn gọn. Không giới thiệu.
+
+Định dạng JSON: [{{"emoji": "🍝", "badge": "fastLazy", "title": "Tiêu đề", "steps": ["Bước 1"], "ingredients": ["nguyên liệu1"]}}]
+
+Chỉ trả về mảng JSON hợp lệ.""",
+}
+
+RECIPE_PLACEHOLDERS = frozenset({"ingredient_list", "constraints_text", "max_recipes"})
+
+# Non-food items to filter out of detection results
+# Matched as whole words, except in languages without reliable word boundaries (SUBSTRING_LANGUAGES),
+# where short keywords in WHOLE_NAME_KEYWORDS only match the whole name
+NON_FOOD_KEYWORDS = {
+    'en': ['hand', 'hands', 'background', 'floor', 'surface', 'light', 'container', 'table', 'counter'],
+    'ar': ['يد', 'خلفية', 'أرضية', 'ضوء', 'سطح', 'حاوية'],
+    'bn': ['হাত', 'পটভূমি', 'মেঝে', 'আলো', 'পৃষ্ঠ', 'পাত্র', 'টেবিল'],
+    'zh': ['手', '背景', '地板', '光', '表面', '容器'],
+    'da': ['hånd', 'hænder', 'baggrund', 'gulv', 'overflade', 'lys', 'beholder', 'bord', 'køkkenbord'],
+    'nl': ['hand', 'handen', 'achtergrond', 'vloer', 'oppervlak', 'licht', 'container', 'tafel', 'aanrecht'],
+    'fi': ['käsi', 'kädet', 'tausta', 'lattia', 'pinta', 'valo', 'astia', 'pöytä', 'työtaso'],
+    'fr': ['main', 'mains', 'arrière-plan', 'sol', 'surface', 'lumière', 'contenant', 'récipient', 'table', 'comptoir', 'plan de travail'],
+    'de': ['hand', 'hände', 'hintergrund', 'boden', 'oberfläche', 'licht', 'behälter', 'tisch', 'arbeitsplatte'],
+    'el': ['χέρι', 'χέρια', 'φόντο', 'πάτωμα', 'επιφάνεια', 'φως', 'δοχείο', 'τραπέζι', 'πάγκος'],
+    'he': ['יד', 'ידיים', 'רקע', 'רצפה', 'משטח', 'אור', 'מיכל', 'שולחן'],
+    'hi': ['हाथ', 'पृष्ठभूमि', 'फर्श', 'रोशनी', 'सतह', 'कंटेनर', 'मेज़', 'टेबल'],
+    'id': ['tangan', 'latar belakang', 'lantai', 'permukaan', 'cahaya', 'wadah', 'meja'],
+    'it': ['mano', 'mani', 'sfondo', 'pavimento', 'superficie', 'luce', 'contenitore', 'tavolo', 'bancone'],
+    'ja': ['手', '背景', '床', '光', '表面', '容器', 'テーブル', 'カウンター'],
+    'ko': ['손', '배경', '바닥', '빛', '표면', '용기'],
+    'no': ['hånd', 'hender', 'bakgrunn', 'gulv', 'overflate', 'lys', 'beholder', 'bord', 'benk'],
+    'pl': ['ręka', 'ręce', 'dłoń', 'dłonie', 'tło', 'podłoga', 'powierzchnia', 'światło', 'pojemnik', 'stół', 'blat'],
+    'pt': ['mão', 'mãos', 'fundo', 'chão', 'superfície', 'luz', 'recipiente', 'mesa', 'bancada'],
+    'ro': ['mână', 'mâini', 'fundal', 'podea', 'suprafață', 'lumină', 'recipient', 'masă', 'blat'],
+    'ru': ['рука', 'руки', 'фон', 'пол', 'поверхность', 'свет', 'контейнер', 'стол', 'столешница'],
+    'es': ['mano', 'manos', 'fondo', 'suelo', 'piso', 'superficie', 'luz', 'recipiente', 'contenedor', 'mesa', 'encimera'],
+    'sv': ['hand', 'händer', 'bakgrund', 'golv', 'yta', 'ljus', 'behållare', 'bord', 'bänk'],
+    'th': ['มือ', 'พื้นหลัง', 'พื้น', 'แสง', 'พื้นผิว', 'ภาชนะ', 'โต๊ะ'],
+    'tr': ['el', 'eller', 'arka plan', 'zemin', 'yüzey', 'ışık', 'kap', 'masa', 'tezgah'],
+    'uk': ['рука', 'руки', 'фон', 'підлога', 'поверхня', 'світло', 'контейнер', 'стіл', 'стільниця'],
+    'vi': ['tay', 'bàn tay', 'nền', 'sàn', 'bề mặt', 'ánh sáng', 'hộp đựng', 'bàn'],
+}
+
+# Error messages to filter out of detection results (apologies, can't identify, etc.)
+# Matched anywhere in the name; English phrases apply to every language
+DETECTION_ERROR_MESSAGES = {
+    'en': ['sorry', "i'm sorry", "i can't", "can't identify", "cannot identify", "unable to identify", "no ingredients", "no food"],
+    'ar': ['آسف', 'عذراً', 'لا يمكن', 'لا أستطيع', 'لم أتمكن'],
+    'bn': ['দুঃখিত', 'শনাক্ত করতে পারছি না', 'সনাক্ত করা সম্ভব নয়', 'কোন উপাদান নেই'],
+    'zh': ['抱歉', '对不起', '无法识别', '无法确定', '不能识别'],
+    'da': ['beklager', 'undskyld', 'kan ikke identificere', 'ingen ingredienser'],
+    'nl': ['het spijt me', 'kan niet identificeren', 'kan geen', 'geen ingrediënten'],
+    'fi': ['pahoittelen', 'anteeksi', 'en pysty tunnistamaan', 'ei ainesosia'],
+    'fr': ['désolé', 'je ne peux pas', "impossible d'identifier", 'aucun ingrédient'],
+    'de': ['entschuldigung', 'es tut mir leid', 'kann nicht identifizieren', 'keine zutaten'],
+    'el': ['λυπάμαι', 'συγγνώμη', 'δεν μπορώ', 'δεν είναι δυνατή η αναγνώριση'],
+    'he': ['מצטער', 'סליחה', 'לא ניתן לזהות', 'אין מרכיבים'],
+    'hi': ['क्षमा करें', 'माफ़ करें', 'पहचान नहीं', 'कोई सामग्री नहीं'],
+    'id': ['maaf', 'tidak dapat mengidentifikasi', 'tidak bisa mengidentifikasi', 'tidak ada bahan'],
+    'it': ['mi dispiace', 'non riesco', 'impossibile identificare', 'nessun ingrediente'],
+    'ja': ['申し訳', 'ごめん', '特定できません', '特定することはできません', '材料を特定', '食品材料を特定', '材料が見つかりません'],
+    'ko': ['죄송', '미안', '식별할 수 없', '재료를 찾을 수 없'],
+    'no': ['beklager', 'kan ikke identifisere', 'ingen ingredienser'],
+    'pl': ['przepraszam', 'nie mogę', 'nie można zidentyfikować', 'brak składników'],
+    'pt': ['desculpe', 'sinto muito', 'não consigo', 'não é possível identificar', 'nenhum ingrediente'],
+    'ro': ['îmi pare rău', 'scuze', 'nu pot identifica', 'niciun ingredient'],
+    'ru': ['извините', 'к сожалению', 'не могу определить', 'не удалось определить', 'нет ингредиентов'],
+    'es': ['lo siento', 'perdón', 'no puedo', 'no es posible identificar', 'ningún ingrediente'],
+    'sv': ['ursäkta', 'tyvärr', 'kan inte identifiera', 'inga ingredienser'],
+    'th': ['ขออภัย', 'ขอโทษ', 'ไม่สามารถระบุ', 'ไม่พบวัตถุดิบ'],
+    'tr': ['üzgünüm', 'özür dilerim', 'tanımlayamıyorum', 'malzeme bulunamadı'],
+    'uk': ['вибачте', 'на жаль', 'не можу визначити', 'не вдалося визначити', 'немає інгредієнтів'],
+    'vi': ['xin lỗi', 'không thể xác định', 'không có nguyên liệu'],
+}
+
+# Scripts written without spaces between words (or with attached particles) - keywords match as substrings
+SUBSTRING_LANGUAGES = frozenset({"ar", "ja", "ko", "th", "zh"})
+
+# Short keywords in SUBSTRING_LANGUAGES that are also parts of ingredient names
+# ("มือหมู" pork trotter, "ไก่พื้นเมือง" native chicken, "手羽先" chicken wings) -
+# these only match when they are the whole name
+WHOLE_NAME_KEYWORDS = {
+    'ar': ['يد'],
+    'ja': ['手', '床', '光'],
+    'ko': ['손'],
+    'th': ['มือ', 'พื้น'],
+    'zh': ['手', '光'],
+}
+
+# Devanagari and Bengali vowel signs are combining marks, which \w doesn't match;
+# count them as part of the word so "हाथ" (hand) doesn't match inside "हाथी"
+_WORD_CHAR = r"[\w\u0900-\u09ff]"
+
+
+def compile_detection_filter(
+    non_food_keywords: Iterable[str],
+    error_messages: Iterable[str],
+    whole_words: bool,
+    whole_name_keywords: Iterable[str] = ()
+) -> Pattern:
+    """
+    One alternation regex matching any non-food keyword or error phrase
+
+    Names are lowercased and stripped by the caller; a single `search` per
+    name replaces a scan over every keyword. Longer alternatives come first
+    so phrases win over their prefixes. Keywords also in
+    `whole_name_keywords` only match the entire name.
+    """
+    def alternation(words: Iterable[str]) -> str:
+        unique = sorted({w.lower() for w in words if w}, key=lambda w: (-len(w), w))
+        return "|".join(re.escape(w) for w in unique)
+
+    parts = []
+    errors = alternation(error_messages)
+    if errors:
+        parts.append(errors)
+    whole_name_keywords = {w.lower() for w in whole_name_keywords}
+    non_food_keywords = [w for w in non_food_keywords if w.lower() not in whole_name_keywords]
+    whole_names = alternation(whole_name_keywords)
+    if whole_names:
+        parts.append(rf"^(?:{whole_names})$")
+    keywords = alternation(non_food_keywords)
+    if keywords:
+        parts.append(rf"(?<!{_WORD_CHAR})(?:{keywords})(?!{_WORD_CHAR})" if whole_words else keywords)
+    # Never matches if both lists are empty
+    return re.compile("|".join(parts) or r"(?!)")
+
+
+def _placeholders(template: str) -> FrozenSet[str]:
+    return frozenset(name for _, name, _, _ in Formatter().parse(template) if name is not None)
+
+
+class PromptRegistry:
+    """
+    Per-language prompts, validated once and shared by all requests
+
+    Every supported language must have a detection prompt, filter keywords
+    and a recipe template using exactly RECIPE_PLACEHOLDERS; a broken entry
+    fails at import instead of on the first request in that language.
+    Requests only render the template for their own language. Unknown
+    languages fall back to English.
+    """
+
+    def __init__(
+        self,
+        languages: Iterable[str],
+        detection_prompts: Mapping[str, str],
+        recipe_prompts: Mapping[str, str],
+        non_food_keywords: Mapping[str, List[str]],
+        error_messages: Mapping[str, List[str]]
+    ):
+        self.languages = tuple(languages)
+        for language in self.languages:
+            if language not in detection_prompts:
+                raise ValueError(f"Missing detection prompt for '{language}'")
+            if language not in recipe_prompts:
+                raise ValueError(f"Missing recipe prompt for '{language}'")
+            found = _placeholders(recipe_prompts[language])
+            if found != RECIPE_PLACEHOLDERS:
+                raise ValueError(
+                    f"Recipe prompt for '{language}' has placeholders {sorted(found)}, "
+                    f"expected {sorted(RECIPE_PLACEHOLDERS)}"
+                )
+            if language not in non_food_keywords or language not in error_messages:
+                raise ValueError(f"Missing detection filter keywords for '{language}'")
+        self._detection = dict(detection_prompts)
+        self._recipe = dict(recipe_prompts)
+        # English apologies show up regardless of the requested language
+        self._filters = {
+            language: compile_detection_filter(
+                non_food_keywords[language],
+                [*error_messages[language], *error_messages.get(DEFAULT_LANGUAGE, ())],
+                whole_words=language not in SUBSTRING_LANGUAGES,
+                whole_name_keywords=WHOLE_NAME_KEYWORDS.get(language, ())
+            )
+            for language in self.languages
+        }
+
+    def _language(self, table: Mapping[str, object], language: str) -> str:
+        return language if language in table else DEFAULT_LANGUAGE
+
+    def detection_prompt(self, language: str) -> str:
+        """Ingredient detection prompt"""
+        return self._detection[self._language(self._detection, language)]
+
+    def recipe_prompt(
+        self,
+        language: str,
+        ingredient_list: str,
+        max_recipes: int,
+        constraints_text: str = ""
+    ) -> str:
+        """Render the recipe generation prompt for one language"""
+        return self._recipe[self._language(self._recipe, language)].format(
+            ingredient_list=ingredient_list,
+            constraints_text=constraints_text,
+            max_recipes=max_recipes
+        )
+
+    def detection_filter(self, language: str) -> Pattern:
+        """
+        Compiled matcher for detected names that aren't ingredients
+
+        `search` a lowercased name; a match means it is a non-food item
+        (hands, table, ...) or a model apology rather than an ingredient.
+        """
+        return self._filters[self._language(self._filters, language)]
+
+    def recipe_templates(self) -> Dict[str, str]:
+        """Raw recipe templates (for benchmarks and tooling)"""
+        return dict(self._recipe)
+
+
+prompt_registry = PromptRegistry(
+    languages=SUPPORTED_LANGUAGES,
+    detection_prompts=DETECTION_PROMPTS,
+    recipe_prompts=RECIPE_PROMPTS,
+    non_food_keywords=NON_FOOD_KEYWORDS,
+    error_messages=DETECTION_ERROR_MESSAGES,
+)
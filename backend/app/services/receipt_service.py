@@ -1,13 +1,23 @@
 """Receipt verification service for App Store and Play Store"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Dict, Any
 from app.config import settings
+from app.services.apple_jws import AppleJWSVerifier, JWSVerificationError, load_root_fingerprints
 import httpx
-import json
-import base64
 
 
 class ReceiptService:
-    """Service for verifying App Store and Play Store receipts"""
+    """
+    Service for verifying App Store and Play Store receipts
+
+    One instance per worker. Apple calls share a pooled keep-alive HTTP client;
+    the Google Play API service and its service-account credentials are built
+    once and reused (the access token refreshes itself when it expires).
+    Blocking Google API calls run on a small thread pool.
+    """
     
     # Apple App Store verification URLs
     APPLE_SANDBOX_URL = "https://sandbox.itunes.apple.com/verifyReceipt"
@@ -15,6 +25,63 @@ class ReceiptService:
     
     # Google Play verification URL
     GOOGLE_VERIFY_URL = "https://androidpublisher.googleapis.com/androidpublisher/v3/applications"
+    GOOGLE_SCOPES = ["https://www.googleapis.com/auth/androidpublisher"]
+    
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._jws_verifier: Optional[AppleJWSVerifier] = None
+        self._google_credentials = None
+        self._google_service = None
+        self._google_lock = threading.Lock()
+        # httplib2 connections aren't thread-safe - one authorized transport per thread
+        self._google_http = threading.local()
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.receipt_google_workers,
+            thread_name_prefix="receipt"
+        )
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Lazily create the shared client (keep-alive connection pool)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.receipt_max_connections,
+                    max_keepalive_connections=settings.receipt_max_keepalive_connections,
+                ),
+                timeout=httpx.Timeout(settings.receipt_timeout),
+            )
+        return self._client
+    
+    @property
+    def jws_verifier(self) -> AppleJWSVerifier:
+        """Lazily load the pinned App Store root(s)"""
+        if self._jws_verifier is None:
+            self._jws_verifier = AppleJWSVerifier(
+                root_fingerprints=load_root_fingerprints(settings.apple_root_cert_path),
+                max_chains=settings.apple_jws_chain_cache_size,
+                # A custom root (e.g. offline fixtures) signs chains without Apple's marker extensions
+                require_apple_oids=not settings.apple_root_cert_path
+            )
+        return self._jws_verifier
+    
+    async def start(self) -> None:
+        """Open the HTTP pool and build the Google service (called on application startup)"""
+        self.client
+        if settings.google_package_name and settings.google_service_account_path:
+            loop = asyncio.get_running_loop()
+            try:
+                await loop.run_in_executor(self._executor, self._get_google_service)
+            except Exception:
+                # Built on the first Android verification instead (errors are reported there)
+                pass
+    
+    async def aclose(self) -> None:
+        """Close pooled connections and worker threads (called on application shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._executor.shutdown(wait=False)
     
     async def verify_apple_receipt(
         self,
@@ -24,13 +91,20 @@ class ReceiptService:
         """
         Verify Apple App Store receipt
         
+        StoreKit 2 signed transactions (JWS) are verified locally; legacy
+        receipts go to Apple's verifyReceipt endpoint (APPLE_VERIFICATION_MODE).
+        
         Args:
-            receipt_data: Base64-encoded receipt data
+            receipt_data: Base64-encoded receipt data or a signed transaction (JWS)
             app_account_token: App account token (UUID)
             
         Returns:
             Dict with subscription status and details
         """
+        mode = settings.apple_verification_mode
+        if mode == "jws" or (mode == "auto" and receipt_data.count(".") == 2):
+            return self.verify_apple_transaction(receipt_data, app_account_token)
+        
         # Determine which URL to use
         url = (
             self.APPLE_PRODUCTION_URL
@@ -44,33 +118,72 @@ class ReceiptService:
             "exclude-old-transactions": True,
         }
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(url, json=payload, timeout=10.0)
-                response.raise_for_status()
-                result = response.json()
+        try:
+            response = await self.client.post(url, json=payload)
+            response.raise_for_status()
+            result = response.json()
+            
+            # Handle Apple's response
+            if result.get("status") == 0:
+                # Receipt is valid
+                # Parse the latest_receipt_info to get subscription details
+                latest_receipt_info = result.get("latest_receipt_info", [])
+                if latest_receipt_info:
+                    latest = latest_receipt_info[-1]  # Get most recent
+                    return {
+                        "valid": True,
+                        "product_id": latest.get("product_id"),
+                        "original_transaction_id": latest.get("original_transaction_id"),
+                        "expires_at": self._parse_apple_date(latest.get("expires_date_ms")),
+                        "status": "active" if self._is_apple_active(latest) else "expired",
+                    }
+                return {"valid": False, "error": "No receipt info found"}
+            else:
+                # Receipt is invalid
+                return {"valid": False, "error": f"Apple status: {result.get('status')}"}
                 
-                # Handle Apple's response
-                if result.get("status") == 0:
-                    # Receipt is valid
-                    # Parse the latest_receipt_info to get subscription details
-                    latest_receipt_info = result.get("latest_receipt_info", [])
-                    if latest_receipt_info:
-                        latest = latest_receipt_info[-1]  # Get most recent
-                        return {
-                            "valid": True,
-                            "product_id": latest.get("product_id"),
-                            "original_transaction_id": latest.get("original_transaction_id"),
-                            "expires_at": self._parse_apple_date(latest.get("expires_date_ms")),
-                            "status": "active" if self._is_apple_active(latest) else "expired",
-                        }
-                    return {"valid": False, "error": "No receipt info found"}
-                else:
-                    # Receipt is invalid
-                    return {"valid": False, "error": f"Apple status: {result.get('status')}"}
-                    
-            except httpx.RequestError as e:
-                return {"valid": False, "error": f"Request failed: {str(e)}"}
+        except httpx.RequestError as e:
+            return {"valid": False, "error": f"Request failed: {str(e)}"}
+    
+    def verify_apple_transaction(
+        self,
+        signed_transaction: str,
+        app_account_token: str
+    ) -> Dict[str, Any]:
+        """
+        Verify a StoreKit 2 signed transaction locally (no network)
+        
+        Args:
+            signed_transaction: JWSTransaction from StoreKit 2
+            app_account_token: App account token (UUID)
+            
+        Returns:
+            Dict with subscription status and details
+        """
+        try:
+            claims = self.jws_verifier.verify(signed_transaction)
+        except JWSVerificationError as e:
+            return {"valid": False, "error": f"Invalid signed transaction: {str(e)}"}
+        
+        if settings.apple_bundle_id and claims.get("bundleId") != settings.apple_bundle_id:
+            return {"valid": False, "error": "Transaction belongs to a different app"}
+        token = claims.get("appAccountToken")
+        if token and token.lower() != str(app_account_token).lower():
+            return {"valid": False, "error": "Transaction belongs to a different account"}
+        
+        expires_date_ms = claims.get("expiresDate")
+        expires_date_ms = str(expires_date_ms) if expires_date_ms is not None else None
+        is_active = (
+            not claims.get("revocationDate")
+            and self._is_apple_active({"expires_date_ms": expires_date_ms})
+        )
+        return {
+            "valid": True,
+            "product_id": claims.get("productId"),
+            "original_transaction_id": claims.get("originalTransactionId"),
+            "expires_at": self._parse_apple_date(expires_date_ms),
+            "status": "active" if is_active else "expired",
+        }
     
     async def verify_google_receipt(
         self,
@@ -102,10 +215,7 @@ class ReceiptService:
         # 3. Proper OAuth2 authentication
         
         try:
-            from google.oauth2 import service_account
-            from googleapiclient.discovery import build
             from googleapiclient.errors import HttpError
-            import os
             
             # Check if service account file exists
             if not settings.google_service_account_path or not os.path.exists(settings.google_service_account_path):
@@ -114,22 +224,15 @@ class ReceiptService:
                     "error": "Google Play service account file not found. Please configure GOOGLE_SERVICE_ACCOUNT_PATH."
                 }
             
-            # Load service account credentials
-            credentials = service_account.Credentials.from_service_account_file(
-                settings.google_service_account_path,
-                scopes=['https://www.googleapis.com/auth/androidpublisher']
-            )
-            
-            # Build the API client
-            service = build('androidpublisher', 'v3', credentials=credentials)
-            
-            # Verify the purchase
+            # Verify the purchase (blocking HTTP call - run off the event loop)
             try:
-                subscription = service.purchases().subscriptions().get(
-                    packageName=settings.google_package_name,
-                    subscriptionId=product_id,
-                    token=purchase_token
-                ).execute()
+                loop = asyncio.get_running_loop()
+                subscription = await loop.run_in_executor(
+                    self._executor,
+                    self._get_google_subscription,
+                    product_id,
+                    purchase_token
+                )
                 
                 # Parse subscription status
                 # Google Play returns: 0=active, 1=cancelled, 2=expired, etc.
@@ -198,6 +301,50 @@ class ReceiptService:
                 "error": f"Google Play verification failed: {str(e)}"
             }
     
+    def _get_google_service(self):
+        """Build the Play Developer API service once (blocking - call from the thread pool)"""
+        if self._google_service is None:
+            with self._google_lock:
+                if self._google_service is None:
+                    from google.oauth2 import service_account
+                    from googleapiclient.discovery import build
+                    
+                    # Load service account credentials
+                    self._google_credentials = service_account.Credentials.from_service_account_file(
+                        settings.google_service_account_path,
+                        scopes=self.GOOGLE_SCOPES
+                    )
+                    # Bundled discovery document - no network round trip
+                    self._google_service = build(
+                        'androidpublisher',
+                        'v3',
+                        credentials=self._google_credentials,
+                        cache_discovery=False,
+                        static_discovery=True
+                    )
+        return self._google_service
+    
+    def _get_google_http(self):
+        """Per-thread authorized transport sharing the cached credentials"""
+        http = getattr(self._google_http, "http", None)
+        if http is None:
+            import google_auth_httplib2
+            import httplib2
+            
+            # Refreshes the access token before it expires (and retries once on 401)
+            http = google_auth_httplib2.AuthorizedHttp(self._google_credentials, http=httplib2.Http())
+            self._google_http.http = http
+        return http
+    
+    def _get_google_subscription(self, product_id: str, purchase_token: str) -> Dict[str, Any]:
+        """Fetch a subscription purchase from the Play Developer API (blocking)"""
+        service = self._get_google_service()
+        return service.purchases().subscriptions().get(
+            packageName=settings.google_package_name,
+            subscriptionId=product_id,
+            token=purchase_token
+        ).execute(http=self._get_google_http())
+    
     def _parse_apple_date(self, expires_date_ms: Optional[str]) -> Optional[str]:
         """Parse Apple's timestamp (milliseconds since epoch) to ISO format"""
         if not expires_date_ms:
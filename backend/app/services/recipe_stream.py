@@ -0,0 +1,82 @@
+"""Incremental parser for streamed recipe JSON"""
+import json
+from typing import Any, Dict, List
+
+
+class RecipeStreamParser:
+    """
+    Extracts complete recipe objects from a partial JSON token stream
+
+    Feed text deltas as they arrive; each call returns the recipe objects whose
+    closing brace has been seen. Works for a top-level array of recipes, a
+    {"recipes": [...]} wrapper or a single recipe object, and ignores anything
+    outside the JSON (markdown code fences, stray prose).
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = 0
+        self._object_starts: List[int] = []
+        self._depth = 0  # Combined [] and {} nesting depth
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, delta: str) -> List[Dict[str, Any]]:
+        """
+        Add streamed text and return newly completed recipes
+
+        Args:
+            delta: Next chunk of model output
+
+        Returns:
+            List of recipe dicts completed by this chunk (may be empty)
+        """
+        self.text += delta
+        completed = []
+        text = self.text
+
+        for i in range(self._pos, len(text)):
+            char = text[i]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if self._depth == 0 and char not in "[{":
+                continue  # Outside JSON (code fences, prose)
+
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                self._object_starts.append(i)
+                self._depth += 1
+            elif char == "[":
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._object_starts:
+                    start = self._object_starts.pop()
+                    recipe = self._parse_recipe(text[start:i + 1])
+                    if recipe is not None:
+                        completed.append(recipe)
+            elif char == "]":
+                self._depth -= 1
+
+        self._pos = len(text)
+        return completed
+
+    @staticmethod
+    def _parse_recipe(candidate: str) -> Any:
+        """Parse a completed object; only objects with a title are recipes"""
+        try:
+            data = json.loads(candidate)
+        except ValueError:
+            return None
+        if isinstance(data, dict) and "title" in data:
+            return data
+        return None
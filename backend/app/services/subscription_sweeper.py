@@ -0,0 +1,125 @@
+"""Background expiry of lapsed subscriptions"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import select, update
+
+from app.config import settings
+from app.db import AsyncSessionLocal
+from app.models import Subscription
+from app.services.entitlement_service import entitlement_service
+
+
+class SubscriptionSweeper:
+    """
+    Periodically marks active subscriptions past expires_at as expired
+
+    Runs in every worker; the UPDATE is idempotent, so overlapping sweeps
+    only repeat work. Rows are found through idx_subscriptions_status
+    (status, expires_at) and expired in batches of `batch_size`, one short
+    transaction each. Read paths compute the effective status themselves
+    (see Entitlement.is_expired), so a row waiting for the next sweep is
+    never reported as active.
+    """
+
+    def __init__(self, interval: float, batch_size: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, Any] = {
+            "runs": 0,
+            "expired": 0,
+            "failed": 0,
+            "last_run_at": None,
+            "last_expired": 0,
+            "last_duration_ms": None,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    @staticmethod
+    def _now(dialect: str) -> datetime:
+        # SQLite stores expires_at as written (naive local time); PostgreSQL compares instants
+        if dialect == "sqlite":
+            return datetime.now()
+        return datetime.now(timezone.utc)
+
+    async def sweep(self) -> int:
+        """
+        Expire every due subscription
+
+        Returns:
+            Number of subscriptions marked expired
+        """
+        start = time.perf_counter()
+        expired = 0
+        async with AsyncSessionLocal() as db:
+            now = self._now(db.bind.dialect.name)
+            while True:
+                rows = (await db.execute(
+                    select(Subscription.id, Subscription.app_account_token)
+                    .where(
+                        Subscription.status == "active",
+                        Subscription.expires_at < now
+                    )
+                    .limit(self.batch_size)
+                )).all()
+                if not rows:
+                    break
+                await db.execute(
+                    update(Subscription)
+                    .where(
+                        Subscription.id.in_([row.id for row in rows]),
+                        Subscription.status == "active"
+                    )
+                    .values(status="expired")
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+                for row in rows:
+                    entitlement_service.invalidate(row.app_account_token)
+                expired += len(rows)
+                if len(rows) < self.batch_size:
+                    break
+
+        self.stats["runs"] += 1
+        self.stats["expired"] += expired
+        self.stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+        self.stats["last_expired"] = expired
+        self.stats["last_duration_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return expired
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.sweep()
+            except Exception:
+                # Retried on the next tick
+                self.stats["failed"] += 1
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the periodic sweep (called on application startup)"""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Cancel the periodic sweep (called on application shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        """Run counters and the last run's row count and duration"""
+        return {"interval": self.interval, **self.stats}
+
+
+subscription_sweeper = SubscriptionSweeper(
+    interval=settings.subscription_sweep_interval,
+    batch_size=settings.subscription_sweep_batch_size,
+)
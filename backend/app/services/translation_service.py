@@ -0,0 +1,244 @@
+"""Recipe translation service - translates cached recipes into other languages"""
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import orjson
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.db import AsyncSessionLocal
+from app.models import RecipeCache
+from app.schemas import Recipe
+from app.services.openai_service import openai_service
+
+logger = logging.getLogger(__name__)
+
+
+def recipe_payload(recipe: Dict[str, Any], created_at: Optional[datetime]) -> str:
+    """Serialize a recipe to its final Recipe response JSON (stored in RecipeCache.payload)"""
+    return Recipe(
+        id=recipe["id"],
+        emoji=recipe.get("emoji", "🍽️"),
+        badge=recipe.get("badge", "fastLazy"),
+        title=recipe.get("title", ""),
+        steps=recipe.get("steps", []),
+        ingredients=recipe.get("ingredients") or None,
+        created_at=created_at
+    ).model_dump_json()
+
+
+def recipe_to_dict(row: RecipeCache) -> Dict[str, Any]:
+    """Convert a RecipeCache row to a recipe dict"""
+    if row.payload:
+        # One fast parse of the stored response instead of decoding each column
+        recipe = orjson.loads(row.payload)
+        recipe.pop("translation_pending", None)
+        recipe["ingredients"] = recipe.get("ingredients") or []
+        recipe["created_at"] = row.created_at
+        return recipe
+    return {
+        "id": row.recipe_id,
+        "emoji": row.emoji,
+        "badge": row.badge,
+        "title": row.title,
+        "steps": json.loads(row.steps),
+        "ingredients": json.loads(row.ingredients) if row.ingredients else [],
+        "created_at": row.created_at,
+    }
+
+
+def recipe_to_cache_values(recipe: Dict[str, Any], language: str) -> Dict[str, Any]:
+    """Convert a recipe dict to RecipeCache column values (including the serialized payload)"""
+    # Naive UTC, like the CURRENT_TIMESTAMP server default on the other rows
+    created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    return {
+        "id": str(uuid.uuid4()),
+        "recipe_id": recipe["id"],
+        "language": language,
+        "emoji": recipe.get("emoji", "🍽️"),
+        "badge": recipe.get("badge", "fastLazy"),
+        "title": recipe.get("title", ""),
+        "steps": json.dumps(recipe.get("steps", [])),
+        "ingredients": json.dumps(recipe.get("ingredients", [])) if recipe.get("ingredients") else None,
+        "payload": recipe_payload(recipe, created_at),
+        "created_at": created_at,
+    }
+
+
+class TranslationService:
+    """Service for translating many cached recipes at once"""
+
+    def __init__(self):
+        self.concurrency = settings.translation_concurrency
+        self.batch_size = settings.translation_batch_size
+        # Single-flight: one in-flight translation per (recipe_id, language) per worker
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        # Keeps batch tasks alive when the request that started them returns first
+        self._background: Set[asyncio.Task] = set()
+
+    async def translate_missing(
+        self,
+        db: AsyncSession,
+        recipe_ids: List[str],
+        language: str,
+        deadline: Optional[float] = None
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+        """
+        Translate recipes that are not cached in the requested language
+
+        Source rows are fetched in one query, translations run concurrently
+        in batches of translation_batch_size recipes per LLM call (bounded by
+        translation_concurrency) and each batch is written in one bulk insert.
+        Concurrent callers asking for the same (recipe_id, language) await the
+        translation already in flight instead of starting another one.
+        Translations still running at the deadline keep going in the
+        background and are saved when they finish.
+
+        Args:
+            db: Database session
+            recipe_ids: Recipe IDs missing in the requested language
+            language: Target language code
+            deadline: Seconds to wait for translations (None = wait for all)
+
+        Returns:
+            Tuple of (translated recipes, untranslated source recipes still pending),
+            both keyed by recipe_id. Recipes that failed to translate are in neither.
+        """
+        if not recipe_ids:
+            return {}, {}
+
+        # Fetch one source row per recipe in a single query
+        translated: Dict[str, Dict[str, Any]] = {}
+        sources: Dict[str, Dict[str, Any]] = {}
+        rows = (await db.scalars(
+            select(RecipeCache).where(RecipeCache.recipe_id.in_(recipe_ids))
+        )).all()
+        for row in rows:
+            if row.language == language:
+                # Cached since the caller looked (another request or worker)
+                translated[row.recipe_id] = recipe_to_dict(row)
+            elif row.recipe_id not in sources:
+                sources[row.recipe_id] = recipe_to_dict(row)
+        for recipe_id in translated:
+            sources.pop(recipe_id, None)
+
+        if not sources:
+            return translated, {}
+
+        # Join translations already in flight, start the rest
+        loop = asyncio.get_running_loop()
+        futures: Dict[str, asyncio.Future] = {}
+        owned: List[Dict[str, Any]] = []
+        for recipe_id, source in sources.items():
+            key = (recipe_id, language)
+            if key not in self._inflight:
+                self._inflight[key] = loop.create_future()
+                owned.append(source)
+            futures[recipe_id] = self._inflight[key]
+
+        # Several recipes per LLM call, several calls in parallel
+        semaphore = asyncio.Semaphore(self.concurrency)
+        size = max(1, self.batch_size)
+        for i in range(0, len(owned), size):
+            task = asyncio.create_task(
+                self._translate_batch(owned[i:i + size], language, semaphore)
+            )
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+        await asyncio.wait(futures.values(), timeout=deadline)
+
+        pending: Dict[str, Dict[str, Any]] = {}
+        for recipe_id, future in futures.items():
+            if not future.done():
+                pending[recipe_id] = sources[recipe_id]
+            elif future.result() is not None:
+                translated[recipe_id] = future.result()
+
+        return translated, pending
+
+    async def _translate_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        language: str,
+        semaphore: asyncio.Semaphore
+    ) -> None:
+        """Translate and save one batch, then wake everyone waiting on its recipes"""
+        results: Dict[str, Dict[str, Any]] = {}
+        try:
+            async with semaphore:
+                try:
+                    results = await openai_service.translate_recipes(
+                        recipes=[{k: v for k, v in source.items() if k != "created_at"} for source in batch],
+                        target_language=language
+                    )
+                except Exception:
+                    # Translation failed - skip these recipes
+                    results = {}
+            if results:
+                try:
+                    results = await self._save(list(results.values()), language)
+                except Exception:
+                    # Not cached - waiters get None and the recipes are retried on the next request
+                    logger.exception("Saving %d %s translations failed", len(results), language)
+                    results = {}
+        finally:
+            for source in batch:
+                future = self._inflight.pop((source["id"], language), None)
+                if future is not None and not future.done():
+                    future.set_result(results.get(source["id"]))
+
+    async def _save(self, recipes: List[Dict[str, Any]], language: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Bulk insert translated recipes and return the stored rows
+
+        Another worker may have cached some of these first; the uq_recipe_language
+        constraint keeps one row per language and the stored row wins, so every
+        caller returns the same translation.
+
+        Raises:
+            SQLAlchemyError: If the rows can't be written (after rolling back)
+        """
+        async with AsyncSessionLocal() as db:
+            try:
+                dialect = db.bind.dialect.name
+                values = [recipe_to_cache_values(recipe, language) for recipe in recipes]
+                if dialect in ("postgresql", "sqlite"):
+                    insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+                    await db.execute(
+                        insert(RecipeCache)
+                        .values(values)
+                        .on_conflict_do_nothing(index_elements=["recipe_id", "language"])
+                    )
+                    await db.commit()
+                else:
+                    for value in values:
+                        try:
+                            async with db.begin_nested():
+                                db.add(RecipeCache(**value))
+                        except IntegrityError:
+                            pass
+                    await db.commit()
+
+                rows = (await db.scalars(
+                    select(RecipeCache).where(
+                        RecipeCache.recipe_id.in_([value["recipe_id"] for value in values]),
+                        RecipeCache.language == language
+                    )
+                )).all()
+                return {row.recipe_id: recipe_to_dict(row) for row in rows}
+            except SQLAlchemyError:
+                # The caller logs the failure and releases the waiters
+                await db.rollback()
+                raise
+
+
+translation_service = TranslationService()
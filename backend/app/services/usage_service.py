@@ -1,9 +1,13 @@
 """Usage tracking service"""
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, select
 from datetime import date
+from app.config import settings
+from app.db import AsyncSessionLocal
 from app.models import UsageLog
-from typing import Dict, Any
+from app.services.usage_store import CounterStore, add_counts, create_counter_store
+from typing import Dict, Any, Optional
 
 
 class UsageService:
@@ -21,9 +25,15 @@ class UsageService:
         "recipe_generation": -1,  # Unlimited
     }
     
-    def get_usage_limits(
+    def __init__(self, store: Optional[CounterStore] = None):
+        # Counter backend: database (default), memory or redis
+        self.store = store or create_counter_store(settings.usage_backend)
+        self.flush_interval = settings.usage_flush_interval
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    async def get_usage_limits(
         self,
-        db: Session,
+        db: AsyncSession,
         app_account_token: str,
         is_premium: bool = False
     ) -> Dict[str, Any]:
@@ -42,20 +52,23 @@ class UsageService:
         today = date.today()
         
         # Get today's usage
-        usage_today = (
-            db.query(UsageLog.feature, func.sum(UsageLog.count).label('total'))
-            .filter(
+        usage_today = (await db.execute(
+            select(UsageLog.feature, func.sum(UsageLog.count).label('total'))
+            .where(
                 and_(
                     UsageLog.app_account_token == str(app_account_token),
                     UsageLog.date == today
                 )
             )
             .group_by(UsageLog.feature)
-            .all()
-        )
+        )).all()
         
-        # Convert to dict
+        # Convert to dict, including uses not flushed to the database yet
         usage_dict = {row.feature: row.total for row in usage_today}
+        for feature in ("scan", "recipe_generation"):
+            pending = self.store.pending((str(app_account_token), feature, today))
+            if pending:
+                usage_dict[feature] = usage_dict.get(feature, 0) + pending
         
         return {
             "scans_today": usage_dict.get("scan", 0),
@@ -65,60 +78,22 @@ class UsageService:
             "is_premium": is_premium,
         }
     
-    def increment_usage(
-        self,
-        db: Session,
-        app_account_token: str,
-        feature: str
-    ) -> None:
-        """
-        Increment usage count for a feature
-        
-        Args:
-            db: Database session
-            app_account_token: App account token (UUID)
-            feature: Feature name ('scan' or 'recipe_generation')
-        """
-        today = date.today()
-        token_str = str(app_account_token)
-        
-        # Try to get existing record
-        usage = (
-            db.query(UsageLog)
-            .filter(
-                and_(
-                    UsageLog.app_account_token == token_str,
-                    UsageLog.feature == feature,
-                    UsageLog.date == today
-                )
-            )
-            .first()
-        )
-        
-        if usage:
-            # Increment existing count
-            usage.count += 1
-        else:
-            # Create new record
-            usage = UsageLog(
-                app_account_token=token_str,
-                feature=feature,
-                date=today,
-                count=1
-            )
-            db.add(usage)
-        
-        db.commit()
-    
-    def check_limit(
+    async def consume(
         self,
-        db: Session,
+        db: AsyncSession,
         app_account_token: str,
         feature: str,
         is_premium: bool = False
     ) -> tuple[bool, str]:
         """
-        Check if usage limit has been reached
+        Atomically check the daily limit and count one use
+        
+        Delegates to the configured counter store (USAGE_BACKEND). The default
+        database store runs a single conditional upsert (INSERT ... ON CONFLICT
+        DO UPDATE ... WHERE count < limit RETURNING count) on SQLite and
+        PostgreSQL, so concurrent requests can't both pass the check and exceed
+        the limit. The memory and redis stores count without a DB write and
+        flush aggregated deltas to usage_logs in the background.
         
         Args:
             db: Database session
@@ -127,35 +102,88 @@ class UsageService:
             is_premium: Whether user has premium subscription
             
         Returns:
-            Tuple of (allowed: bool, message: str)
+            Tuple of (allowed: bool, message: str); usage is only counted if allowed
         """
         limits = self.PREMIUM_LIMITS if is_premium else self.FREE_LIMITS
         limit = limits.get(feature, 0)
         
-        # Premium users with unlimited access
-        if limit == -1:
-            return True, "Unlimited access"
-        
-        # Get today's usage
-        today = date.today()
-        token_str = str(app_account_token)
+        if limit == 0:
+            return False, f"Daily limit reached: {limit} {feature}(s) per day"
         
-        total = (
-            db.query(func.sum(UsageLog.count))
-            .filter(
-                and_(
-                    UsageLog.app_account_token == token_str,
-                    UsageLog.feature == feature,
-                    UsageLog.date == today
-                )
-            )
-            .scalar() or 0
+        count = await self.store.consume(
+            db,
+            key=(str(app_account_token), feature, date.today()),
+            limit=None if limit == -1 else limit
         )
         
-        if total >= limit:
+        if count is None:
             return False, f"Daily limit reached: {limit} {feature}(s) per day"
+        if limit == -1:
+            return True, "Unlimited access"
+        return True, f"{limit - count} {feature}(s) remaining today"
+    
+    async def release(
+        self,
+        db: AsyncSession,
+        app_account_token: str,
+        feature: str
+    ) -> None:
+        """
+        Give back a use counted by `consume` when the request fails before it is served
+        
+        Args:
+            db: Database session
+            app_account_token: App account token (UUID)
+            feature: Feature name ('scan' or 'recipe_generation')
+        """
+        await self.store.release(db, key=(str(app_account_token), feature, date.today()))
+    
+    async def flush(self) -> int:
+        """
+        Write buffered usage deltas to usage_logs in one batched upsert
         
-        return True, f"{limit - total} {feature}(s) remaining today"
+        Returns:
+            Number of counters written
+        """
+        deltas = self.store.drain()
+        if not deltas:
+            return 0
+        async with AsyncSessionLocal() as db:
+            try:
+                await add_counts(db, deltas)
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                self.store.restore(deltas)
+                raise
+        return len(deltas)
+    
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                # Deltas were restored - retry on the next tick
+                pass
+    
+    def start(self) -> None:
+        """Start the background flush (called on application startup)"""
+        if self.store.write_behind and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+    
+    async def stop(self) -> None:
+        """Stop the background flush and write what is left (called on application shutdown)"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        if self.store.write_behind:
+            try:
+                await self.flush()
+            except Exception:
+                pass
+        await self.store.close()
 
 
 usage_service = UsageService()
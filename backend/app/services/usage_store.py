@@ -0,0 +1,390 @@
+"""Usage counter backends for UsageService"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import UsageLog
+
+
+# (app_account_token, feature, date)
+CounterKey = Tuple[str, str, date]
+
+
+def _upsert_insert(dialect: str):
+    """Dialect-specific INSERT supporting ON CONFLICT (None if unsupported)"""
+    if dialect == "postgresql":
+        return postgresql_insert
+    if dialect == "sqlite":
+        return sqlite_insert
+    return None
+
+
+def _key_filter(key: CounterKey):
+    token, feature, day = key
+    return and_(
+        UsageLog.app_account_token == token,
+        UsageLog.feature == feature,
+        UsageLog.date == day
+    )
+
+
+async def read_count(db: AsyncSession, key: CounterKey) -> int:
+    """Read a stored daily count from usage_logs"""
+    return await db.scalar(select(func.sum(UsageLog.count)).where(_key_filter(key))) or 0
+
+
+async def add_counts(db: AsyncSession, deltas: Dict[CounterKey, int]) -> None:
+    """Add aggregated deltas to usage_logs in one statement (caller commits)"""
+    if not deltas:
+        return
+    insert = _upsert_insert(db.bind.dialect.name)
+    if insert is None:
+        for (token, feature, day), delta in deltas.items():
+            usage = await db.scalar(select(UsageLog).where(_key_filter((token, feature, day))))
+            if usage:
+                usage.count += delta
+            else:
+                db.add(UsageLog(app_account_token=token, feature=feature, date=day, count=delta))
+        return
+    stmt = insert(UsageLog).values([
+        {"app_account_token": token, "feature": feature, "date": day, "count": delta}
+        for (token, feature, day), delta in deltas.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["app_account_token", "feature", "date"],
+        set_={"count": UsageLog.count + stmt.excluded.count}
+    )
+    await db.execute(stmt)
+
+
+async def subtract_one(db: AsyncSession, key: CounterKey) -> None:
+    """Take one stored use back out of usage_logs, never below zero (caller commits)"""
+    await db.execute(
+        update(UsageLog)
+        .where(_key_filter(key), UsageLog.count > 0)
+        .values(count=UsageLog.count - 1)
+    )
+
+
+class CounterStore(ABC):
+    """
+    Daily usage counters keyed by (app_account_token, feature, date)
+
+    Subclasses implement `consume` and `release`; stores that buffer writes also override
+    `pending`, `drain` and `restore` so UsageService can flush them.
+    """
+
+    name = "base"
+    write_behind = False
+
+    @abstractmethod
+    async def consume(self, db: AsyncSession, key: CounterKey, limit: Optional[int]) -> Optional[int]:
+        """
+        Count one use unless the counter is already at the limit
+
+        Args:
+            db: Database session
+            key: Counter key
+            limit: Daily limit (None = unlimited)
+
+        Returns:
+            New count, or None if the limit was reached (nothing counted)
+        """
+
+    @abstractmethod
+    async def release(self, db: AsyncSession, key: CounterKey) -> None:
+        """
+        Give back one use counted by `consume` (the request failed before it was served)
+
+        Args:
+            db: Database session
+            key: Counter key
+        """
+
+    def pending(self, key: CounterKey) -> int:
+        """Uses counted locally but not written to usage_logs yet"""
+        return 0
+
+    def drain(self) -> Dict[CounterKey, int]:
+        """Take all unwritten deltas (they are written by the caller)"""
+        return {}
+
+    def restore(self, deltas: Dict[CounterKey, int]) -> None:
+        """Put back deltas whose write failed"""
+
+    async def close(self) -> None:
+        pass
+
+
+class DatabaseCounterStore(CounterStore):
+    """Writes every use straight to usage_logs with one conditional upsert"""
+
+    name = "database"
+
+    async def consume(self, db: AsyncSession, key: CounterKey, limit: Optional[int]) -> Optional[int]:
+        insert = _upsert_insert(db.bind.dialect.name)
+        if insert is None:
+            # No ON CONFLICT support - check, then increment
+            count = await read_count(db, key)
+            if limit is not None and count >= limit:
+                return None
+            await add_counts(db, {key: 1})
+            await db.commit()
+            return count + 1
+
+        token, feature, day = key
+        stmt = insert(UsageLog).values(
+            app_account_token=token,
+            feature=feature,
+            date=day,
+            count=1
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["app_account_token", "feature", "date"],
+            set_={"count": UsageLog.count + 1},
+            where=(UsageLog.count < limit) if limit is not None else None
+        ).returning(UsageLog.count)
+        count = (await db.execute(stmt)).scalar()
+        await db.commit()
+        return count
+
+    async def release(self, db: AsyncSession, key: CounterKey) -> None:
+        await subtract_one(db, key)
+        await db.commit()
+
+
+class _DeltaBuffer:
+    """Thread-safe per-key deltas waiting to be written to usage_logs, sharded by key"""
+
+    def __init__(self, shards: int):
+        self._shards = [({}, threading.Lock()) for _ in range(max(1, shards))]
+
+    def shard(self, key: CounterKey) -> Tuple[Dict[CounterKey, int], threading.Lock]:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def get(self, key: CounterKey) -> int:
+        deltas, lock = self.shard(key)
+        with lock:
+            return deltas.get(key, 0)
+
+    def add(self, key: CounterKey, delta: int) -> None:
+        deltas, lock = self.shard(key)
+        with lock:
+            deltas[key] = deltas.get(key, 0) + delta
+            if deltas[key] <= 0:
+                del deltas[key]
+
+    def drain(self) -> Dict[CounterKey, int]:
+        drained: Dict[CounterKey, int] = {}
+        for deltas, lock in self._shards:
+            with lock:
+                drained.update(deltas)
+                deltas.clear()
+        return drained
+
+
+class MemoryCounterStore(CounterStore):
+    """
+    Per-worker in-memory counters with write-behind to usage_logs
+
+    Each worker keeps the last stored count per key (re-read at most every
+    `refresh_seconds`) plus its own unwritten uses, and UsageService flushes
+    the aggregated deltas in one batched upsert. Limits hold across workers
+    up to the uses other workers have not flushed yet, or flushed after this
+    worker last read the count; a key is written through once it has
+    `max_pending` unwritten uses, which bounds the first part per worker,
+    and `refresh_seconds` bounds how long the second part goes unseen.
+    """
+
+    name = "memory"
+    write_behind = True
+
+    def __init__(self, refresh_seconds: float, max_pending: int, shards: int = 16):
+        self.refresh_seconds = refresh_seconds
+        self.max_pending = max_pending
+        # key -> [stored count, monotonic time it was read, unwritten uses], sharded by key
+        self._shards = [({}, threading.Lock()) for _ in range(max(1, shards))]
+
+    def _shard(self, key: CounterKey) -> Tuple[Dict[CounterKey, list], threading.Lock]:
+        return self._shards[hash(key) % len(self._shards)]
+
+    async def consume(self, db: AsyncSession, key: CounterKey, limit: Optional[int]) -> Optional[int]:
+        entries, lock = self._shard(key)
+        now = time.monotonic()
+        with lock:
+            entry = entries.get(key)
+            stale = entry is None or now - entry[1] > self.refresh_seconds
+        if stale:
+            stored = await read_count(db, key)
+            with lock:
+                entry = entries.setdefault(key, [0, 0.0, 0])
+                # Counts only grow during a day; never go below what this worker
+                # already counted as stored (its writes may still be in flight)
+                entry[0], entry[1] = max(entry[0], stored), now
+
+        with lock:
+            count = entry[0] + entry[2]
+            if limit is not None and count >= limit:
+                return None
+            entry[2] += 1
+            delta = 0
+            if entry[2] >= self.max_pending:
+                # Count as stored while it is being written
+                delta, entry[2] = entry[2], 0
+                entry[0] += delta
+
+        if delta:
+            try:
+                await add_counts(db, {key: delta})
+                await db.commit()
+            except Exception:
+                await db.rollback()
+                self.restore({key: delta})
+        return count + 1
+
+    async def release(self, db: AsyncSession, key: CounterKey) -> None:
+        entries, lock = self._shard(key)
+        with lock:
+            entry = entries.get(key)
+            if entry is None:
+                return
+            if entry[2]:
+                entry[2] -= 1
+                return
+            # Already written - take it back out of usage_logs
+            entry[0] = max(entry[0] - 1, 0)
+        await subtract_one(db, key)
+        await db.commit()
+
+    def pending(self, key: CounterKey) -> int:
+        entries, lock = self._shard(key)
+        with lock:
+            entry = entries.get(key)
+            return entry[2] if entry else 0
+
+    def drain(self) -> Dict[CounterKey, int]:
+        drained: Dict[CounterKey, int] = {}
+        today = date.today()
+        for entries, lock in self._shards:
+            with lock:
+                for key in list(entries):
+                    entry = entries[key]
+                    if entry[2]:
+                        drained[key] = entry[2]
+                        entry[0] += entry[2]
+                        entry[2] = 0
+                    elif key[2] < today:
+                        # Forget previous days
+                        del entries[key]
+        return drained
+
+    def restore(self, deltas: Dict[CounterKey, int]) -> None:
+        for key, delta in deltas.items():
+            entries, lock = self._shard(key)
+            with lock:
+                entry = entries.setdefault(key, [delta, time.monotonic(), 0])
+                entry[0] -= delta
+                entry[2] += delta
+
+
+# Atomically increment unless at the limit. Returns the new count,
+# -1 if the limit was reached, -2 if the key is missing (caller seeds it)
+REDIS_CONSUME_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return -2
+end
+local limit = tonumber(ARGV[1])
+if limit >= 0 and tonumber(current) >= limit then
+    return -1
+end
+return redis.call('INCR', KEYS[1])
+"""
+
+
+class RedisCounterStore(CounterStore):
+    """
+    Shared counters in Redis (or any Redis-protocol server) with write-behind to usage_logs
+
+    Redis enforces limits exactly across workers; usage_logs is kept up to
+    date by the same batched flush as the memory store. A missing key (first
+    use today, or Redis restarted) is seeded from usage_logs.
+    """
+
+    name = "redis"
+    write_behind = True
+
+    KEY_TTL_SECONDS = 2 * 86400
+
+    def __init__(self, url: str, shards: int = 16):
+        try:
+            from redis import asyncio as redis
+        except ImportError:
+            raise RuntimeError("Redis usage backend requires the redis package. Install: pip install redis")
+        self._client = redis.Redis.from_url(url)
+        self._consume = self._client.register_script(REDIS_CONSUME_SCRIPT)
+        self._buffer = _DeltaBuffer(shards)
+
+    @staticmethod
+    def _redis_key(key: CounterKey) -> str:
+        token, feature, day = key
+        return f"usage:{token}:{feature}:{day.isoformat()}"
+
+    async def consume(self, db: AsyncSession, key: CounterKey, limit: Optional[int]) -> Optional[int]:
+        redis_key = self._redis_key(key)
+        args = [limit if limit is not None else -1]
+        result = await self._consume(keys=[redis_key], args=args)
+        if result == -2:
+            seed = await read_count(db, key) + self._buffer.get(key)
+            await self._client.set(redis_key, seed, ex=self.KEY_TTL_SECONDS, nx=True)
+            result = await self._consume(keys=[redis_key], args=args)
+        if result < 0:
+            return None
+        self._buffer.add(key, 1)
+        return result
+
+    async def release(self, db: AsyncSession, key: CounterKey) -> None:
+        await self._client.decr(self._redis_key(key))
+        if self._buffer.get(key):
+            self._buffer.add(key, -1)
+            return
+        # Already flushed - take it back out of usage_logs
+        await subtract_one(db, key)
+        await db.commit()
+
+    def pending(self, key: CounterKey) -> int:
+        return self._buffer.get(key)
+
+    def drain(self) -> Dict[CounterKey, int]:
+        return self._buffer.drain()
+
+    def restore(self, deltas: Dict[CounterKey, int]) -> None:
+        for key, delta in deltas.items():
+            self._buffer.add(key, delta)
+
+    async def close(self) -> None:
+        await self._client.close()
+
+
+def create_counter_store(backend: str) -> CounterStore:
+    """Build the counter store selected by USAGE_BACKEND"""
+    if backend == "memory":
+        return MemoryCounterStore(
+            refresh_seconds=settings.usage_refresh_seconds,
+            max_pending=settings.usage_max_pending
+        )
+    if backend == "redis":
+        if not settings.usage_redis_url:
+            raise RuntimeError("USAGE_BACKEND=redis requires USAGE_REDIS_URL")
+        return RedisCounterStore(settings.usage_redis_url)
+    if backend != "database":
+        raise ValueError(f"Unknown usage backend: {backend}")
+    return DatabaseCounterStore()
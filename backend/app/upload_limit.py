@@ -0,0 +1,90 @@
+"""Request body cap for multipart uploads, enforced before the form is parsed"""
+from starlette.responses import JSONResponse
+
+from app.config import settings
+
+
+def upload_budget() -> int:
+    """Largest multipart body accepted: every allowed file at the size limit, plus form overhead"""
+    return settings.max_upload_files * settings.max_upload_size + settings.upload_form_overhead
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware rejecting oversized multipart bodies with 413 PAYLOAD_TOO_LARGE
+
+    Starlette spools the whole form to memory/disk before a route runs, so a
+    route can't stop an oversized upload. This checks Content-Length up front
+    and counts the streamed bytes (chunked or understated bodies): as soon as
+    the budget is passed it sends the 413 itself and stops forwarding the body,
+    before python-multipart buffers the rest.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        budget = upload_budget()
+        content_length = self._header(scope, b"content-length")
+        if content_length is not None and content_length.isdigit() and int(content_length) > budget:
+            await self._reject(scope, receive, send, budget)
+            return
+
+        received = 0
+        response_started = False
+        # Set once the 413 has been sent; the app's own response is dropped
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > budget:
+                    # Stop forwarding the body: the form parser sees a disconnect
+                    # and whatever error the app turns that into is discarded
+                    if not response_started:
+                        rejected = True
+                        await self._reject(scope, receive, send, budget)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except Exception:
+            if not rejected:
+                raise
+
+    @staticmethod
+    def _header(scope, name: bytes):
+        for key, value in scope.get("headers", ()):
+            if key.lower() == name:
+                return value.decode("latin-1")
+        return None
+
+    def _is_multipart(self, scope) -> bool:
+        content_type = self._header(scope, b"content-type") or ""
+        return content_type.lower().startswith("multipart/form-data")
+
+    @staticmethod
+    async def _reject(scope, receive, send, budget: int) -> None:
+        response = JSONResponse(
+            status_code=413,
+            content={"detail": f"Request body exceeds maximum size of {budget} bytes"},
+            headers={"X-Error-Code": "PAYLOAD_TOO_LARGE", "Connection": "close"},
+        )
+        await response(scope, receive, send)
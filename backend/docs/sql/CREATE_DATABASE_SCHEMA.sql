@@ -3,12 +3,15 @@
 -- ============================================================================
 
 -- Drop indexes first
+DROP INDEX IF EXISTS idx_store_notifications_received;
 DROP INDEX IF EXISTS idx_history_batch;
 DROP INDEX IF EXISTS idx_history_token_created;
 DROP INDEX IF EXISTS idx_history_token;
 DROP INDEX IF EXISTS idx_recipe_language;
 DROP INDEX IF EXISTS idx_recipe_id;
 DROP INDEX IF EXISTS idx_usage_token_date;
+DROP INDEX IF EXISTS idx_subscriptions_purchase_token;
+DROP INDEX IF EXISTS idx_subscriptions_original_transaction;
 DROP INDEX IF EXISTS idx_subscriptions_status;
 DROP INDEX IF EXISTS idx_subscriptions_token;
 
@@ -17,6 +20,8 @@ DROP INDEX IF EXISTS idx_subscriptions_token;
 -- They are dropped when the table is dropped
 
 -- Drop tables
+DROP TABLE IF EXISTS llm_usage_daily;
+DROP TABLE IF EXISTS store_notifications;
 DROP TABLE IF EXISTS history;
 DROP TABLE IF EXISTS recipe_cache;
 DROP TABLE IF EXISTS usage_logs;
@@ -24,7 +29,7 @@ DROP TABLE IF EXISTS subscriptions;
 DROP TABLE IF EXISTS alembic_version;
 
 -- ============================================================================
--- CREATE TABLES (matching current migration: cd6e98d4e2be)
+-- CREATE TABLES (matching current migration: c3a7e9d2b6f1)
 -- ============================================================================
 
 -- Create subscriptions table (for premium features)
@@ -45,6 +50,8 @@ CREATE TABLE subscriptions (
 
 CREATE INDEX idx_subscriptions_status ON subscriptions(status, expires_at);
 CREATE INDEX idx_subscriptions_token ON subscriptions(app_account_token);
+CREATE INDEX idx_subscriptions_original_transaction ON subscriptions(original_transaction_id);
+CREATE INDEX idx_subscriptions_purchase_token ON subscriptions(purchase_token);
 
 -- Create usage_logs table (for usage tracking)
 CREATE TABLE usage_logs (
@@ -67,6 +74,7 @@ CREATE TABLE recipe_cache (
     title VARCHAR(500) NOT NULL,
     steps TEXT NOT NULL,
     ingredients TEXT,
+    payload TEXT,  -- Serialized Recipe response JSON (served as-is)
     -- image_url VARCHAR(500),  -- AI-generated image URL (DALL-E)
     created_at TIMESTAMP WITH TIME ZONE DEFAULT (CURRENT_TIMESTAMP),
     PRIMARY KEY (id),
@@ -90,6 +98,35 @@ CREATE INDEX idx_history_token ON history(app_account_token);
 CREATE INDEX idx_history_token_created ON history(app_account_token, created_at);
 CREATE INDEX idx_history_batch ON history(generation_batch_id);
 
+-- Create store_notifications table (processed store notifications, for idempotency)
+CREATE TABLE store_notifications (
+    platform VARCHAR(10) NOT NULL,
+    notification_id VARCHAR(255) NOT NULL,  -- Apple notificationUUID / Pub/Sub messageId
+    notification_type VARCHAR(100) NOT NULL,
+    subscription_id VARCHAR(36),  -- Subscription it updated (if any)
+    received_at TIMESTAMP WITH TIME ZONE DEFAULT (CURRENT_TIMESTAMP) NOT NULL,
+    PRIMARY KEY (platform, notification_id)
+);
+
+CREATE INDEX idx_store_notifications_received ON store_notifications(received_at);
+
+-- Create llm_usage_daily table (daily LLM token/cost rollups, written when LLM_USAGE_ROLLUPS=true)
+CREATE TABLE llm_usage_daily (
+    date DATE NOT NULL,
+    feature VARCHAR(50) NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    language VARCHAR(10) NOT NULL,
+    tier VARCHAR(20) NOT NULL,
+    requests INTEGER NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    completion_tokens INTEGER NOT NULL,
+    truncated INTEGER NOT NULL,  -- Calls that stopped at max_tokens
+    errors INTEGER NOT NULL,
+    latency_ms INTEGER NOT NULL,  -- Sum (divide by requests for the mean)
+    cost_usd FLOAT NOT NULL,
+    PRIMARY KEY (date, feature, model, language, tier)
+);
+
 -- Create alembic_version table (for Alembic migration tracking)
 CREATE TABLE alembic_version (
     version_num VARCHAR(32) NOT NULL PRIMARY KEY
@@ -97,6 +134,6 @@ CREATE TABLE alembic_version (
 
 -- Insert current migration version
 INSERT INTO alembic_version (version_num) 
-VALUES ('cd6e98d4e2be')
+VALUES ('c3a7e9d2b6f1')
 ON CONFLICT (version_num) DO NOTHING;
 
@@ -3,13 +3,45 @@ FridgeGPT Backend API
 FastAPI application for ingredient detection and recipe generation
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.db import engine, Base
+from app.db import engine, async_engine, Base
+from app.metrics import MetricsMiddleware, instrument_engine
+from app.upload_limit import UploadLimitMiddleware
+from app.services.llm_gateway import llm_gateway
+from app.services.llm_usage import llm_usage
+from app.services.image_service import image_service
+from app.services.receipt_service import receipt_service
+from app.services.pretranslation_worker import pretranslation_queue
+from app.services.usage_service import usage_service
+from app.services.subscription_sweeper import subscription_sweeper
 
 # Import routers
-from app.routers import subscription, usage, detection, recipes
+from app.routers import subscription, usage, detection, recipes, notifications
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup/shutdown hooks"""
+    pretranslation_queue.start()
+    usage_service.start()
+    subscription_sweeper.start()
+    llm_usage.start()
+    await receipt_service.start()
+    yield
+    # Stop background workers, close pooled OpenAI/store connections and image workers
+    await pretranslation_queue.stop()
+    await usage_service.stop()
+    await subscription_sweeper.stop()
+    await llm_usage.stop()
+    await async_engine.dispose()
+    await llm_gateway.aclose()
+    await receipt_service.aclose()
+    image_service.shutdown()
+
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -18,6 +50,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,  # Faster JSON encoding for every response
 )
 
 # CORS configuration
@@ -30,11 +64,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Reject oversized multipart uploads while they are received (before form parsing)
+app.add_middleware(UploadLimitMiddleware)
+
+# Request latency, in-flight requests, SQL statements per request and error codes (see /metrics)
+app.add_middleware(MetricsMiddleware)
+instrument_engine(async_engine)
+instrument_engine(engine)
+
 # Include routers
 app.include_router(subscription.router)
 app.include_router(usage.router)
 app.include_router(detection.router)
 app.include_router(recipes.router)
+app.include_router(notifications.router)
 
 
 @app.get("/api/v1/health")
@@ -49,6 +92,49 @@ async def health_check():
     )
 
 
+@app.get("/api/v1/health/db")
+async def database_health():
+    """Database connectivity and connection pool metrics (checkout wait, utilization)"""
+    import time
+    from sqlalchemy import text
+    from app.db import pool_metrics
+    
+    start = time.perf_counter()
+    status = "healthy"
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception:
+        status = "unhealthy"
+    
+    return {
+        "status": status,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+        "pools": {
+            "api": pool_metrics(async_engine),
+            "sync": pool_metrics(engine),
+        },
+    }
+
+
+@app.get("/api/v1/health/jobs")
+async def jobs_health():
+    """Background job status (pre-translation queue, subscription sweeper)"""
+    return {
+        "pretranslation": pretranslation_queue.status(),
+        "subscription_sweeper": subscription_sweeper.status(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics (HTTP latency per route, SQL statements per request, error codes, LLM usage, cache hits)"""
+    from app.metrics import render_metrics
+    
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
     
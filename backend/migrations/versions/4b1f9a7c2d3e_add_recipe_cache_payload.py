@@ -0,0 +1,27 @@
+"""Add pre-serialized payload to recipe_cache
+
+Revision ID: 4b1f9a7c2d3e
+Revises: cd6e98d4e2be
+Create Date: 2026-10-18 12:40:00.000000
+
+Adds recipe_cache.payload: the Recipe response JSON for each
+(recipe_id, language), written when the row is created. GET /recipes/{id}
+returns it as-is. Existing rows are filled in lazily on first read.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '4b1f9a7c2d3e'
+down_revision = 'cd6e98d4e2be'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('recipe_cache', sa.Column('payload', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('recipe_cache') as batch_op:
+        batch_op.drop_column('payload')
@@ -0,0 +1,40 @@
+"""Add store_notifications table
+
+Revision ID: 8e2d5c1a9f4b
+Revises: 4b1f9a7c2d3e
+Create Date: 2026-10-18 13:10:00.000000
+
+Adds store_notifications, which records every processed App Store Server
+Notification / Play Store Real-Time Developer Notification so redelivered
+notifications are applied only once. Also indexes the subscription columns
+notifications are matched on.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8e2d5c1a9f4b'
+down_revision = '4b1f9a7c2d3e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('store_notifications',
+    sa.Column('platform', sa.String(length=10), nullable=False),
+    sa.Column('notification_id', sa.String(length=255), nullable=False),
+    sa.Column('notification_type', sa.String(length=100), nullable=False),
+    sa.Column('subscription_id', sa.String(length=36), nullable=True),
+    sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=False),
+    sa.PrimaryKeyConstraint('platform', 'notification_id')
+    )
+    op.create_index('idx_store_notifications_received', 'store_notifications', ['received_at'], unique=False)
+    op.create_index('idx_subscriptions_original_transaction', 'subscriptions', ['original_transaction_id'], unique=False)
+    op.create_index('idx_subscriptions_purchase_token', 'subscriptions', ['purchase_token'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_subscriptions_purchase_token', table_name='subscriptions')
+    op.drop_index('idx_subscriptions_original_transaction', table_name='subscriptions')
+    op.drop_index('idx_store_notifications_received', table_name='store_notifications')
+    op.drop_table('store_notifications')
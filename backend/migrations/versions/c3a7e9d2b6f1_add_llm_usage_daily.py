@@ -0,0 +1,40 @@
+"""Add llm_usage_daily table
+
+Revision ID: c3a7e9d2b6f1
+Revises: 8e2d5c1a9f4b
+Create Date: 2026-10-18 14:00:00.000000
+
+Adds llm_usage_daily: per-day LLM request, token, latency and estimated
+cost totals by feature, model, language and tier. Only written when
+LLM_USAGE_ROLLUPS is enabled.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c3a7e9d2b6f1'
+down_revision = '8e2d5c1a9f4b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('llm_usage_daily',
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('feature', sa.String(length=50), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('language', sa.String(length=10), nullable=False),
+    sa.Column('tier', sa.String(length=20), nullable=False),
+    sa.Column('requests', sa.Integer(), nullable=False),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=False),
+    sa.Column('completion_tokens', sa.Integer(), nullable=False),
+    sa.Column('truncated', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.Integer(), nullable=False),
+    sa.Column('latency_ms', sa.Integer(), nullable=False),
+    sa.Column('cost_usd', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('date', 'feature', 'model', 'language', 'tier')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('llm_usage_daily')
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: filtering detected names (non-food items and model apologies)
+
+Compares the previous per-name scan (`any(keyword in name ...)` over the
+error list, then the non-food list, lowercasing keywords each time) with the
+compiled per-language pattern from the prompt registry, on large synthetic
+detection outputs. Also reports how often the two disagree (the compiled
+filter matches non-food keywords as whole words, so e.g. "vegetables" no
+longer matches "table"). tests/test_ingredient_filter.py checks that real
+ingredient names containing a keyword are kept.
+
+Usage:
+    python scripts/bench_ingredient_filter.py [--names 10 100 1000] [--languages en ja de]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.prompt_registry import (  # noqa: E402
+    DETECTION_ERROR_MESSAGES,
+    NON_FOOD_KEYWORDS,
+    SUPPORTED_LANGUAGES,
+    prompt_registry,
+)
+
+FOODS = [
+    "eggs", "whole milk", "spinach", "cheddar cheese", "cherry tomatoes", "red onion", "garlic",
+    "butter", "mixed vegetables", "chicken breast", "greek yogurt", "carrots", "bell pepper",
+    "lemon", "parsley", "brown rice", "tofu", "mushrooms", "zucchini", "olive oil",
+]
+
+
+def synthetic_names(language: str, count: int, rng: random.Random) -> list:
+    """Mostly food names, with ~20% non-food items and model apologies mixed in"""
+    noise = NON_FOOD_KEYWORDS[language] + DETECTION_ERROR_MESSAGES[language]
+    names = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            names.append(rng.choice(noise).capitalize())
+        else:
+            names.append(f"{rng.choice(FOODS)} {rng.randint(1, 999)}")
+    return names
+
+
+def old_filter(names: list, language: str) -> list:
+    keywords_to_filter = NON_FOOD_KEYWORDS.get(language, NON_FOOD_KEYWORDS["en"])
+    error_keywords = DETECTION_ERROR_MESSAGES.get(language, DETECTION_ERROR_MESSAGES["en"])
+    kept = []
+    for name in names:
+        clean_lower = name.lower()
+        if any(error in clean_lower for error in error_keywords):
+            continue
+        if any(keyword.lower() in clean_lower for keyword in keywords_to_filter):
+            continue
+        kept.append(name)
+    return kept
+
+
+def new_filter(names: list, language: str) -> list:
+    not_an_ingredient = prompt_registry.detection_filter(language)
+    return [name for name in names if not not_an_ingredient.search(name.lower())]
+
+
+def best_of(fn, *args, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detected-name filter benchmark")
+    parser.add_argument("--names", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--languages", nargs="+", default=list(SUPPORTED_LANGUAGES))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'lang':>4} {'names':>6} {'old us':>10} {'new us':>10} {'speedup':>8} {'differ':>6}")
+    for count in args.names:
+        total_old = total_new = 0.0
+        for language in args.languages:
+            names = synthetic_names(language, count, rng)
+            old = best_of(old_filter, names, language)
+            new = best_of(new_filter, names, language)
+            total_old += old
+            total_new += new
+            differ = len(set(old_filter(names, language)) ^ set(new_filter(names, language)))
+            print(f"{language:>4} {count:>6} {old * 1e6:>10.1f} {new * 1e6:>10.1f} {old / new:>7.1f}x {differ:>6}")
+        print(f"{'all':>4} {count:>6} {total_old * 1e6:>10.1f} {total_new * 1e6:>10.1f} {total_old / total_new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
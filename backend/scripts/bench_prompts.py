@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: per-request prompt building cost
+
+"before" reproduces the old per-call work in OpenAIService: build the full
+dict of 27 recipe prompts (every template formatted, as the inline f-string
+dict did) plus the detection prompt/keyword dicts, then pick one language.
+"after" is what requests do now: look up and render one template from the
+module-level registry.
+
+Usage:
+    python scripts/bench_prompts.py [--language ja] [--number 20000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.prompt_registry import (  # noqa: E402
+    DETECTION_ERROR_MESSAGES,
+    DETECTION_PROMPTS,
+    NON_FOOD_KEYWORDS,
+    prompt_registry,
+)
+
+INGREDIENTS = "eggs, milk, spinach, cheddar, tomatoes, onion, garlic, butter"
+CONSTRAINTS = "\n\nIMPORTANT CONSTRAINTS (MUST BE FOLLOWED STRICTLY):\n- Diet style: vegetarian"
+
+
+def before(language: str, templates: dict) -> tuple:
+    # One formatted string per language, rebuilt on every call
+    recipe_prompts = {
+        lang: template.format(ingredient_list=INGREDIENTS, constraints_text=CONSTRAINTS, max_recipes=3)
+        for lang, template in templates.items()
+    }
+    detection_prompts = dict(DETECTION_PROMPTS)
+    non_food = {lang: list(words) for lang, words in NON_FOOD_KEYWORDS.items()}
+    errors = {lang: list(words) for lang, words in DETECTION_ERROR_MESSAGES.items()}
+    return (
+        recipe_prompts.get(language, recipe_prompts["en"]),
+        detection_prompts.get(language, detection_prompts["en"]),
+        non_food.get(language, non_food["en"]),
+        errors.get(language, errors["en"]),
+    )
+
+
+def after(language: str) -> tuple:
+    return (
+        prompt_registry.recipe_prompt(language, INGREDIENTS, 3, CONSTRAINTS),
+        prompt_registry.detection_prompt(language),
+        prompt_registry.detection_filter(language),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request prompt building cost")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--number", type=int, default=20000, help="Calls per measurement")
+    args = parser.parse_args()
+
+    templates = prompt_registry.recipe_templates()
+    assert before(args.language, templates)[0] == after(args.language)[0]
+
+    results = {}
+    for name, stmt in (
+        ("before", lambda: before(args.language, templates)),
+        ("after", lambda: after(args.language)),
+    ):
+        # Best of 5 to reduce scheduler noise
+        best = min(timeit.repeat(stmt, number=args.number, repeat=5))
+        results[name] = best / args.number * 1e6
+        print(f"{name:>6}: {results[name]:8.2f} us/request")
+    print(f"speedup: {results['before'] / results['after']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
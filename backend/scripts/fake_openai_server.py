@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stand-in for load and latency testing
+
+Serves POST /v1/chat/completions (plain and streamed) with canned answers
+for the three kinds of prompt the backend sends:
+- vision (ingredient detection)
+- recipe generation
+- recipe translation
+
+Each request's language is recovered from the prompt, so answers come back
+in that language. Latency, generation speed and error injection are
+configurable, and --seed makes a run reproducible. No network and no API
+key are needed.
+
+Point the backend at it with:
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 OPENAI_API_KEY=fake uvicorn main:app
+
+Usage:
+    python scripts/fake_openai_server.py --port 8001
+    python scripts/fake_openai_server.py --latency lognormal:-0.5:0.4 --tokens-per-second 60 \\
+        --error-rate 0.02 --error-codes 429,500,503 --seed 1
+
+Latency distributions (seconds until the first token):
+    fixed:S  uniform:MIN:MAX  normal:MEAN:SD  lognormal:MU:SIGMA
+
+GET /stats returns request and error counts per prompt kind.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+import uuid
+from collections import Counter
+from string import Formatter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.prompt_registry import DEFAULT_LANGUAGE, DETECTION_PROMPTS, RECIPE_PROMPTS  # noqa: E402
+
+
+# Canned answers; languages without an entry answer in English
+INGREDIENTS = {
+    "en": ["tomato", "egg", "onion", "cheese", "milk", "carrot"],
+    "es": ["tomate", "huevo", "cebolla", "queso", "leche", "zanahoria"],
+    "fr": ["tomate", "œuf", "oignon", "fromage", "lait", "carotte"],
+    "de": ["Tomate", "Ei", "Zwiebel", "Käse", "Milch", "Karotte"],
+    "ja": ["トマト", "卵", "玉ねぎ", "チーズ", "牛乳", "にんじん"],
+    "ko": ["토마토", "계란", "양파", "치즈", "우유", "당근"],
+    "zh": ["番茄", "鸡蛋", "洋葱", "奶酪", "牛奶", "胡萝卜"],
+    "ar": ["طماطم", "بيض", "بصل", "جبن", "حليب", "جزر"],
+    "ru": ["помидор", "яйцо", "лук", "сыр", "молоко", "морковь"],
+}
+RECIPE_WORDS = {
+    "en": ("Quick {0} and {1} skillet", ["Chop the {0}.", "Cook the {1} in a pan.", "Add the {0} and season.", "Serve warm."]),
+    "es": ("Sartén rápida de {0} y {1}", ["Pica el {0}.", "Cocina el {1} en una sartén.", "Añade el {0} y sazona.", "Sirve caliente."]),
+    "fr": ("Poêlée rapide {0} et {1}", ["Couper le {0}.", "Cuire le {1} à la poêle.", "Ajouter le {0} et assaisonner.", "Servir chaud."]),
+    "de": ("Schnelle {0}-{1}-Pfanne", ["{0} schneiden.", "{1} in der Pfanne garen.", "{0} dazugeben und würzen.", "Warm servieren."]),
+    "ja": ("{0}と{1}の簡単炒め", ["{0}を切る。", "{1}をフライパンで焼く。", "{0}を加えて味付けする。", "温かいうちに盛り付ける。"]),
+    "ko": ("간단한 {0} {1} 볶음", ["{0}를 썬다.", "{1}를 팬에 익힌다.", "{0}를 넣고 간을 한다.", "따뜻하게 낸다."]),
+    "zh": ("快手{0}炒{1}", ["把{0}切好。", "锅中炒{1}。", "加入{0}调味。", "趁热上桌。"]),
+}
+EMOJIS = ["🍳", "🥗", "🍝", "🍲", "🥘"]
+BADGES = ["fastLazy", "healthy", "comfort", "fastLazy", "healthy"]
+
+IMAGE_PROMPT_TOKENS = 85  # Low-detail image input
+
+
+def parse_distribution(spec: str) -> Callable[[random.Random], float]:
+    """Parse a latency spec (fixed:S, uniform:MIN:MAX, normal:MEAN:SD, lognormal:MU:SIGMA)"""
+    kind, _, args = spec.partition(":")
+    try:
+        values = [float(value) for value in args.split(":")] if args else []
+        if kind == "fixed" and len(values) == 1:
+            return lambda rng: values[0]
+        if kind == "uniform" and len(values) == 2:
+            return lambda rng: rng.uniform(values[0], values[1])
+        if kind == "normal" and len(values) == 2:
+            return lambda rng: max(0.0, rng.gauss(values[0], values[1]))
+        if kind == "lognormal" and len(values) == 2:
+            return lambda rng: rng.lognormvariate(values[0], values[1])
+    except ValueError:
+        pass
+    raise argparse.ArgumentTypeError(f"Invalid latency distribution: {spec!r}")
+
+
+def count_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token, as for English)"""
+    return max(1, (len(text) + 3) // 4)
+
+
+def split_tokens(text: str) -> List[str]:
+    """Split output into ~4-character pieces to stream as deltas"""
+    return [text[i:i + 4] for i in range(0, len(text), 4)] or [""]
+
+
+def _text_parts(message: Dict[str, Any]) -> Tuple[str, int]:
+    """Text of a message and its number of images"""
+    content = message.get("content")
+    if isinstance(content, str):
+        return content, 0
+    texts, images = [], 0
+    for part in content or []:
+        if part.get("type") == "image_url":
+            images += 1
+        elif part.get("type") == "text":
+            texts.append(part.get("text", ""))
+    return "\n".join(texts), images
+
+
+def template_pattern(template: str) -> "re.Pattern":
+    """Regex matching a prompt built from a str.format template (fields captured by name)"""
+    parts = []
+    for literal, field, _, _ in Formatter().parse(template):
+        parts.append(re.escape(literal))
+        if field is not None:
+            # Only constraints_text spans lines; other fields stop at the line end
+            parts.append(f"(?P<{field}>.*?)" if field == "constraints_text" else f"(?P<{field}>[^\n]*)")
+    return re.compile("".join(parts), re.DOTALL)
+
+
+class CannedResponder:
+    """Recognizes the backend's prompts and builds answers in the requested language"""
+
+    def __init__(self):
+        self.detection_languages = {prompt: lang for lang, prompt in DETECTION_PROMPTS.items()}
+        # Several languages share a first line ("Ingredientes: "), so match whole templates
+        self.recipe_patterns = [(template_pattern(prompt), lang) for lang, prompt in RECIPE_PROMPTS.items()]
+
+    def respond(self, body: Dict[str, Any]) -> Tuple[str, str, int]:
+        """
+        Answer a chat completion request
+
+        Returns:
+            Tuple of (prompt kind, content, prompt tokens)
+        """
+        messages = body.get("messages") or []
+        system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+        user_text, images = "", 0
+        for message in messages:
+            if message.get("role") == "user":
+                user_text, images = _text_parts(message)
+        prompt_tokens = count_tokens(system) + count_tokens(user_text) + images * IMAGE_PROMPT_TOKENS
+
+        if images:
+            return "vision", self.detection(user_text), prompt_tokens
+        if "translator" in system.lower():
+            return "translation", self.translation(user_text), prompt_tokens
+        json_object = (body.get("response_format") or {}).get("type") == "json_object"
+        return "recipe", self.recipes(user_text, json_object), prompt_tokens
+
+    def detection(self, prompt: str) -> str:
+        lang = self.detection_languages.get(prompt.strip(), DEFAULT_LANGUAGE)
+        names = INGREDIENTS.get(lang, INGREDIENTS[DEFAULT_LANGUAGE])
+        return ", ".join(names[:4])
+
+    def recipes(self, prompt: str, json_object: bool) -> str:
+        lang, fields = DEFAULT_LANGUAGE, {}
+        for pattern, candidate in self.recipe_patterns:
+            match = pattern.fullmatch(prompt)
+            if match:
+                lang, fields = candidate, match.groupdict()
+                break
+        ingredients = [name.strip() for name in fields.get("ingredient_list", "").split(",") if name.strip()]
+        ingredients = ingredients or INGREDIENTS.get(lang, INGREDIENTS[DEFAULT_LANGUAGE])
+        count = fields.get("max_recipes", "3")
+        max_recipes = min(int(count) if count.isdigit() else 3, len(EMOJIS))
+        title, steps = RECIPE_WORDS.get(lang, RECIPE_WORDS[DEFAULT_LANGUAGE])
+        recipes = []
+        for i in range(max_recipes):
+            a, b = ingredients[i % len(ingredients)], ingredients[(i + 1) % len(ingredients)]
+            recipes.append({
+                "emoji": EMOJIS[i],
+                "badge": BADGES[i],
+                "title": title.format(a, b),
+                "steps": [step.format(a, b) for step in steps],
+                "ingredients": [a, b],
+            })
+        data: Any = recipes[0] if json_object and max_recipes == 1 else recipes
+        return json.dumps(data, ensure_ascii=False)
+
+    def translation(self, prompt: str) -> str:
+        match = re.search(r"language with code '([^']+)'", prompt)
+        lang = match.group(1) if match else DEFAULT_LANGUAGE
+        if match:
+            # Batch translation: echo the payload back, tagged with the target language
+            block = next((part for part in prompt.split("\n\n") if part.startswith("[")), "[]")
+            try:
+                payload = json.loads(block)
+            except ValueError:
+                payload = []
+            recipes = [
+                {
+                    "id": recipe.get("id"),
+                    "title": f"[{lang}] {recipe.get('title', '')}",
+                    "steps": [f"[{lang}] {step}" for step in recipe.get("steps", [])],
+                    "ingredients": [f"[{lang}] {name}" for name in recipe.get("ingredients", [])],
+                }
+                for recipe in payload if isinstance(recipe, dict)
+            ]
+            return json.dumps({"recipes": recipes}, ensure_ascii=False)
+        # Single recipe: "Recipe: ...", "Steps: a, b", "Ingredients: a, b"
+        fields = dict(
+            line.split(": ", 1) for line in prompt.splitlines() if ": " in line
+        )
+        return json.dumps({
+            "title": f"[translated] {fields.get('Recipe', '')}",
+            "badge": fields.get("Badge", ""),
+            "steps": [f"[translated] {step}" for step in fields.get("Steps", "").split(", ") if step],
+            "ingredients": [name for name in fields.get("Ingredients", "").split(", ") if name],
+        }, ensure_ascii=False)
+
+
+class FakeOpenAI:
+    """Latency, streaming and error injection around CannedResponder"""
+
+    def __init__(
+        self,
+        latency: Callable[[random.Random], float],
+        tokens_per_second: float,
+        error_rate: float,
+        error_codes: List[int],
+        seed: Optional[int]
+    ):
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_codes = error_codes
+        self.rng = random.Random(seed)
+        self.responder = CannedResponder()
+        self.stats: Counter = Counter()
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def _error(self, kind: str) -> Optional[JSONResponse]:
+        if not self.error_codes or self.rng.random() >= self.error_rate:
+            return None
+        status = self.rng.choice(self.error_codes)
+        self.stats[f"{kind}_error_{status}"] += 1
+        headers = {"retry-after": "1"} if status == 429 else None
+        return JSONResponse(
+            status_code=status,
+            content={"error": {
+                "message": f"Injected error ({status})",
+                "type": "rate_limit_exceeded" if status == 429 else "server_error",
+                "param": None,
+                "code": None,
+            }},
+            headers=headers,
+        )
+
+    async def chat_completions(self, request: Request):
+        body = await request.json()
+        kind, content, prompt_tokens = self.responder.respond(body)
+        self.stats[kind] += 1
+
+        first_token = self.latency(self.rng)
+        error = self._error(kind)
+        if error is not None:
+            await asyncio.sleep(first_token)
+            return error
+
+        pieces = split_tokens(content)
+        finish_reason = "stop"
+        max_tokens = body.get("max_tokens")
+        if max_tokens and len(pieces) > max_tokens:
+            pieces = pieces[:max_tokens]
+            finish_reason = "length"
+            self.stats[f"{kind}_truncated"] += 1
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(pieces),
+            "total_tokens": prompt_tokens + len(pieces),
+        }
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        model = body.get("model") or "gpt-4o"
+
+        if not body.get("stream"):
+            await asyncio.sleep(first_token + len(pieces) * self._token_delay())
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(pieces)},
+                    "finish_reason": finish_reason,
+                }],
+                "usage": usage,
+            })
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        def chunk(delta: Dict[str, Any], reason: Optional[str] = None, with_usage: bool = False) -> str:
+            data: Dict[str, Any] = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [] if with_usage else [{"index": 0, "delta": delta, "finish_reason": reason}],
+            }
+            if with_usage:
+                data["usage"] = usage
+            return f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        async def events():
+            await asyncio.sleep(first_token)
+            yield chunk({"role": "assistant", "content": ""})
+            delay = self._token_delay()
+            for piece in pieces:
+                if delay:
+                    await asyncio.sleep(delay)
+                yield chunk({"content": piece})
+            yield chunk({}, finish_reason)
+            if include_usage:
+                yield chunk({}, with_usage=True)
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+
+def create_app(fake: FakeOpenAI) -> FastAPI:
+    app = FastAPI(title="Fake OpenAI", docs_url=None, redoc_url=None)
+    app.add_api_route("/v1/chat/completions", fake.chat_completions, methods=["POST"])
+    app.add_api_route("/stats", lambda: dict(fake.stats), methods=["GET"])
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stand-in for load and latency testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=parse_distribution, default="lognormal:-1.0:0.5",
+                        help="Time to first token (default lognormal:-1.0:0.5, median ~0.37s)")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0,
+                        help="Generation speed after the first token (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail (0-1)")
+    parser.add_argument("--error-codes", default="429,500,503", help="Status codes for injected errors")
+    parser.add_argument("--seed", type=int, help="Seed latency and error injection for reproducible runs")
+    args = parser.parse_args()
+
+    fake = FakeOpenAI(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        error_codes=[int(code) for code in args.error_codes.split(",") if code.strip()],
+        seed=args.seed,
+    )
+    import uvicorn
+
+    print(f"# set OPENAI_BASE_URL=http://{args.host}:{args.port}/v1", file=sys.stderr)
+    uvicorn.run(create_app(fake), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
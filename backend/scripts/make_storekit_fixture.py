@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Generate offline StoreKit 2 signed-transaction fixtures
+
+Creates a throwaway root -> intermediate -> leaf EC chain, writes the root
+certificate and prints a signed transaction (JWS) for it. Point
+APPLE_ROOT_CERT_PATH at the root to have the backend accept the fixture
+tokens without calling Apple. With --notification the transaction is
+wrapped in an App Store Server Notification v2 and printed as a fixture for
+scripts/replay_notifications.py.
+
+Usage:
+    python scripts/make_storekit_fixture.py --root-out fixture-root.pem \\
+        --app-account-token 6f1c... --product-id premium --days 30
+    python scripts/make_storekit_fixture.py --notification DID_RENEW > renew.json
+
+Pass the same --chain file to sign several fixtures with one root.
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+from cryptography.x509.oid import NameOID
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.apple_jws import AppleJWSVerifier, load_root_fingerprints  # noqa: E402
+
+
+def _b64url(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _certificate(subject: str, key, issuer_name: x509.Name, issuer_key, ca: bool) -> x509.Certificate:
+    now = datetime.now(timezone.utc)
+    return (
+        x509.CertificateBuilder()
+        .subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, subject)]))
+        .issuer_name(issuer_name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=365))
+        .add_extension(x509.BasicConstraints(ca=ca, path_length=None), critical=True)
+        .sign(issuer_key, hashes.SHA256())
+    )
+
+
+def make_chain():
+    """Root, intermediate and leaf certificates plus the leaf signing key"""
+    root_key = ec.generate_private_key(ec.SECP256R1())
+    root_name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "Fixture Root CA")])
+    root = _certificate("Fixture Root CA", root_key, root_name, root_key, ca=True)
+    intermediate_key = ec.generate_private_key(ec.SECP256R1())
+    intermediate = _certificate("Fixture Intermediate", intermediate_key, root.subject, root_key, ca=True)
+    leaf_key = ec.generate_private_key(ec.SECP256R1())
+    leaf = _certificate("Fixture Leaf", leaf_key, intermediate.subject, intermediate_key, ca=False)
+    return (leaf, intermediate, root), leaf_key
+
+
+def load_or_make_chain(path):
+    """Reuse the chain stored at `path` (leaf key + leaf, intermediate, root PEM), or create it"""
+    if path and os.path.exists(path):
+        with open(path, "rb") as f:
+            data = f.read()
+        leaf_key = serialization.load_pem_private_key(data, password=None)
+        return tuple(x509.load_pem_x509_certificates(data)), leaf_key
+    chain, leaf_key = make_chain()
+    if path:
+        with open(path, "wb") as f:
+            f.write(leaf_key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption()
+            ))
+            for cert in chain:
+                f.write(cert.public_bytes(serialization.Encoding.PEM))
+    return chain, leaf_key
+
+
+def sign_transaction(chain, leaf_key, claims: dict) -> str:
+    """Compact ES256 JWS with the chain in x5c, as StoreKit 2 produces"""
+    header = {
+        "alg": "ES256",
+        "x5c": [base64.b64encode(cert.public_bytes(serialization.Encoding.DER)).decode("ascii") for cert in chain],
+    }
+    signing_input = f"{_b64url(json.dumps(header).encode())}.{_b64url(json.dumps(claims).encode())}"
+    r, s = decode_dss_signature(leaf_key.sign(signing_input.encode("ascii"), ec.ECDSA(hashes.SHA256())))
+    return f"{signing_input}.{_b64url(r.to_bytes(32, 'big') + s.to_bytes(32, 'big'))}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate offline StoreKit 2 signed-transaction fixtures")
+    parser.add_argument("--root-out", default="fixture-root.pem", help="Where to write the root certificate")
+    parser.add_argument("--chain", help="Chain/key file to reuse (created if missing)")
+    parser.add_argument("--app-account-token", default=str(uuid.uuid4()))
+    parser.add_argument("--product-id", default="premium")
+    parser.add_argument("--bundle-id", default="com.yourcompany.fridgegpt")
+    parser.add_argument("--days", type=int, default=30, help="Subscription expiry from now (negative = expired)")
+    parser.add_argument("--original-transaction-id", help="Defaults to a new ID")
+    parser.add_argument("--notification", help="Wrap in a server notification of this type (e.g. DID_RENEW, EXPIRED)")
+    parser.add_argument("--subtype", help="Notification subtype (e.g. GRACE_PERIOD)")
+    args = parser.parse_args()
+
+    chain, leaf_key = load_or_make_chain(args.chain)
+    with open(args.root_out, "wb") as f:
+        f.write(chain[2].public_bytes(serialization.Encoding.PEM))
+
+    now_ms = int(time.time() * 1000)
+    claims = {
+        "transactionId": str(now_ms),
+        "originalTransactionId": args.original_transaction_id or str(now_ms),
+        "bundleId": args.bundle_id,
+        "productId": args.product_id,
+        "purchaseDate": now_ms,
+        "expiresDate": now_ms + args.days * 86400 * 1000,
+        "type": "Auto-Renewable Subscription",
+        "appAccountToken": args.app_account_token,
+        "environment": "Sandbox",
+        "signedDate": now_ms,
+    }
+    token = sign_transaction(chain, leaf_key, claims)
+
+    # Check the fixture the way the backend will, and time the cached path
+    verifier = AppleJWSVerifier(load_root_fingerprints(args.root_out), require_apple_oids=False)
+    start = time.perf_counter()
+    verifier.verify(token)
+    first = time.perf_counter() - start
+    runs = 1000
+    start = time.perf_counter()
+    for _ in range(runs):
+        verifier.verify(token)
+    cached = (time.perf_counter() - start) / runs
+
+    print(f"# root written to {args.root_out} (set APPLE_ROOT_CERT_PATH)", file=sys.stderr)
+    print(f"# appAccountToken={args.app_account_token}", file=sys.stderr)
+    print(f"# verify: first {first * 1e6:.0f}us, cached chain {cached * 1e6:.0f}us", file=sys.stderr)
+    if not args.notification:
+        print(token)
+        return
+
+    notification = {
+        "notificationType": args.notification,
+        "notificationUUID": str(uuid.uuid4()),
+        "data": {
+            "bundleId": args.bundle_id,
+            "environment": "Sandbox",
+            "signedTransactionInfo": token,
+        },
+        "version": "2.0",
+        "signedDate": now_ms,
+    }
+    if args.subtype:
+        notification["subtype"] = args.subtype
+    fixture = {"platform": "ios", "body": {"signedPayload": sign_transaction(chain, leaf_key, notification)}}
+    print(json.dumps(fixture, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Replay store notification fixtures against a running backend
+
+Each fixture is a JSON file:
+    {"platform": "ios", "body": {"signedPayload": "..."}}
+    {"platform": "android", "body": {"message": {"data": "...", "messageId": "..."}}}
+
+App Store fixtures can be generated with
+`scripts/make_storekit_fixture.py --notification DID_RENEW` (run the backend
+with APPLE_ROOT_CERT_PATH pointing at the generated root). Play Store
+fixtures are plain Pub/Sub envelopes; see scripts/fixtures/notifications/.
+
+Usage:
+    python scripts/replay_notifications.py scripts/fixtures/notifications/
+    python scripts/replay_notifications.py --url http://localhost:8000 --repeat 2 fixture.json
+"""
+import argparse
+import json
+import os
+import sys
+
+import httpx
+
+ENDPOINTS = {
+    "ios": "/api/v1/notifications/apple",
+    "android": "/api/v1/notifications/google",
+}
+
+
+def fixture_paths(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(".json"):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay store notification fixtures")
+    parser.add_argument("paths", nargs="+", help="Fixture files or directories")
+    parser.add_argument("--url", default="http://localhost:8000", help="Backend base URL")
+    parser.add_argument("--token", default=os.getenv("GOOGLE_RTDN_TOKEN"), help="Play push token (GOOGLE_RTDN_TOKEN)")
+    parser.add_argument("--repeat", type=int, default=1, help="Send each fixture N times (checks idempotency)")
+    args = parser.parse_args()
+
+    failed = 0
+    with httpx.Client(base_url=args.url, timeout=30.0) as client:
+        for path in fixture_paths(args.paths):
+            with open(path) as f:
+                fixture = json.load(f)
+            endpoint = ENDPOINTS[fixture["platform"]]
+            params = {"token": args.token} if fixture["platform"] == "android" and args.token else None
+            for attempt in range(args.repeat):
+                response = client.post(endpoint, json=fixture["body"], params=params)
+                print(f"{path} [{attempt + 1}] {response.status_code} {response.text}")
+                failed += response.status_code != 200
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
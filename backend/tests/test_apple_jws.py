@@ -0,0 +1,34 @@
+"""AppleJWSVerifier rejects malformed tokens with JWSVerificationError"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+from cryptography.hazmat.primitives import hashes  # noqa: E402
+
+from app.services.apple_jws import AppleJWSVerifier, JWSVerificationError  # noqa: E402
+from make_storekit_fixture import make_chain, sign_transaction  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def signed():
+    chain, leaf_key = make_chain()
+    verifier = AppleJWSVerifier([chain[2].fingerprint(hashes.SHA256()).hex()], require_apple_oids=False)
+    return verifier, sign_transaction(chain, leaf_key, {"productId": "premium"})
+
+
+def test_verifies_fixture_token(signed):
+    verifier, token = signed
+    assert verifier.verify(token) == {"productId": "premium"}
+
+
+@pytest.mark.parametrize("index", [0, 1, 2])
+def test_non_ascii_segment_is_rejected(signed, index):
+    verifier, token = signed
+    segments = token.split(".")
+    segments[index] = segments[index][:-1] + "é"
+    with pytest.raises(JWSVerificationError):
+        verifier.verify(".".join(segments))
@@ -0,0 +1,46 @@
+"""Detected-name filter keeps real ingredients and drops non-food items"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.prompt_registry import prompt_registry  # noqa: E402
+
+# Ingredient names containing a non-food keyword as part of a word
+INGREDIENTS = [
+    ("en", "mixed vegetables"),
+    ("th", "ผักพื้นบ้าน"),  # local vegetables
+    ("th", "ไก่พื้นเมือง"),  # native chicken
+    ("th", "มือหมู"),  # pork trotter
+    ("ja", "手羽先"),  # chicken wing tips
+    ("zh", "猪手"),  # pork trotter
+    ("ar", "قديد"),  # dried meat
+    ("ko", "손질 오징어"),  # cleaned squid
+    ("hi", "हाथी चक"),  # artichoke
+]
+
+NON_FOOD = [
+    ("en", "table"),
+    ("en", "hands"),
+    ("th", "มือ"),
+    ("th", "พื้น"),
+    ("th", "พื้นหลัง"),
+    ("ja", "手"),
+    ("zh", "背景"),
+    ("ar", "يد"),
+    ("hi", "हाथ"),
+    ("bn", "হাত"),
+    ("th", "ขออภัย ไม่สามารถระบุได้"),
+]
+
+
+@pytest.mark.parametrize("language,name", INGREDIENTS)
+def test_keeps_ingredients(language, name):
+    assert not prompt_registry.detection_filter(language).search(name.lower())
+
+
+@pytest.mark.parametrize("language,name", NON_FOOD)
+def test_drops_non_food(language, name):
+    assert prompt_registry.detection_filter(language).search(name.lower())
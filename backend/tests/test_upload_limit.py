@@ -0,0 +1,68 @@
+"""UploadLimitMiddleware answers oversized multipart bodies with 413"""
+import asyncio
+import os
+import sys
+
+import httpx
+from fastapi import FastAPI, File, UploadFile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from app.config import settings  # noqa: E402
+from app.upload_limit import UploadLimitMiddleware, upload_budget  # noqa: E402
+
+BOUNDARY = "limit-test"
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware)
+
+    @app.post("/upload")
+    async def upload(image: UploadFile = File(...)):
+        return {"size": len(await image.read())}
+
+    return app
+
+
+def multipart_chunks(size: int, chunk_size: int = 64 * 1024):
+    yield (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="image"; filename="a.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode()
+    for start in range(0, size, chunk_size):
+        yield b"\xff" * min(chunk_size, size - start)
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def post_chunked(size: int) -> httpx.Response:
+    async def body():
+        for chunk in multipart_chunks(size):
+            yield chunk
+
+    transport = httpx.ASGITransport(app=make_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # An async generator body is sent chunked, without Content-Length
+        return await client.post(
+            "/upload",
+            content=body(),
+            headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"}
+        )
+
+
+def test_chunked_upload_over_budget_gets_413(monkeypatch):
+    monkeypatch.setattr(settings, "max_upload_files", 1)
+    monkeypatch.setattr(settings, "max_upload_size", 256 * 1024)
+    response = asyncio.run(post_chunked(upload_budget() * 4))
+    assert response.status_code == 413
+    assert response.headers["X-Error-Code"] == "PAYLOAD_TOO_LARGE"
+
+
+def test_chunked_upload_within_budget_passes(monkeypatch):
+    monkeypatch.setattr(settings, "max_upload_files", 1)
+    monkeypatch.setattr(settings, "max_upload_size", 256 * 1024)
+    response = asyncio.run(post_chunked(100 * 1024))
+    assert response.status_code == 200
+    assert response.json() == {"size": 100 * 1024}